@@ -97,6 +97,20 @@ def read_csv(filepath):
         return data
 
 
+def iter_csv(filepath):
+    """Yields one dictionary per row of the data, without reading the whole file into memory.
+
+    Parameters:
+        filepath (str): a filepath that includes a filename with its extension
+
+    Returns:
+        generator: dictionaries where each dictionary is formed from a row of the data
+    """
+    with open (filepath, 'r', encoding='utf-8') as file_obj:
+        for line in csv.DictReader(file_obj):
+            yield dict(line)
+
+
 
 ### PROBLEM 2
 def convert_to_dict(data):
@@ -119,7 +133,7 @@ def get_total_num_policies(data):
     """Returns a dictionary of US state id and the total number of state-level policies as key-value pairs.
 
     Parameters:
-        data (list): a list of dictionaries where each dictionary is formed from the data.
+        data (list): a list (or any iterable, e.g. < iter_csv() >) of dictionaries where each dictionary is formed from the data.
     
     Returns:
         state_id_2_policy_counts (dict): a dictionary of US state id and the total number of state-level policies as key-value pairs
@@ -193,7 +207,7 @@ def main():
     ### Problem 1 (20 points)
     cases = read_txt(US_Covid_Cases)
     #print(cases)
-    policies = read_csv(Policy_Updates)
+    policies = iter_csv(Policy_Updates) # consumed once by get_total_num_policies()
     #print(policies)
     ### Problem 2 (10 points)
     state2cases = convert_to_dict(cases)
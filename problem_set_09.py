@@ -143,6 +143,20 @@ def read_csv(filepath):
         data = list(csv.DictReader(file_obj))
     return data
 
+
+def iter_csv(filepath):
+    """Yields one dictionary per row of the data, without reading the whole file into memory.
+
+    Parameters:
+        filepath (str): a filepath that includes a filename with its extension
+
+    Returns:
+        generator: dictionaries where each dictionary is formed from a row of the data
+    """
+
+    with open(filepath, mode='r', newline='', encoding='utf-8-sig') as file_obj:
+        yield from csv.DictReader(file_obj)
+
 def main():
     """Program entry point. Handles program workflow.
 
@@ -165,8 +179,9 @@ def main():
     }
 
     ### Problem 7.1
-    country_population = read_csv('./country_population.csv')
-    country_meat_consumption = read_csv('./country_meat_consumption.csv')
+    # both files are consumed once below, so their rows are streamed
+    country_population = iter_csv('./country_population.csv')
+    country_meat_consumption = iter_csv('./country_meat_consumption.csv')
     #print(country_meat_consumption)
 
     ### Problem 7.2
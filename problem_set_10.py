@@ -3,9 +3,15 @@ print('Problem set 10 \n')
 
 # SETUP
 
-import requests, csv, json
+import csv, json
+from concurrent.futures import ThreadPoolExecutor
 
-ENDPOINT = 'https://swapi.py4e.com/api'
+import swapi_client
+
+ENDPOINT = swapi_client.ENDPOINT # override with the SWAPI_ENDPOINT environment variable
+MAX_WORKERS = 8 # size of the worker pool used to resolve film urls concurrently
+
+converters = {} # class -> converter generated by compile_converter()
 
 #END SETUP
 
@@ -15,6 +21,7 @@ def get_swapi_resource(resource, params=None, timeout=20):
     This function initiates an HTTP GET request to the SWAPI service in order to return a
     representation of a resource. <params> is not included in the request if no params is passed to this
     function during the function call. Once a response is received, it is converted to a python dict.
+    The request goes through the shared pooled session in <swapi_client>.
 
     Parameters:
         resource (str): a url that specifies the resource.
@@ -25,19 +32,38 @@ def get_swapi_resource(resource, params=None, timeout=20):
         dict: dictionary representation of the decoded JSON.
     """
     if params:
-        response = requests.get(resource, params).json() # pass search parameters as 2nd argument
+        response = swapi_client.fetch_json(resource, params, timeout) # pass search parameters as 2nd argument
     else:
-        response = requests.get(resource + '/').json()
+        response = swapi_client.fetch_json(resource + '/', timeout=timeout)
     return response
 
+def get_swapi_resources(urls, max_workers=MAX_WORKERS):
+    """
+    This function resolves a list of resource urls concurrently using a bounded pool of worker
+    threads. Duplicate urls are only requested once.
+
+    Parameters:
+        urls (list): resource urls, duplicates allowed.
+        max_workers (int): maximum number of requests in flight. The default value is MAX_WORKERS.
+
+    Returns:
+        dict: maps each unique url to the dictionary representation of its decoded JSON.
+    """
+    unique_urls = list(dict.fromkeys(urls)) # dedupe while keeping first-seen order
+    if not unique_urls:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(unique_urls))) as executor:
+        resources = executor.map(get_swapi_resource, unique_urls)
+        return dict(zip(unique_urls, resources))
+
 # Problem 02
 def convert_resource_to_obj(resource_dict, obj_class):
     """
     This function converts a resource dictionary to an object of a given class. The
     <resource_dict> can be a dictionary returned by <get_swapi_resource> or by <read_json>.
-    It looks for the keys in the <resource_dict> for a match in the object_class.properties.
-    It then creates an object of <obj_class> using the values from the <resource_dict> whose keys
-    had a match in the object_class.properties and returns the object.
+    It creates an object of <obj_class> from the values of the <resource_dict> keys listed in
+    object_class.properties, passed in the order of object_class.properties, and returns the
+    object. The converter for each class is generated once by <compile_converter()>.
 
     Parameters:
         resource (str): a url that specifies the resource.
@@ -46,17 +72,32 @@ def convert_resource_to_obj(resource_dict, obj_class):
     Returns:
         instance (obj): an instance generated by <obj_class>.
     """
-    obj_properties = []
+    converter = converters.get(obj_class)
+    if converter is None:
+        converter = converters[obj_class] = compile_converter(obj_class)
+    return converter(resource_dict)
 
-    for key, value in resource_dict.items():
-        if key in obj_class.properties:
-            obj_properties.append(value)
+def compile_converter(obj_class):
+    """
+    This function generates a specialized converter for <obj_class> from its <properties> tuple.
+    For <Film> the generated function is equivalent to:
+
+        def convert(resource_dict):
+            return Film(resource_dict['title'], resource_dict['episode_id'], resource_dict['url'])
 
-    # Do not change the following return statement. The "*" operator is used to unpack the
-    # items from the 'obj_properties' list to arguments for instansiating an object class.
+    so converting a resource is a fixed run of dictionary lookups rather than a scan of every
+    key of the resource against <properties>.
+
+    Parameters:
+        obj_class (cls): a class with a <properties> tuple naming its constructor arguments in order
 
-    # TODO: Uncomment the following when ready!
-    return obj_class(*obj_properties)
+    Returns:
+        function: converter taking a resource dictionary and returning an <obj_class> instance
+    """
+    args = ', '.join(f"resource_dict[{prop!r}]" for prop in obj_class.properties)
+    namespace = {'obj_class': obj_class}
+    exec(f"def convert(resource_dict):\n    return obj_class({args})\n", namespace)
+    return namespace['convert']
 
 # Problem 03
 def read_json(filepath):
@@ -73,7 +114,7 @@ def read_json(filepath):
         return json.load(file_obj)
 
 # Problem 04
-def write_json(filepath, data):
+def write_json(filepath, data, compact=False):
     """
     This function dumps the JSON object in the dictionary <data> into a file on
     <filepath>.
@@ -81,12 +122,16 @@ def write_json(filepath, data):
     Parameters:
         filepath(str): The location and filename of the file to store the JSON
         data(dict): The dictionary that contains the JSON representation of the objects.
+        compact(bool): If True, omit indentation and separator whitespace. The default value is False.
 
     Returns:
         None
     """
     with open(filepath, 'w', encoding='utf-8') as file_obj:
-        json.dump(data, file_obj, ensure_ascii=False, indent=2)
+        if compact:
+            json.dump(data, file_obj, ensure_ascii=False, separators=(',', ':'))
+        else:
+            json.dump(data, file_obj, ensure_ascii=False, indent=2)
 
 # Problem 05
 class Film:
@@ -148,6 +193,72 @@ class Film:
                 'url': self.url
             }
 
+class LazyFilm:
+    """
+    Stand-in for a <Film> that only knows its url. The film is fetched and converted the first
+    time any other attribute is read (or <str()>/<jsonable()> is called) and memoized. Pending
+    films can be resolved together with <prefetch_films()>.
+
+    Attributes:
+        url(str): the url of the film
+    """
+    def __init__(self, url):
+        """
+        The constructor of the <LazyFilm>. Nothing is fetched.
+
+        Parameters:
+            url(str): the url of the film
+
+        Returns:
+            None
+        """
+        self.url = url
+        self._film = None
+
+    def __getattr__(self, name):
+        """
+        Called for attributes the proxy does not hold itself (e.g., title): resolves the film and
+        reads the attribute from it.
+        """
+        if name.startswith('_'): # e.g., copy/pickle probing an instance built without __init__
+            raise AttributeError(name)
+        return getattr(self.resolve(), name)
+
+    def __str__(self):
+        """
+        Returns the string representation of the resolved <Film>.
+        """
+        return str(self.resolve())
+
+    def resolve(self, resource=None):
+        """
+        Returns the <Film>, converting <resource> (or the response of <get_swapi_resource()>) on
+        the first call.
+
+        Parameters:
+            resource(dict): prefetched film resource. The default value is None.
+
+        Returns:
+            Film: the resolved film
+        """
+        if self._film is None:
+            if resource is None:
+                resource = get_swapi_resource(self.url)
+            self._film = convert_resource_to_obj(resource, Film)
+        return self._film
+
+    def is_resolved(self):
+        """
+        Returns True if the film has been fetched.
+        """
+        return self._film is not None
+
+    def jsonable(self):
+        """
+        Returns the JSON-friendly representation of the resolved <Film>.
+        """
+        return self.resolve().jsonable()
+
 # Problem 06
 class Person:
     """
@@ -206,7 +317,8 @@ class Person:
         """
         This method takes the list of URLS and creates new objects of <Film> class for each film class
         and replaces the <films> instance variable with a list of Film objects. It makes use of the
-        <convert_resource_to_obj()> function and the <get_swapi_resource()>.
+        <convert_resource_to_obj()> function and the <get_swapi_resource()>. The urls are fetched
+        concurrently by <update_films_batch()>.
 
         Parameters:
             None
@@ -214,12 +326,7 @@ class Person:
         Retruns:
             None
         """
-        running_list = []
-        for each in self.films:
-            obj =  get_swapi_resource(each)
-            converted_obj = convert_resource_to_obj(obj, Film)
-            running_list.append(converted_obj)
-        self.films = running_list
+        update_films_batch([self])
 
     def jsonable(self):
         """
@@ -233,6 +340,7 @@ class Person:
         Returns:S
             dict: dictionary of the object's instance variables
         """
+        prefetch_films([self]) # resolve any lazy films concurrently rather than one by one
         films = []
         for film in self.films:
             film_dict = film.jsonable()
@@ -247,6 +355,56 @@ class Person:
                 'url': self.url
             }
 
+converters[Film] = compile_converter(Film) # generate once, at import time
+converters[Person] = compile_converter(Person)
+
+def update_films_batch(people, max_workers=MAX_WORKERS, lazy=False):
+    """
+    This function replaces the <films> list of urls of every <Person> in <people> with a list of
+    <Film> objects. The film urls of the whole batch are deduplicated and fetched concurrently with
+    <get_swapi_resources()>, so a film shared by several people is only requested once. Each
+    person's films keep their original order.
+
+    With <lazy> set nothing is fetched: the urls are replaced with <LazyFilm> proxies, one per url
+    shared by the whole batch, that resolve on first use or with <prefetch_films()>.
+
+    Parameters:
+        people (list): <Person> objects whose <films> attribute holds film urls.
+        max_workers (int): maximum number of requests in flight. The default value is MAX_WORKERS.
+        lazy (bool): defer the requests. The default value is False.
+
+    Returns:
+        None
+    """
+    if lazy:
+        proxies = {}
+        for person in people:
+            person.films = [proxies.get(url) or proxies.setdefault(url, LazyFilm(url)) for url in person.films]
+        return
+    resources = get_swapi_resources([url for person in people for url in person.films], max_workers)
+    films = {url: convert_resource_to_obj(resource, Film) for url, resource in resources.items()}
+    for person in people:
+        person.films = [films[url] for url in person.films]
+
+def prefetch_films(people, max_workers=MAX_WORKERS):
+    """
+    This function resolves the pending <LazyFilm> proxies of every <Person> in <people> at once.
+    Their urls are deduplicated and fetched concurrently with <get_swapi_resources()>.
+
+    Parameters:
+        people (list): <Person> objects whose <films> attribute holds <LazyFilm> proxies.
+        max_workers (int): maximum number of requests in flight. The default value is MAX_WORKERS.
+
+    Returns:
+        int: number of films fetched
+    """
+    pending = [film for person in people for film in person.films
+               if isinstance(film, LazyFilm) and not film.is_resolved()]
+    resources = get_swapi_resources([film.url for film in pending], max_workers)
+    for film in pending:
+        film.resolve(resources[film.url])
+    return len(resources)
+
 def main():
     """
     Program entry point. Handles program workflow.
@@ -270,8 +428,8 @@ def main():
         p = payload['results'][0]
     # Problem 7.3
         Person_instance = Person(p['name'], p['hair_color'], p['skin_color'], p['eye_color'], p['gender'], p['films'], p['url'])
-        Person_instance.update_films()
         people_objects[key] = Person_instance
+    update_films_batch(list(people_objects.values())) # resolve every film of every person in one batch
     rey_instance = people_objects['Rey']
     #print(rey_instance)
     # Problem 7.4
@@ -1,7 +1,25 @@
 import csv
 import json
 import os
-import requests
+from concurrent.futures import ThreadPoolExecutor
+
+import swapi_client
+import swapi_keys
+import swapi_stream
+
+
+_supplement_stores = {} # abs filepath -> SupplementStore, see load_supplements()
+PREFETCH_WORKERS = 8 # requests in flight while < prefetch_links() > resolves lazy links
+
+# string values that < clean_data() > converts to None
+NULL_VALUES = frozenset(('n/a', 'none', 'unknown', ''))
+
+# key-value pairs that map a tuple of instance variable names to a given type (the key name)
+VAR_TYPES = {
+    'float': ('height', 'hyperdrive_rating', 'length', 'mass', 'orbital_period_days'),
+    'int': ('cargo_capacity', 'crew', 'diameter_km', 'max_atmosphering_speed', 'moons', 'MGLT', 'passengers', 'population', 'suns'),
+    'list': ('armament', 'climate', 'equipment', 'terrain')
+}
 
 
 class Crew:
@@ -12,9 +30,13 @@ class Crew:
         the passed in key-value pairs.
 
     Methods:
+        cache_key: return a token that changes whenever the serialized crew would change
         jsonable: return JSON-friendly dict representation of the object
     """
 
+    # members live in __dict__; the jsonable() cache is kept out of it in a slot
+    __slots__ = ('__dict__', '_json_cache')
+
     def __init__(self, members):
         """Initialize Crew instance. Loops over the passed in dictionary and calls the built-in
         function < setattr() > to generate each instance variable and assign the value. The
@@ -28,6 +50,7 @@ class Crew:
             None
         """
 
+        self._json_cache = None
         for key, val in members.items():
             setattr(self, key, val) # call built-in function
 
@@ -47,24 +70,44 @@ class Crew:
 
         return crew
 
-    def jsonable(self):
-        """Returns a JSON-friendly representation of the object. Loops over instance variables
-        and converts person objects to dictionaries. Do not simply return self.__dict__. It can
-        be intercepted and mutated, adding, modifying or removing instance attributes as a result.
+    def cache_key(self):
+        """Returns the crew positions paired with each member and the member's own cache key.
 
         Parameters:
             None
 
         Returns:
-            dict: dictionary of the object's instance variables
+            tuple: cache key (see < cached_jsonable() >)
         """
 
+        return tuple((key, val, val.cache_key()) for key, val in self.__dict__.items())
+
+    def to_dict(self):
+        """Builds the JSON-friendly representation of the crew. Members are serialized through
+        their own (cached) < jsonable() >."""
+
         crew = {}
         for key, val in self.__dict__.items():
             crew[key] = val.jsonable() # person object
 
         return crew
 
+    def jsonable(self):
+        """Returns a JSON-friendly representation of the object. Loops over instance variables
+        and converts person objects to dictionaries. The result is cached until a member
+        changes (see < cached_jsonable() >) and must be treated as read-only. Do not simply
+        return self.__dict__. It can be intercepted and mutated, adding, modifying or removing
+        instance attributes as a result.
+
+        Parameters:
+            None
+
+        Returns:
+            dict: dictionary of the object's instance variables
+        """
+
+        return cached_jsonable(self)
+
 
 class Droid:
     """Representation of a mechanical beings that possessed artificial intelligence.
@@ -81,10 +124,17 @@ class Droid:
         instructions (list): language modules, flight plans, etc.
 
     Methods:
+        cache_key: return a token that changes whenever the serialized droid would change
         jsonable: return JSON-friendly dict representation of the object
         store_instructions: provides Droid instance with data to store
     """
 
+    # field registry (see compile_entity()): constructor arguments and jsonable() keys, in order
+    fields = ('url', 'name', 'model', 'manufacturer', 'create_year', 'height', 'mass', 'equipment')
+    json_fields = fields + ('instructions',)
+    nested = ()
+    __slots__ = json_fields + ('_version', '_json_cache')
+
     def __init__(self, url, name, model, manufacturer, create_year, height, mass, equipment):
         """Initialize a Droid instance."""
 
@@ -97,6 +147,8 @@ class Droid:
         self.mass = mass
         self.equipment = equipment
         self.instructions = []
+        self._version = 0 # bumped by store_instructions()
+        self._json_cache = None
 
     def __str__(self):
         """Return a string representation of the object."""
@@ -115,10 +167,25 @@ class Droid:
         """
 
         self.instructions.append(instructions)
+        self._version += 1
+
+    def cache_key(self):
+        """Returns the number of < store_instructions() > calls made so far.
+
+        Parameters:
+            None
+
+        Returns:
+            int: cache key (see < cached_jsonable() >)
+        """
+
+        return self._version
 
     def jsonable(self):
-        """Returns a JSON-friendly representation of the object. Use a dictionary literal
-        rather than a built-in dict() to avoid built-in lookup costs. Do not simply return
+        """Returns a JSON-friendly representation of the object. The dictionary literal is
+        generated once from < json_fields > by < compile_entity() > to avoid per-call
+        lookup costs. The result is cached until < store_instructions() > runs (see
+        < cached_jsonable() >) and must be treated as read-only. Do not simply return
         self.__dict__. It can be intercepted and mutated, adding, modifying or removing
         instance attributes as a result.
 
@@ -129,17 +196,7 @@ class Droid:
             dict: dictionary of the object's instance variables
         """
 
-        return {
-            'url': self.url,
-            'name': self.name,
-            'model': self.model,
-            'manufacturer': self.manufacturer,
-            'create_year': self.create_year,
-            'height': self.height,
-            'mass': self.mass,
-            'equipment': self.equipment,
-            'instructions': self.instructions
-       }
+        return cached_jsonable(self)
 
 
 class Passengers:
@@ -151,9 +208,13 @@ class Passengers:
         is described in the < __init__() > method Docstring.
 
     Methods:
+        cache_key: return a token that changes whenever the serialized passengers would change
         jsonable: return JSON-friendly dict representation of the object
     """
 
+    # passengers live in __dict__; the jsonable() cache is kept out of it in a slot
+    __slots__ = ('__dict__', '_json_cache')
+
     def __init__(self, passengers):
         """Initialize Passengers instance. Loops over the passed in list of < Person > and/or
         < Droid >objects and calls the built-in function < setattr() > to generate the instance
@@ -169,6 +230,7 @@ class Passengers:
             None
         """
 
+        self._json_cache = None
         for passenger in passengers:
             setattr(self, passenger.name.lower().replace(' ', '_'), passenger) # call built-in function
 
@@ -185,24 +247,128 @@ class Passengers:
 
         return passengers
 
-    def jsonable(self):
-        """Returns a JSON-friendly representation of the object. Loops over instance variable
-        values and converts passenger < Person > objects to dictionaries. Do not simply return
-        self.__dict__. It can be intercepted and mutated, adding, modifying or removing instance
-        attributes as a result.
+    def cache_key(self):
+        """Returns each passenger paired with the passenger's own cache key.
 
         Parameters:
             None
 
         Returns:
-            dict: dictionary of the object's instance variables
+            tuple: cache key (see < cached_jsonable() >)
         """
+
+        return tuple((val, val.cache_key()) for val in self.__dict__.values())
+
+    def to_dict(self):
+        """Builds the JSON-friendly representation of the passengers (a list, despite the
+        name). Passengers are serialized through their own (cached) < jsonable() >."""
+
         Passengers_list = []
         for val in self.__dict__.values():
-            Passenger = val.jsonable() # person object
-            Passengers_list.append(Passenger.jsonable())
+            Passengers_list.append(val.jsonable()) # person object
         return Passengers_list
 
+    def jsonable(self):
+        """Returns a JSON-friendly representation of the object. Loops over instance variable
+        values and converts passenger < Person > objects to dictionaries. The result is cached
+        until a passenger changes (see < cached_jsonable() >) and must be treated as read-only.
+        Do not simply return self.__dict__. It can be intercepted and mutated, adding,
+        modifying or removing instance attributes as a result.
+
+        Parameters:
+            None
+
+        Returns:
+            list: passenger dictionaries
+        """
+
+        return cached_jsonable(self)
+
+
+class LazyLink:
+    """Unresolved reference from an entity to a SWAPI resource (see
+    < create_person(lazy=True) >). Holds what is needed to fetch and build the entity later:
+    the url, the entity class and the supplemental data and identity map the eager path
+    would have used.
+
+    Attributes:
+        cls (class): Planet or Species
+        url (str): SWAPI url of the resource
+        planets (SupplementStore): supplemental planetary data (homeworlds only)
+        entities (IdentityMap): identity map the entity is interned in
+
+    Methods:
+        resolve: fetch (unless already built) and build the entity
+    """
+
+    __slots__ = ('cls', 'url', 'planets', 'entities')
+
+    def __init__(self, cls, url, planets=None, entities=None):
+        """Initialize a LazyLink instance."""
+
+        self.cls = cls
+        self.url = url
+        self.planets = planets
+        self.entities = entities
+
+    def __repr__(self):
+        """Return a representation naming the class and url."""
+
+        return f"LazyLink({self.cls.__name__}, {self.url!r})"
+
+    def resolve(self, data=None):
+        """Returns the entity the link points at. An instance already interned for the url is
+        reused; otherwise < data > (or the response of < get_swapi_resource() >) is turned into
+        a new one with < create_homeworld() > or < create_clean_species() >.
+
+        Parameters:
+            data (dict): prefetched SWAPI data for the url, if any
+
+        Returns:
+            Planet/Species: resolved entity
+        """
+
+        entities = IdentityMap() if self.entities is None else self.entities
+        entity = entities.get(self.cls, self.url)
+        if entity is not None:
+            return entity
+        if data is None:
+            data = get_swapi_resource(self.url)
+        if self.cls is Planet:
+            return create_homeworld(data, self.planets, entities)
+        return create_clean_species(data, entities)
+
+
+class LazyAttribute:
+    """Descriptor that stores a link in a private slot and resolves it on first access: when
+    the slot holds a LazyLink the resolved entity replaces it, so later reads (and
+    < jsonable() >, < cache_key() >) see the plain entity.
+
+    Attributes:
+        slot (str): name of the slot holding the entity or LazyLink
+    """
+
+    def __init__(self, slot):
+        """Initialize a LazyAttribute instance."""
+
+        self.slot = slot
+
+    def __get__(self, obj, owner=None):
+        """Return the entity, resolving a pending link first."""
+
+        if obj is None:
+            return self
+        val = getattr(obj, self.slot)
+        if isinstance(val, LazyLink):
+            val = val.resolve()
+            setattr(obj, self.slot, val)
+        return val
+
+    def __set__(self, obj, val):
+        """Store an entity, a LazyLink or None."""
+
+        setattr(obj, self.slot, val)
+
 
 class Person:
     """Representation of a person.
@@ -215,10 +381,22 @@ class Person:
         species (list): species of person
 
     Methods:
+        cache_key: return a token that changes whenever the serialized person would change
         get_homeworld: retrieve home planet
         jsonable: return JSON-friendly dict representation of the object
+        link: return the homeworld or species without resolving a pending link
     """
 
+    # field registry (see compile_entity()): constructor arguments and jsonable() keys, in order
+    fields = ('url', 'name', 'birth_year', 'height', 'mass')
+    json_fields = fields + ('homeworld', 'species')
+    nested = ('homeworld', 'species')
+    __slots__ = fields + ('_homeworld', '_species', '_json_cache')
+
+    # resolved on first access when created with create_person(lazy=True)
+    homeworld = LazyAttribute('_homeworld')
+    species = LazyAttribute('_species')
+
     def __init__(self, url, name, birth_year, height, mass):
         """Initialize a Person instance."""
 
@@ -229,17 +407,45 @@ class Person:
         self.mass = mass
         self.homeworld = None
         self.species = None
+        self._json_cache = None
 
     def __str__(self):
         """Return a string representation of the object."""
 
         return self.name
 
+    def cache_key(self):
+        """Returns the homeworld and species instances currently attached to the person.
+
+        Parameters:
+            None
+
+        Returns:
+            tuple: cache key (see < cached_jsonable() >)
+        """
+
+        return (self.homeworld, self.species)
+
+    def link(self, field):
+        """Returns the homeworld or species as stored: the entity, a pending LazyLink or None.
+        Unlike attribute access this never triggers a fetch.
+
+        Parameters:
+            field (str): 'homeworld' or 'species'
+
+        Returns:
+            Planet/Species/LazyLink: stored value
+        """
+
+        return getattr(self, f"_{field}")
+
     def jsonable(self):
-        """Return a JSON-friendly representation of the object. Use a dictionary literal rather
-        than a built-in dict() to avoid built-in lookup costs. Do not simply return self.__dict__.
-        It can be intercepted and mutated, adding, modifying or removing instance attributes as a
-        result.
+        """Return a JSON-friendly representation of the object. The dictionary literal is
+        generated once from < json_fields > by < compile_entity() > to avoid per-call
+        lookup costs. The result is cached until a different homeworld or species is attached
+        (see < cached_jsonable() >) and must be treated as read-only. Do not simply return
+        self.__dict__. It can be intercepted and mutated, adding, modifying or removing
+        instance attributes as a result.
 
         Parameters:
             None
@@ -247,23 +453,8 @@ class Person:
         Returns:
             dict: dictionary of the object's instance variables
         """
-        if self.homeworld:
-            instance_homeworld = self.homeworld.jsonable()
-        else:
-            instance_homeworld = None
-        if self.species:
-            instance_species = self.species.jsonable()
-        else:
-            instance_species = None
-        return {
-            'url': self.url,
-            'name': self.name,
-            'birth_year': self.birth_year,
-            'height': self.height,
-            'mass': self.mass,
-            'homeworld': instance_homeworld,
-            'species': instance_species
-        }
+
+        return cached_jsonable(self) # homeworld and species serialized via their own jsonable()
 
 
 class Planet:
@@ -287,6 +478,13 @@ class Planet:
         jsonable: return JSON-friendly dict representation of the object
     """
 
+    # field registry (see compile_entity()): constructor arguments and jsonable() keys, in order
+    fields = ('url', 'name', 'region', 'sector', 'suns', 'moons', 'orbital_period_days',
+              'diameter_km', 'gravity', 'climate', 'terrain', 'population')
+    json_fields = fields
+    nested = ()
+    __slots__ = json_fields
+
     def __init__(self, url, name, region, sector, suns, moons, orbital_period_days,
                 diameter_km, gravity, climate, terrain, population):
         """Initialize a Planet instance."""
@@ -311,10 +509,10 @@ class Planet:
         return self.name
 
     def jsonable(self):
-        """Return a JSON-friendly representation of the object. Use a dictionary literal rather
-        than built-in dict() to avoid built-in lookup costs. Do not simply return self.__dict__.
-        It can be intercepted and mutated, adding, modifying or removing instance attributes as
-        a result.
+        """Return a JSON-friendly representation of the object. The dictionary literal is
+        generated once from < json_fields > by < compile_entity() > to avoid per-call
+        lookup costs. Do not simply return self.__dict__. It can be intercepted and
+        mutated, adding, modifying or removing instance attributes as a result.
 
         Parameters:
             None
@@ -323,20 +521,7 @@ class Planet:
             dict: dictionary of the object's instance variables
         """
 
-        return {
-                'url': self.url,
-                'name': self.name,
-                'region': self.region,
-                'sector': self.sector,
-                'suns': self.suns,
-                'moons': self.moons,
-                'orbital_period_days': self.orbital_period_days,
-                'diameter_km': self.diameter_km,
-                'gravity': self.gravity,
-                'climate': self.climate,
-                'terrain': self.terrain,
-                'population': self.population
-            }
+        return self.to_dict()
 
 
 class Species:
@@ -353,6 +538,12 @@ class Species:
         jsonable: return JSON-friendly dict representation of the object.
     """
 
+    # field registry (see compile_entity()): constructor arguments and jsonable() keys, in order
+    fields = ('url', 'name', 'classification', 'designation', 'language')
+    json_fields = fields
+    nested = ()
+    __slots__ = json_fields
+
     def __init__(self, url, name, classification, designation, language):
         """Initialize a Species instance."""
 
@@ -368,10 +559,10 @@ class Species:
         return self.name
 
     def jsonable(self):
-        """Return a JSON-friendly representation of the object. Use a dictionary literal rather
-        than a built-in dict() to avoid built-in lookup costs. Do not simply return self.__dict__.
-        It can be intercepted and mutated, adding, modifying or removing instance attributes as
-        a result.
+        """Return a JSON-friendly representation of the object. The dictionary literal is
+        generated once from < json_fields > by < compile_entity() > to avoid per-call
+        lookup costs. Do not simply return self.__dict__. It can be intercepted and
+        mutated, adding, modifying or removing instance attributes as a result.
 
         Parameters:
             None
@@ -380,13 +571,7 @@ class Species:
             dict: dictionary of the object's instance variable values
         """
 
-        return {
-                'url': self.url,
-                'name': self.name,
-                'classification': self.classification,
-                'designation' : self.designation,
-                'language' : self.language
-            }
+        return self.to_dict()
 
 
 class Starship:
@@ -414,9 +599,21 @@ class Starship:
     Methods:
         assign_crew: assign crew members to starship
         assign_passengers: assign passengers to starship
+        cache_key: return a token that changes whenever the serialized starship would change
         jsonable: return JSON-friendly dict representation of the object
     """
 
+    # field registry (see compile_entity()): constructor arguments and jsonable() keys, in order
+    fields = ('url', 'name', 'model', 'starship_class', 'manufacturer', 'length',
+              'max_atmosphering_speed', 'hyperdrive_rating', 'MGLT', 'armament', 'crew',
+              'passengers', 'cargo_capacity', 'consumables')
+    json_fields = ('url', 'name', 'model', 'starship_class', 'manufacturer', 'length',
+                   'max_atmosphering_speed', 'hyperdrive_rating', 'MGLT', 'armament', 'crew',
+                   'crew_members', 'passengers', 'passengers_on_board', 'cargo_capacity',
+                   'consumables')
+    nested = ('crew_members', 'passengers_on_board')
+    __slots__ = json_fields + ('_version', '_json_cache')
+
     def __init__(self, url, name, model, starship_class, manufacturer, length,
                 max_atmosphering_speed, hyperdrive_rating, MGLT, armament, crew,
                 passengers, cargo_capacity, consumables):
@@ -438,6 +635,8 @@ class Starship:
         self.consumables = consumables
         self.crew_members = None
         self.passengers_on_board = None
+        self._version = 0 # bumped by assign_crew_members() and add_passengers()
+        self._json_cache = None
 
     def __str__(self):
         """String representation of the object."""
@@ -455,6 +654,7 @@ class Starship:
         """
         if self.passengers > 0:
             setattr(self, 'passengers_on_board', passengers)
+            self._version += 1
 
     def assign_crew_members(self, crew):
         """Assign crew_members.
@@ -467,12 +667,34 @@ class Starship:
         """
 
         setattr(self, 'crew_members', crew)
+        self._version += 1
+
+    def cache_key(self):
+        """Returns the number of crew and passenger assignments together with the cache keys
+        of the current crew and passengers.
+
+        Parameters:
+            None
+
+        Returns:
+            tuple: cache key (see < cached_jsonable() >)
+        """
+
+        crew = self.crew_members
+        passengers = self.passengers_on_board
+        return (
+            self._version,
+            crew.cache_key() if crew else None,
+            passengers.cache_key() if passengers else None
+        )
 
     def jsonable(self):
-        """Return a JSON-friendly representation of the object. Use a dictionary literal rather
-        than a built-in dict() to avoid built-in lookup costs. Do not simply return self.__dict__.
-        It can be intercepted and mutated, adding, modifying or removing instance attributes as a
-        result.
+        """Return a JSON-friendly representation of the object. The dictionary literal is
+        generated once from < json_fields > by < compile_entity() > to avoid per-call
+        lookup costs. The result is cached until the crew or passengers change (see
+        < cached_jsonable() >) and must be treated as read-only. Do not simply return
+        self.__dict__. It can be intercepted and mutated, adding, modifying or removing
+        instance attributes as a result.
 
         Parameters:
             None
@@ -480,91 +702,451 @@ class Starship:
         Returns:
             dict: dictionary of the object's instance variables
         """
-        if self.crew_members:
-            starship_crew = self.crew_members.jsonable()
+
+        return cached_jsonable(self) # crew and passengers serialized via their own jsonable()
+
+
+def compile_entity(cls):
+    """Generates the specialized < from_dict() > and < to_dict() > functions of an entity class
+    from its field registry and attaches them to the class. < fields > lists the constructor
+    arguments in order, < json_fields > the < jsonable() > keys in order and < nested > the
+    fields whose values are serialized through their own < jsonable() > (None if unset).
+
+    The functions are built from generated source once, at import time, so each call is a
+    single constructor call or dictionary literal with no per-call reflection. For example,
+    Species gets:
+
+        def from_dict(data):
+            return cls(data['url'], data['name'], ...)
+
+        def to_dict(self):
+            return {'url': self.url, 'name': self.name, ...}
+
+    Parameters:
+        cls (class): entity class declaring < fields >, < json_fields > and < nested >
+
+    Returns:
+        class: < cls >
+    """
+
+    args = ', '.join(f"data[{field!r}]" for field in cls.fields)
+    items = []
+    for field in cls.json_fields:
+        if field in cls.nested:
+            items.append(f"{field!r}: self.{field}.jsonable() if self.{field} else None")
         else:
-            starship_crew = None
-        if self.passengers_on_board:
-            starship_passengers = self.passengers_on_board.jsonable()
+            items.append(f"{field!r}: self.{field}")
+    source = (
+        f"def from_dict(data):\n"
+        f"    return cls({args})\n"
+        f"def to_dict(self):\n"
+        f"    return {{{', '.join(items)}}}\n"
+    )
+    namespace = {'cls': cls}
+    exec(compile(source, f"<compile_entity {cls.__name__}>", 'exec'), namespace)
+    cls.from_dict = staticmethod(namespace['from_dict'])
+    cls.to_dict = namespace['to_dict']
+    return cls
+
+
+compile_entity(Droid)
+compile_entity(Person)
+compile_entity(Planet)
+compile_entity(Species)
+compile_entity(Starship)
+
+
+def cached_jsonable(obj):
+    """Returns the memoized < to_dict() > result of an entity, rebuilding it only when the
+    entity's < cache_key() > differs from the key recorded with the cached result. Keys are
+    cheap tokens derived from the version counters bumped by the mutating methods
+    (< Droid.store_instructions() >, < Starship.assign_crew_members() >,
+    < Starship.add_passengers() >) and from the identity and keys of nested members, so a
+    repeated export of a Starship reuses every unchanged subtree (Crew, Person, Passengers,
+    Droid) and re-serializes only what changed.
+
+    Changes made by assigning attributes directly, or by mutating a returned dictionary, are
+    not tracked; call < to_dict() > for a freshly built top level.
+
+    Parameters:
+        obj (object): entity exposing < cache_key() >, < to_dict() > and a < _json_cache > slot
+
+    Returns:
+        dict/list: cached JSON-friendly representation
+    """
+
+    key = obj.cache_key()
+    cache = obj._json_cache
+    if cache is None or cache[0] != key:
+        cache = obj._json_cache = (key, obj.to_dict())
+    return cache[1]
+
+
+def normalized_jsonable(obj, resolve=True):
+    """Returns a normalized JSON-friendly representation of an entity graph. Every nested
+    entity that has a url (Person, Planet, Species, Droid) is written once to a < refs > table
+    keyed by url and replaced in place by a {'$ref': url} reference, so shared homeworlds and
+    species are not repeated for every holder. Crew and Passengers, which have no url, stay
+    inline.
+
+    Parameters:
+        obj (object): entity, Crew or Passengers instance
+        resolve (bool): resolve pending lazy links (see < create_person(lazy=True) >); if
+            False they are written as references without a < refs > entry and nothing is
+            fetched
+
+    Returns:
+        dict: {'data': root representation, 'refs': url -> entity representation}
+    """
+
+    refs = {}
+    return {'data': _normalize(obj, refs, resolve), 'refs': refs}
+
+
+def _normalize(obj, refs, resolve=True):
+    """Builds the representation of < obj > with nested entities replaced by references."""
+
+    if isinstance(obj, Crew):
+        return {key: _reference(val, refs, resolve) for key, val in obj.__dict__.items()}
+    if isinstance(obj, Passengers):
+        return [_reference(val, refs, resolve) for val in obj.__dict__.values()]
+
+    data = {}
+    for field in obj.json_fields:
+        if field in obj.nested:
+            val = getattr(obj, field) if resolve or not hasattr(obj, 'link') else obj.link(field)
+            val = _reference(val, refs, resolve) if val else None
         else:
-            starship_passengers = None
-        return{
-            'url': self.url,
-            'name': self.name,
-            'model': self.model,
-            'starship_class': self.starship_class,
-            'manufacturer': self.manufacturer,
-            'length': self.length,
-            'max_atmosphering_speed': self.max_atmosphering_speed,
-            'hyperdrive_rating': self.hyperdrive_rating,
-            'MGLT': self.MGLT,
-            'armament': self.armament,
-            'crew': self.crew,
-            'crew_members': starship_crew,
-            'passengers': self.passengers,
-            'passengers_on_board': starship_passengers,
-            'cargo_capacity': self.cargo_capacity,
-            'consumables': self.consumables
-        }
-
-
-def clean_data(data):
-    """Convert < data > string values to provided types. < var_types > provides a mapping
-    of an object's instance variables that can be converted from a string to a more
-    appropriate type (e.g., 'float', 'int', 'list'). Each < var_type > key name
-    corresponds to a type while each value is a tuple of instance variable names whose
-    values can be converted.
-
-    For each < data > key-value pair with a value that is not None, the function performs
-    the following operations:
+            val = getattr(obj, field)
+        data[field] = val
+    return data
+
+
+def _reference(obj, refs, resolve=True):
+    """Records < obj > in < refs > and returns a reference to it, or returns its inline
+    representation if it has no url. Pending lazy links become bare references."""
+
+    if isinstance(obj, LazyLink):
+        return {'$ref': obj.url}
+    url = getattr(obj, 'url', None)
+    if not url:
+        return _normalize(obj, refs, resolve)
+    if url not in refs:
+        refs[url] = None # reserve the slot before descending
+        refs[url] = _normalize(obj, refs, resolve)
+    return {'$ref': url}
+
+
+class SupplementStore:
+    """Wookieepedia supplemental records indexed for constant time lookups.
+
+    Attributes:
+        records (list): supplemental records in file order
+        by_name (dict): records keyed by normalized name (see < swapi_keys.name_key() >)
+        by_url (dict): records keyed by url, for records that carry one
+
+    Methods:
+        add: index additional records
+        get: return a record by name or url
+        require: return a copy of a record by name, raising KeyError if there is none
+    """
+
+    def __init__(self, records=None):
+        """Initialize a SupplementStore instance and index the provided records."""
+
+        self.records = []
+        self.by_name = {}
+        self.by_url = {}
+        if records:
+            self.add(records)
+
+    def __getitem__(self, index):
+        """Return the record at the given position in file order."""
+
+        return self.records[index]
+
+    def __iter__(self):
+        """Iterate over the records in file order."""
+
+        return iter(self.records)
+
+    def __len__(self):
+        """Return the number of records."""
+
+        return len(self.records)
+
+    def add(self, records):
+        """Appends records to the store and indexes each one by name and url. When two
+        records share a name or url the first one wins, matching a linear scan.
+
+        Parameters:
+            records (iterable): supplemental record dictionaries
+
+        Returns:
+            None
+        """
+
+        for record in records:
+            self.records.append(record)
+            if record.get('name'):
+                self.by_name.setdefault(swapi_keys.name_key(record['name']), record)
+            if record.get('url'):
+                self.by_url.setdefault(record['url'], record)
+
+    def get(self, name=None, url=None):
+        """Returns the record matching < url > or, failing that, < name >. Names are
+        compared after normalization so 'BB8' matches 'BB-8'.
+
+        Parameters:
+            name (str): record name
+            url (str): record url
+
+        Returns:
+            dict: matching record or None
+        """
+
+        if url and url in self.by_url:
+            return self.by_url[url]
+        if name:
+            return self.by_name.get(swapi_keys.name_key(name))
+        return None
+
+    def require(self, name):
+        """Returns a copy of the record matching < name > (see < get() >). The copy may be
+        updated freely without altering the memoized store (see < load_supplements() >).
+
+        Parameters:
+            name (str): record name
+
+        Returns:
+            dict: copy of the matching record
+
+        Raises:
+            KeyError: if no record matches < name >
+        """
+
+        record = self.get(name)
+        if record is None:
+            raise KeyError(f"no supplemental record named {name!r}")
+        return dict(record)
+
+
+class IdentityMap:
+    """Entity instances keyed by class and SWAPI url, so that a resource shared by many
+    entities (e.g., Tatooine as the homeworld of a dozen people, or the Human species) is
+    fetched, cleaned and built once and every holder references the same instance. The first
+    instance registered for a url wins; entities without a url are never interned. Interning
+    is opt-in: create a map per run (see < main() >) and pass it to < create_person() > and
+    friends, so later runs never see instances built with other data.
+
+    Attributes:
+        entities (dict): (class, url) -> instance
+
+    Methods:
+        add: register an instance, returning the one already registered for its url if any
+        clear: forget every registered instance
+        get: return the instance registered for a url
+    """
+
+    def __init__(self):
+        """Initialize an empty IdentityMap instance."""
+
+        self.entities = {}
+
+    def __contains__(self, key):
+        """Return True if a (class, url) key is registered."""
+
+        return key in self.entities
+
+    def __len__(self):
+        """Return the number of registered instances."""
+
+        return len(self.entities)
+
+    def add(self, entity):
+        """Registers < entity > under its class and url.
+
+        Parameters:
+            entity (object): entity instance with a < url > attribute
+
+        Returns:
+            object: the instance registered for the url, which is < entity > unless another
+                instance was registered first
+        """
+
+        if not entity.url:
+            return entity
+        return self.entities.setdefault((type(entity), entity.url), entity)
+
+    def clear(self):
+        """Forgets every registered instance.
+
+        Parameters:
+            None
+
+        Returns:
+            None
+        """
+
+        self.entities.clear()
+
+    def get(self, cls, url):
+        """Returns the < cls > instance registered for < url >.
+
+        Parameters:
+            cls (class): entity class (e.g., Planet)
+            url (str): SWAPI url
+
+        Returns:
+            object: registered instance or None
+        """
+
+        if not url:
+            return None
+        return self.entities.get((cls, url))
+
+
+def split_list(value):
+    """Splits a string into a list. The delimiter is assumed to be ', '.
+
+    Parameters:
+        value (str): delimited string
+
+    Returns:
+        list: substrings
+    """
+
+    return value.split(', ')
+
+
+# type name (as used in < VAR_TYPES >) -> converter function
+CONVERTERS = {
+    'float': float,
+    'int': int,
+    'list': split_list
+}
+
+SCHEMAS = {} # schema name -> compiled schema, see register_schema()
+
+
+def compile_schema(var_types):
+    """Compiles a < var_types > style mapping (type name -> tuple of instance variable names)
+    into a dispatch table that maps each instance variable name directly to its converter
+    function. If a name is listed under more than one type the first type wins.
+
+    Parameters:
+        var_types (dict): type name -> tuple of instance variable names
+
+    Returns:
+        dict: instance variable name -> converter function
+    """
+
+    schema = {}
+    for type_name, keys in var_types.items():
+        converter = CONVERTERS[type_name]
+        for key in keys:
+            schema.setdefault(key, converter)
+    return schema
+
+
+def register_schema(name, var_types):
+    """Compiles < var_types > and registers the result under < name > for use by
+    < clean_data() >.
+
+    Parameters:
+        name (str): schema name (e.g., 'planet')
+        var_types (dict): type name -> tuple of instance variable names
+
+    Returns:
+        dict: the compiled schema
+    """
+
+    schema = SCHEMAS[name] = compile_schema(var_types)
+    return schema
+
+
+register_schema('default', VAR_TYPES)
+register_schema('droid', {
+    'float': ('height', 'mass'),
+    'list': ('equipment',)
+})
+register_schema('person', {
+    'float': ('height', 'mass')
+})
+register_schema('planet', {
+    'float': ('orbital_period_days',),
+    'int': ('diameter_km', 'moons', 'population', 'suns'),
+    'list': ('climate', 'terrain')
+})
+register_schema('species', {})
+register_schema('starship', {
+    'float': ('hyperdrive_rating', 'length'),
+    'int': ('cargo_capacity', 'crew', 'max_atmosphering_speed', 'MGLT', 'passengers'),
+    'list': ('armament',)
+})
+
+
+def clean_data(data, schema='default'):
+    """Convert < data > string values to provided types. The conversions are described by a
+    compiled schema (see < compile_schema() >) that maps each convertible instance variable
+    name straight to its converter, so cleaning costs one dictionary lookup per key. The
+    'default' schema covers every entity; entity-specific schemas ('droid', 'person',
+    'planet', 'species', 'starship') are registered with < register_schema() >.
+
+    For each < data > key-value pair the function performs the following operations:
         1. Checks if value is a string (use isinstance(val, str))
-        2. if the string value is "n/a", "none", or "unknown" the value is converted to None.
-        3. Checks if < var_types > has key (e.g., if 'float' in var_types.keys()) and if
-           < data > key can be found in the < var_type > key's tuple values. If the membership
-           check returns True the corresponding value is converted to the type specified by the
-           < var_type > key name (e.g. 'float').
-        3. When splitting strings into lists the delimiter is assumed to be ', '.
+        2. if the string value is "n/a", "none", "unknown" or empty the value is converted to None.
+        3. Otherwise, if the schema has a converter for the key the value is converted by it.
+        4. When splitting strings into lists the delimiter is assumed to be ', '.
 
     Parameters:
         data (dict): string values to convert
+        schema (str)/(dict): registered schema name or a compiled schema
 
     Returns
         dict: updated key-value pairs
     """
 
-    # key-value pairs that map a tuple of instance variable names to a given type (the key name)
-    var_types = {
-        'float': ('height', 'hyperdrive_rating', 'length', 'mass', 'orbital_period_days'),
-        'int': ('cargo_capacity', 'crew', 'diameter_km', 'max_atmosphering_speed', 'moons', 'MGLT', 'passengers', 'population', 'suns'),
-        'list': ('armament', 'climate', 'equipment', 'terrain')
-    }
+    converters = SCHEMAS[schema] if isinstance(schema, str) else schema
+    null_values = NULL_VALUES
 
     cleaned = {}
     for key, val in data.items():
         if isinstance(val, str):
-            if val in ('n/a', 'none', 'unknown', ''):
-                val = None
-                cleaned[key] = val
-            elif key in var_types['float']:
-                val = float(val)
-                cleaned[key] = float(val)
-            elif key in var_types['int']:
-                val = int(val)
-                cleaned[key] = int(val)
-                continue
-            elif key in var_types['list']:
-                val = val.split(', ')
-                cleaned[key] = val
-                continue
+            if val in null_values:
+                cleaned[key] = None
             else:
-                cleaned[key] = val
-
+                converter = converters.get(key)
+                cleaned[key] = converter(val) if converter else val
         else:
             cleaned[key] = val # non str key-value pairs
-            continue
     return cleaned
 
 
+def enrich_data(data, supplements=None, schema=None):
+    """Returns a copy of SWAPI < data > merged with its Wookieepedia supplement (matched by
+    name) and, if < schema > is given, updated with its cleaned values. < data > itself is
+    not modified.
+
+    Parameters:
+        data (dict): SWAPI record
+        supplements (SupplementStore): supplemental records
+        schema (str)/(dict): registered schema name or compiled schema passed to
+            < clean_data() >; None skips cleaning
+
+    Returns:
+        dict: merged (and cleaned) record
+    """
+
+    data = dict(data)
+    supplement = supplements.get(data['name']) if supplements else None
+    if supplement:
+        data.update(supplement)
+    if schema:
+        data.update(clean_data(data, schema))
+    return data
+
+
 def create_droid(data):
     """Creates a Droid instance from dictionary data, converting string values to the appropriate
     type whenever possible. Adding special instructions constitutes a seperate operation.
@@ -576,48 +1158,150 @@ def create_droid(data):
         Droid: new Droid instance
     """
 
-    Droid_instance = Droid(data['url'], data['name'], data['model'], data['manufacturer'], data['create_year'], data['height'], data['mass'], data['equipment'])
-    return Droid_instance
+    return Droid.from_dict(data)
 
-def create_person(data, planets=None):
+def create_person(data, planets=None, entities=None, lazy=False):
     """Creates a Person instance from dictionary data, converting string values to the appropriate
     type whenever possible. Calls < get_swapi_resource() > to retrieve homeworld and species data.
     Calls < create_planet() > and < create_species() > to add homeworld and species objects to the
     person instance.
 
+    People, homeworlds and species are interned in < entities > by url: a person, planet or
+    species that was already built is reused instead of being fetched and built again.
+
+    With < lazy > set, homeworld and species that are not interned yet are attached as
+    LazyLink instances and only fetched when the attribute is first read (or in bulk with
+    < prefetch_links() >), so callers that never touch them skip the requests.
+
     Parameters:
         data (dict): source data
-        planets (list): supplemental planetary data
+        planets (SupplementStore): supplemental planetary data
+        entities (IdentityMap): identity map to intern in; None builds everything afresh
+        lazy (bool): defer the homeworld and species requests
 
     Returns:
-        Person: new Person instance
+        Person: new Person instance, or the instance already built for the person's url
     """
 
+    if entities is None:
+        entities = IdentityMap() # no interning across calls
+    person_instance = entities.get(Person, data.get('url'))
+    if person_instance is not None:
+        return person_instance
+
     # Instantiate person
 
-    person_instance = Person(data['url'], data['name'], data['birth_year'], data['height'], data['mass'])
+    person_instance = Person.from_dict(data)
 
     # Get, combine, clean data, and instantiate Planet instance
 
     if data.get('homeworld'):
-        homeworld_data = get_swapi_resource(data['homeworld'])
-        if planets:
-            planet_data = get_wookieepedia_planet(planets, homeworld_data['name'])
-        if planet_data:
-            homeworld_data.update(planet_data)
-            clean_hw = clean_data(homeworld_data)
-            homeworld_data.update(clean_hw)
-        person_instance.homeworld = create_planet(homeworld_data)
+        homeworld = entities.get(Planet, data['homeworld'])
+        if homeworld is None and lazy:
+            homeworld = LazyLink(Planet, data['homeworld'], planets, entities)
+        elif homeworld is None:
+            homeworld_data = get_swapi_resource(data['homeworld'])
+            homeworld = create_homeworld(homeworld_data, planets, entities)
+        person_instance.homeworld = homeworld
 
     # Get, clean data, and instantiate a new Species instance
 
-    if 'species' in data.keys():
-        species_data = get_swapi_resource(data['species'][0])
-        clean_sp = clean_data(species_data)
-        species_data.update(clean_sp)
-        person_instance.species = create_species(species_data)
+    if data.get('species'):
+        species = entities.get(Species, data['species'][0])
+        if species is None and lazy:
+            species = LazyLink(Species, data['species'][0], None, entities)
+        elif species is None:
+            species_data = get_swapi_resource(data['species'][0])
+            species = create_clean_species(species_data, entities)
+        person_instance.species = species
+
+    return entities.add(person_instance)
+
+
+def create_homeworld(data, planets=None, entities=None):
+    """Creates a Planet instance from SWAPI homeworld data. If supplemental Wookieepedia data
+    is available for the planet it is merged into < data > and the combined values are cleaned
+    before the Planet is instantiated.
+
+    Parameters:
+        data (dict): SWAPI planet data
+        planets (SupplementStore): supplemental planetary data
+        entities (IdentityMap): identity map to intern in; None builds everything afresh
+
+    Returns:
+        Planet: new Planet instance, or the instance already built for the planet's url
+    """
+
+    if entities is None:
+        entities = IdentityMap() # no interning across calls
+    planet = entities.get(Planet, data.get('url'))
+    if planet is not None:
+        return planet
+
+    planet_data = None
+    if planets:
+        planet_data = get_wookieepedia_planet(planets, data['name'])
+    if planet_data:
+        data.update(planet_data)
+        clean_hw = clean_data(data, 'planet')
+        data.update(clean_hw)
+    return entities.add(create_planet(data))
+
+
+def create_clean_species(data, entities=None):
+    """Cleans SWAPI species data and returns a new Species instance.
+
+    Parameters:
+        data (dict): SWAPI species data
+        entities (IdentityMap): identity map to intern in; None builds everything afresh
+
+    Returns:
+        Species: new Species instance, or the instance already built for the species' url
+    """
+
+    if entities is None:
+        entities = IdentityMap() # no interning across calls
+    species = entities.get(Species, data.get('url'))
+    if species is not None:
+        return species
 
-    return person_instance
+    clean_sp = clean_data(data, 'species')
+    data.update(clean_sp)
+    return entities.add(create_species(data))
+
+
+def prefetch_links(people, max_workers=PREFETCH_WORKERS):
+    """Resolves the pending homeworld and species links (see < create_person(lazy=True) >) of
+    a batch of people at once. Links to resources not interned yet are deduplicated by url and
+    fetched concurrently, then every link is resolved from the fetched data, so a homeworld
+    shared by many people costs a single request.
+
+    Parameters:
+        people (iterable): Person instances
+        max_workers (int): maximum number of requests in flight
+
+    Returns:
+        int: number of resources fetched
+    """
+
+    pending = [(person, field, person.link(field)) for person in people
+               for field in Person.nested if isinstance(person.link(field), LazyLink)]
+    urls = list(dict.fromkeys(
+        link.url for _, _, link in pending
+        if link.entities is None or link.entities.get(link.cls, link.url) is None
+    ))
+    resources = {}
+    if urls:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(urls))) as executor:
+            resources = dict(zip(urls, executor.map(get_swapi_resource, urls)))
+    resolved = {} # links without an identity map still share one instance per url
+    for person, field, link in pending:
+        key = (link.cls, link.url, id(link.entities))
+        if key not in resolved:
+            data = resources.get(link.url)
+            resolved[key] = link.resolve(dict(data) if data is not None else None)
+        setattr(person, field, resolved[key])
+    return len(urls)
 
 
 def create_planet(data):
@@ -631,8 +1315,7 @@ def create_planet(data):
         Planet: new Planet instance
     """
 
-    Planet_instance = Planet(data['url'], data['name'], data['region'], data['sector'], data['suns'], data['moons'], data['orbital_period_days'], data['diameter_km'], data['gravity'], data['climate'], data['terrain'], data['population'])
-    return Planet_instance
+    return Planet.from_dict(data)
 
 
 def create_species(data):
@@ -645,8 +1328,7 @@ def create_species(data):
         Species: new Species instance
     """
 
-    Species_instance = Species(data['url'], data['name'], data['classification'], data['designation'], data['language'])
-    return Species_instance
+    return Species.from_dict(data)
 
 
 
@@ -662,14 +1344,15 @@ def create_starship(data):
         starship: a new Starship instance
     """
 
-    starship_instance = Starship(data['url'], data['name'], data['model'], data['starship_class'], data['manufacturer'], data['length'], data['max_atmosphering_speed'], data['hyperdrive_rating'], data['MGLT'], data['armament'], data['crew'], data['passengers'], data['cargo_capacity'], data['consumables'])
-    return starship_instance
+    return Starship.from_dict(data)
 
 
 def get_swapi_resource(url, params=None, timeout=10):
     """This function initiates an HTTP GET request to the SWAPI service in order to return a
     representation of a resource. <params> is not included in the request if no params is passed to this
     function during the function call. Once a response is received, it is converted to a python dict.
+    Requests are sent through the shared pooled session in < swapi_client > so that connections are
+    reused across calls.
 
     Parameters:
         url (str): a url that specifies the resource.
@@ -681,9 +1364,9 @@ def get_swapi_resource(url, params=None, timeout=10):
     """
 
     if params:
-        data = requests.get(url, params).json() # pass search parameters as 2nd argument
+        data = swapi_client.fetch_json(url, params, timeout) # pass search parameters as 2nd argument
     else:
-        data = requests.get(url + '/').json()
+        data = swapi_client.fetch_json(url + '/', timeout=timeout)
     return data
 
 
@@ -692,13 +1375,15 @@ def get_wookieepedia_planet(planets, name):
     name.
 
     Parameters:
-        planets (list): list of planet dictionarys
+        planets (list)/(SupplementStore): list of planet dictionarys or an indexed store
         name (str): name of planet to locate
 
     Returns:
         dict: planet dictionary
     """
 
+    if isinstance(planets, SupplementStore):
+        return planets.get(name) # hash lookup rather than a scan
     for planet in planets:
         if planet['name'] == name:
             return planet
@@ -706,9 +1391,30 @@ def get_wookieepedia_planet(planets, name):
             continue
 
 
+def load_supplements(filepath):
+    """Returns a SupplementStore holding the records of a Wookieepedia CSV, JSON array or
+    NDJSON file. Records are streamed from disk straight into the index (see
+    < swapi_stream.iter_records() >) rather than decoded into an intermediate list first.
+    Each file is read and indexed once; later calls for the same path return the same store.
+
+    Parameters:
+        filepath (str): path to a .csv, .json, .ndjson or .jsonl file
+
+    Returns:
+        SupplementStore: indexed supplemental records
+    """
+
+    key = os.path.abspath(filepath)
+    store = _supplement_stores.get(key)
+    if store is None:
+        store = _supplement_stores[key] = SupplementStore(swapi_stream.iter_records(filepath))
+    return store
+
+
 def read_csv_into_dicts(filepath, delimiter=','):
     """Accepts a file path, creates a file object, and returns a list of
-    dictionaries that represent the row values using the cvs.DictReader().
+    dictionaries that represent the row values using the cvs.DictReader(). To process rows
+    one at a time use < swapi_stream.iter_csv_dicts() >.
 
     Parameters:
         filepath (str): path to file
@@ -725,7 +1431,8 @@ def read_csv_into_dicts(filepath, delimiter=','):
 
 def read_json(filepath):
     """Reads a JSON document, decodes the file content, and returns a list or dictionary if
-    provided with a valid filepath.
+    provided with a valid filepath. To decode a large array element by element use
+    < swapi_stream.iter_json_array() >.
 
     Parameters:
         filepath (str): path to file.
@@ -738,25 +1445,36 @@ def read_json(filepath):
         return json.load(file_obj)
 
 
-def write_json(filepath, data):
-    """Serializes object as JSON. Writes content to the provided filepath.
+def write_json(filepath, data, compact=False):
+    """Serializes object as JSON. Writes content to the provided filepath. To export large
+    collections without building them in memory use < swapi_stream.write_json_stream() >; to
+    write shared homeworlds and species once, pass < normalized_jsonable() > output.
 
     Parameters:
         filepath (str): the path to the file.
         data (dict)/(list): the data to be encoded as JSON and written to the file.
+        compact (bool): if True, omit indentation and separator whitespace
 
     Returns:
         None
     """
 
     with open(filepath, 'w', encoding='utf-8') as file_obj:
-        json.dump(data, file_obj, ensure_ascii=False, indent=2)
+        if compact:
+            json.dump(data, file_obj, ensure_ascii=False, separators=(',', ':'))
+        else:
+            json.dump(data, file_obj, ensure_ascii=False, indent=2)
 
 
 def main():
     """Entry point for program."""
 
-    endpoint = 'https://swapi.py4e.com/api'
+    endpoint = swapi_client.ENDPOINT # override with the SWAPI_ENDPOINT environment variable
+    entities = IdentityMap() # people, homeworlds and species shared within this run only
+
+    # SWAPI_SEARCH_INDEX=<mirror snapshot> answers the ?search= queries below locally
+    import swapi_search # deferred: swapi_search imports this module
+    swapi_search.load_configured_index()
 
     # ABSOLUTE PATH (VS CODE DEBUGGER-FRIENDLY)
     # WARN: autograder does not require absolute paths
@@ -771,42 +1489,42 @@ def main():
 
 
     # CHALLENGE 02 SPECIES
-    wookiee_data = get_swapi_resource("https://swapi.py4e.com/api/species/", params={'search':'wookiee'})['results'][0]
+    wookiee_data = get_swapi_resource(f"{endpoint}/species/", params={'search':'wookiee'})['results'][0]
     Wookiee = create_species(wookiee_data)
     filepath_wookiee = 'stu_swapi_species_wookiee.json'
     write_json(filepath_wookiee, Wookiee.jsonable())
 
     # CHALLENGE 03 PLANET
-    hoth_data = get_swapi_resource('https://swapi.py4e.com/api/planets/', params={'search':'hoth'})['results'][0]
-    wookiee_planets = read_csv_into_dicts('./wookieepedia_planets.csv')
-    hoth_data.update(wookiee_planets[5])
+    hoth_data = get_swapi_resource(f"{endpoint}/planets/", params={'search':'hoth'})['results'][0]
+    wookiee_planets = load_supplements('./wookieepedia_planets.csv')
+    hoth_data.update(wookiee_planets.require(hoth_data['name']))
     hoth = create_planet(hoth_data)
     filepath_hoth = 'stu_swapi_planet_hoth.json'
     write_json(filepath_hoth, hoth.jsonable())
 
     # CHALLENGE 04 DROID
-    r2_d2_data = get_swapi_resource('https://swapi.py4e.com/api/people/', params={'search': 'r2-d2'})['results'][0]
-    wookiee_droids = read_json('./wookieepedia_droids.json')
-    r2_d2_data.update(wookiee_droids[-1])
+    r2_d2_data = get_swapi_resource(f"{endpoint}/people/", params={'search': 'r2-d2'})['results'][0]
+    wookiee_droids = load_supplements('./wookieepedia_droids.json')
+    r2_d2_data.update(wookiee_droids.require(r2_d2_data['name']))
     r2_d2 = create_droid(r2_d2_data)
     filepath_r2 = 'stu_swapi_droid_r2_d2.json'
     write_json(filepath_r2, r2_d2.jsonable())
 
     # CHALLENGE 05 PERSON
 
-    leia_data = get_swapi_resource('https://swapi.py4e.com/api/people/', params={'search': 'Leia'})['results'][0]
-    wookiee_people = read_json('./wookieepedia_people.json')
-    leia_data.update(wookiee_people[4])
-    leia = create_person(leia_data, wookiee_planets)
+    leia_data = get_swapi_resource(f"{endpoint}/people/", params={'search': 'Leia'})['results'][0]
+    wookiee_people = load_supplements('./wookieepedia_people.json')
+    leia_data.update(wookiee_people.require(leia_data['name']))
+    leia = create_person(leia_data, wookiee_planets, entities)
     filepath_leia = 'stu_swapi_person_leia.json'
     write_json(filepath_leia, leia.jsonable())
 
 
     # CHALLENGE 07 STARSHIP
 
-    x_wing_data = get_swapi_resource('https://swapi.py4e.com/api/starships/', params={'search': 'T-70 X-wing'})['results'][0]
-    wookiee_starships = read_csv_into_dicts('./wookieepedia_starships.csv')
-    x_wing_data.update(wookiee_starships[1])
+    x_wing_data = get_swapi_resource(f"{endpoint}/starships/", params={'search': 'T-70 X-wing'})['results'][0]
+    wookiee_starships = load_supplements('./wookieepedia_starships.csv')
+    x_wing_data.update(wookiee_starships.require(x_wing_data['name']))
     x_wing = create_starship(x_wing_data)
     filepath_xwing = 'stu_swapi_starship_x_wing.json'
     write_json(filepath_xwing, x_wing.jsonable())
@@ -821,20 +1539,20 @@ def main():
 
     # CHALLENGE 09. MISSION TO JAKKU
 
-    poe_data = get_swapi_resource('https://swapi.py4e.com/api/people/', params={'search': 'Poe Dameron'})['results'][0]
-    poe_data.update(wookiee_people[6])
+    poe_data = get_swapi_resource(f"{endpoint}/people/", params={'search': 'Poe Dameron'})['results'][0]
+    poe_data.update(wookiee_people.require(poe_data['name']))
     poe_clean = clean_data(poe_data)
     poe_data.update(poe_clean)
-    poe = create_person(poe_data, wookiee_planets)
+    poe = create_person(poe_data, wookiee_planets, entities)
 
-    bb8_data = get_swapi_resource('https://swapi.py4e.com/api/people/', params={'search': 'BB8'})['results'][0]
-    bb8_data.update(wookiee_droids[0])
+    bb8_data = get_swapi_resource(f"{endpoint}/people/", params={'search': 'BB8'})['results'][0]
+    bb8_data.update(wookiee_droids.require(bb8_data['name']))
     bb8_clean = clean_data(bb8_data)
     bb8_data.update(bb8_clean)
     bb8 = create_droid(bb8_data)
     
-    jakku_data = get_swapi_resource('https://swapi.py4e.com/api/planets/', params={'search': 'jakku'})['results'][0]
-    jakku_data.update(wookiee_planets[7])
+    jakku_data = get_swapi_resource(f"{endpoint}/planets/", params={'search': 'jakku'})['results'][0]
+    jakku_data.update(wookiee_planets.require(jakku_data['name']))
     jakku_clean = clean_data(jakku_data)
     jakku_data.update(jakku_clean)
     jakku = create_planet(jakku_data)
@@ -849,10 +1567,10 @@ def main():
 
     bb8.store_instructions(flight_plan)
 
-    lor_data = (wookiee_people[5])
+    lor_data = wookiee_people.require('Lor San Tekka') # Wookieepedia only, not in SWAPI
     lor_clean = clean_data(lor_data)
     lor_data.update(lor_clean)
-    lor = create_person(lor_data, wookiee_planets)
+    lor = create_person(lor_data, wookiee_planets, entities)
 
     lor_instructions = {
         'locate_person': lor.jsonable()
@@ -882,20 +1600,20 @@ def main():
 
     # CHALLENGE 11 ESCAPE FROM JAKKU
 
-    rey_data = get_swapi_resource('https://swapi.py4e.com/api/people/', params={'search': 'Rey'})['results'][0]
-    rey_data.update(wookiee_people[7])
+    rey_data = get_swapi_resource(f"{endpoint}/people/", params={'search': 'Rey'})['results'][0]
+    rey_data.update(wookiee_people.require(rey_data['name']))
     clean_rey = clean_data(rey_data)
     rey_data.update(clean_rey)
-    rey = create_person(rey_data, wookiee_planets)
+    rey = create_person(rey_data, wookiee_planets, entities)
 
-    finn_data = get_swapi_resource('https://swapi.py4e.com/api/people/', params={'search': 'Finn'})['results'][0]
-    finn_data.update(wookiee_people[1])
+    finn_data = get_swapi_resource(f"{endpoint}/people/", params={'search': 'Finn'})['results'][0]
+    finn_data.update(wookiee_people.require(finn_data['name']))
     clean_finn = clean_data(finn_data)
     finn_data.update(clean_finn)
-    finn = create_person(finn_data, wookiee_planets)
+    finn = create_person(finn_data, wookiee_planets, entities)
 
-    m_falcon_data = get_swapi_resource('https://swapi.py4e.com/api/starships/', params={'search': 'Millennium Falcon'})['results'][0]
-    m_falcon_data.update(wookiee_starships[4])
+    m_falcon_data = get_swapi_resource(f"{endpoint}/starships/", params={'search': 'Millennium Falcon'})['results'][0]
+    m_falcon_data.update(wookiee_starships.require(m_falcon_data['name']))
     clean_falcon = clean_data(m_falcon_data)
     m_falcon_data.update(clean_falcon)
     m_falcon = create_starship(m_falcon_data)
@@ -912,17 +1630,17 @@ def main():
 
     # CHALLENGE 12 JOURNEY TO TAKODANA
 
-    han_solo_data = get_swapi_resource('https://swapi.py4e.com/api/people/', params={'search': 'Han Solo'})['results'][0]
-    han_solo_data.update(wookiee_people[2])
+    han_solo_data = get_swapi_resource(f"{endpoint}/people/", params={'search': 'Han Solo'})['results'][0]
+    han_solo_data.update(wookiee_people.require(han_solo_data['name']))
     clean_han = clean_data(han_solo_data)
     han_solo_data.update(clean_han)
-    han_solo = create_person(han_solo_data, wookiee_planets)
+    han_solo = create_person(han_solo_data, wookiee_planets, entities)
 
-    chewie_data = get_swapi_resource('https://swapi.py4e.com/api/people/', params={'search': 'Chewbacca'})['results'][0]
-    chewie_data.update(wookiee_people[0])
+    chewie_data = get_swapi_resource(f"{endpoint}/people/", params={'search': 'Chewbacca'})['results'][0]
+    chewie_data.update(wookiee_people.require(chewie_data['name']))
     clean_chewie = clean_data(chewie_data)
     chewie_data.update(clean_chewie)
-    chewie = create_person(chewie_data, wookiee_planets)
+    chewie = create_person(chewie_data, wookiee_planets, entities)
 
     m_falcon_crew = Crew({'pilot': han_solo, 'co-pilot': chewie})
     m_falcon.assign_crew_members(m_falcon_crew)
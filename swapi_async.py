@@ -0,0 +1,423 @@
+"""Async SWAPI client and create_* factories. Requests are thread-offloaded: each one is a
+blocking < swapi.get_swapi_resource() > call run with < asyncio.to_thread() >, so coroutines
+share the pooled session and response cache of the synchronous client while the event loop
+overlaps up to < MAX_CONCURRENCY > of them."""
+
+import asyncio
+import copy
+import os
+import weakref
+
+import swapi
+import swapi_client
+import swapi_search
+
+
+MAX_CONCURRENCY = 8 # max SWAPI requests in flight per event loop
+
+_semaphores = weakref.WeakKeyDictionary()
+_flights = weakref.WeakKeyDictionary()
+
+
+class AsyncSingleFlight:
+    """Coalesces duplicate concurrent coroutine calls within one event loop. The first
+    caller for a key starts the coroutine as a task of its own; callers arriving while it is
+    pending await the same task instead of starting their own request. Every caller awaits
+    the task through < asyncio.shield() >, so a cancelled caller leaves the others waiting;
+    the task itself is cancelled only once every caller has been.
+
+    Attributes:
+        coalesced (int): number of calls answered by another caller's in-flight work
+
+    Methods:
+        do: run or join the call registered under a key
+    """
+
+    def __init__(self):
+        """Initialize an AsyncSingleFlight instance."""
+
+        self.coalesced = 0
+        self._calls = {} # key -> [task, number of callers still waiting]
+
+    async def do(self, key, func, *args):
+        """Awaits < func(*args) > unless a call for < key > is already pending, in which case
+        its result is awaited instead. Every caller but the last to resume receives its own
+        deep copy of the result, so no caller sees another's changes.
+
+        Parameters:
+            key (str): identifies duplicate calls
+            func (coroutine function): the coroutine function to run
+            *args: positional arguments passed to < func >
+
+        Returns:
+            object: the result of < func >
+        """
+
+        call = self._calls.get(key)
+        if call is None:
+            task = asyncio.ensure_future(func(*args))
+            call = self._calls[key] = [task, 0]
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self.coalesced += 1
+        task = call[0]
+        call[1] += 1
+        try:
+            result = await asyncio.shield(task)
+        except asyncio.CancelledError:
+            call[1] -= 1
+            if call[1] == 0 and not task.done(): # nobody is left to receive the result
+                task.cancel()
+            raise
+        call[1] -= 1
+        return result if call[1] == 0 else copy.deepcopy(result)
+
+    def _forget(self, key, task):
+        """Unregisters a finished call, so the next call for < key > starts a new one."""
+
+        call = self._calls.get(key)
+        if call is not None and call[0] is task:
+            del self._calls[key]
+
+
+def _get_semaphore():
+    """Returns the request semaphore bound to the running event loop, creating it on first
+    use. Semaphores are kept per loop because an asyncio primitive cannot be shared across
+    loops (e.g., between two < asyncio.run() > calls).
+
+    Parameters:
+        None
+
+    Returns:
+        Semaphore: semaphore limiting concurrent requests to < MAX_CONCURRENCY >
+    """
+
+    loop = asyncio.get_running_loop()
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _semaphores[loop] = asyncio.Semaphore(MAX_CONCURRENCY)
+    return semaphore
+
+
+def _get_flight():
+    """Returns the < AsyncSingleFlight > bound to the running event loop, creating it on first
+    use.
+
+    Parameters:
+        None
+
+    Returns:
+        AsyncSingleFlight: request coalescer for the running loop
+    """
+
+    loop = asyncio.get_running_loop()
+    flight = _flights.get(loop)
+    if flight is None:
+        flight = _flights[loop] = AsyncSingleFlight()
+    return flight
+
+
+async def get_swapi_resource(url, params=None, timeout=10):
+    """Async variant of < swapi.get_swapi_resource() >. The blocking request runs on a worker
+    thread so it shares the pooled session and response cache of the synchronous client while
+    the event loop stays free to schedule other requests. At most < MAX_CONCURRENCY > requests
+    are in flight at once, and concurrent requests for the same url and params share a single
+    fetch.
+
+    Parameters:
+        url (str): a url that specifies the resource.
+        params (dict): optional dictionary of querystring arguments.
+        timeout (int): timeout value in seconds
+
+    Returns:
+        dict: dictionary representation of the decoded JSON.
+    """
+
+    key = swapi_client.cache_key(url, params)
+    return await _get_flight().do(key, _fetch, url, params, timeout)
+
+
+async def _fetch(url, params, timeout):
+    """Runs the blocking < swapi.get_swapi_resource() > on a worker thread."""
+
+    async with _get_semaphore():
+        return await asyncio.to_thread(swapi.get_swapi_resource, url, params, timeout)
+
+
+async def get_first_result(url, search):
+    """Runs a SWAPI search and returns the first match.
+
+    Parameters:
+        url (str): collection url (e.g., 'https://swapi.py4e.com/api/people/')
+        search (str): search term
+
+    Returns:
+        dict: first search result
+    """
+
+    payload = await get_swapi_resource(url, params={'search': search})
+    return payload['results'][0]
+
+
+async def _get_optional(url):
+    """Returns the resource at < url > or None if no url is provided."""
+
+    if not url:
+        return None
+    return await get_swapi_resource(url)
+
+
+async def create_person(data, planets=None, entities=None):
+    """Async variant of < swapi.create_person() >. The homeworld and species requests do not
+    depend on each other so they are issued concurrently with < asyncio.gather() >. Instances
+    already interned in < entities > are reused and their requests skipped.
+
+    Parameters:
+        data (dict): source data
+        planets (SupplementStore): supplemental planetary data
+        entities (IdentityMap): identity map to intern in; None builds everything afresh
+
+    Returns:
+        Person: new Person instance, or the instance already built for the person's url
+    """
+
+    if entities is None:
+        entities = swapi.IdentityMap() # no interning across calls
+    person_instance = entities.get(swapi.Person, data.get('url'))
+    if person_instance is not None:
+        return person_instance
+
+    person_instance = swapi.Person.from_dict(data)
+
+    species = data.get('species')
+    homeworld_url = data.get('homeworld')
+    species_url = species[0] if species else None
+    person_instance.homeworld = entities.get(swapi.Planet, homeworld_url)
+    person_instance.species = entities.get(swapi.Species, species_url)
+    homeworld_data, species_data = await asyncio.gather(
+        _get_optional(None if person_instance.homeworld else homeworld_url),
+        _get_optional(None if person_instance.species else species_url)
+    )
+    if homeworld_data:
+        person_instance.homeworld = swapi.create_homeworld(homeworld_data, planets, entities)
+    if species_data:
+        person_instance.species = swapi.create_clean_species(species_data, entities)
+
+    return entities.add(person_instance)
+
+
+async def create_planet(url, search, supplements=None):
+    """Searches SWAPI for a planet, merges optional supplemental data, cleans the values and
+    returns a new Planet instance.
+
+    Parameters:
+        url (str): planets collection url
+        search (str): search term
+        supplements (SupplementStore): optional Wookieepedia records; the one matching the
+            search result's name is merged into the SWAPI data
+
+    Returns:
+        Planet: new Planet instance
+    """
+
+    data = await _get_clean_data(url, search, supplements)
+    return swapi.create_planet(data)
+
+
+async def create_species(url, search, supplements=None):
+    """Searches SWAPI for a species, merges optional supplemental data, cleans the values and
+    returns a new Species instance.
+
+    Parameters:
+        url (str): species collection url
+        search (str): search term
+        supplements (SupplementStore): optional Wookieepedia records; the one matching the
+            search result's name is merged into the SWAPI data
+
+    Returns:
+        Species: new Species instance
+    """
+
+    data = await _get_clean_data(url, search, supplements)
+    return swapi.create_species(data)
+
+
+async def create_droid(url, search, supplements=None):
+    """Searches SWAPI for a droid, merges optional supplemental data, cleans the values and
+    returns a new Droid instance.
+
+    Parameters:
+        url (str): people collection url
+        search (str): search term
+        supplements (SupplementStore): optional Wookieepedia records; the one matching the
+            search result's name is merged into the SWAPI data
+
+    Returns:
+        Droid: new Droid instance
+    """
+
+    data = await _get_clean_data(url, search, supplements)
+    return swapi.create_droid(data)
+
+
+async def create_starship(url, search, supplements=None):
+    """Searches SWAPI for a starship, merges optional supplemental data, cleans the values and
+    returns a new Starship instance.
+
+    Parameters:
+        url (str): starships collection url
+        search (str): search term
+        supplements (SupplementStore): optional Wookieepedia records; the one matching the
+            search result's name is merged into the SWAPI data
+
+    Returns:
+        Starship: new Starship instance
+    """
+
+    data = await _get_clean_data(url, search, supplements)
+    return swapi.create_starship(data)
+
+
+async def search_person(url, search, supplements=None, planets=None, entities=None):
+    """Searches SWAPI for a person, merges optional supplemental data, cleans the values and
+    returns a new Person instance with homeworld and species resolved concurrently.
+
+    Parameters:
+        url (str): people collection url
+        search (str): search term
+        supplements (SupplementStore): optional Wookieepedia records; the one matching the
+            search result's name is merged into the SWAPI data
+        planets (SupplementStore): supplemental planetary data
+        entities (IdentityMap): identity map to intern in; None builds everything afresh
+
+    Returns:
+        Person: new Person instance
+    """
+
+    data = await _get_clean_data(url, search, supplements)
+    return await create_person(data, planets, entities)
+
+
+async def _get_clean_data(url, search, supplements=None):
+    """Returns the first search result merged with its match in < supplements > and cleaned."""
+
+    data = await get_first_result(url, search)
+    supplement = supplements.get(data['name']) if supplements else None
+    if supplement:
+        data.update(supplement)
+    data.update(swapi.clean_data(data))
+    return data
+
+
+async def main():
+    """Async counterpart of < swapi.main() >. Independent challenges run concurrently so a
+    full ingest takes roughly as long as its slowest dependency chain. Writes the same files
+    as the synchronous entry point.
+
+    Parameters:
+        None
+
+    Returns:
+        tuple: endpoint and absolute directory path
+    """
+
+    endpoint = swapi_client.ENDPOINT
+    abs_path = os.path.dirname(os.path.abspath(__file__))
+
+    people_url = f"{endpoint}/people/"
+    planets_url = f"{endpoint}/planets/"
+    starships_url = f"{endpoint}/starships/"
+
+    wookiee_planets = swapi.load_supplements('./wookieepedia_planets.csv')
+    wookiee_droids = swapi.load_supplements('./wookieepedia_droids.json')
+    wookiee_people = swapi.load_supplements('./wookieepedia_people.json')
+    wookiee_starships = swapi.load_supplements('./wookieepedia_starships.csv')
+    wookiee_star_map = swapi.read_json('./wookieepedia_star_map.json')
+    entities = swapi.IdentityMap() # people, homeworlds and species shared within this run only
+    swapi_search.load_configured_index() # SWAPI_SEARCH_INDEX=<mirror snapshot> searches locally
+
+    async def wookiee():
+        data = await get_first_result(f"{endpoint}/species/", 'wookiee')
+        swapi.write_json('stu_swapi_species_wookiee.json', swapi.create_species(data).jsonable())
+
+    async def hoth():
+        data = await get_first_result(planets_url, 'hoth')
+        data.update(wookiee_planets.require(data['name']))
+        swapi.write_json('stu_swapi_planet_hoth.json', swapi.create_planet(data).jsonable())
+
+    async def r2_d2():
+        data = await get_first_result(people_url, 'r2-d2')
+        data.update(wookiee_droids.require(data['name']))
+        swapi.write_json('stu_swapi_droid_r2_d2.json', swapi.create_droid(data).jsonable())
+
+    async def leia():
+        data = await get_first_result(people_url, 'Leia')
+        data.update(wookiee_people.require(data['name']))
+        person = await create_person(data, wookiee_planets, entities)
+        swapi.write_json('stu_swapi_person_leia.json', person.jsonable())
+
+    async def x_wing():
+        return await create_starship(starships_url, 'T-70 X-wing', wookiee_starships)
+
+    async def lor():
+        lor_data = wookiee_people.require('Lor San Tekka')
+        lor_data.update(swapi.clean_data(lor_data))
+        return await create_person(lor_data, wookiee_planets, entities)
+
+    x_wing_ship, poe, bb8, jakku, lor_san_tekka, rey, finn, m_falcon, han_solo, chewie, *_ = await asyncio.gather(
+        x_wing(),
+        search_person(people_url, 'Poe Dameron', wookiee_people, wookiee_planets, entities),
+        create_droid(people_url, 'BB8', wookiee_droids),
+        create_planet(planets_url, 'jakku', wookiee_planets),
+        lor(),
+        search_person(people_url, 'Rey', wookiee_people, wookiee_planets, entities),
+        search_person(people_url, 'Finn', wookiee_people, wookiee_planets, entities),
+        create_starship(starships_url, 'Millennium Falcon', wookiee_starships),
+        search_person(people_url, 'Han Solo', wookiee_people, wookiee_planets, entities),
+        search_person(people_url, 'Chewbacca', wookiee_people, wookiee_planets, entities),
+        wookiee(),
+        hoth(),
+        r2_d2(),
+        leia()
+    )
+
+    # CHALLENGE 08 CLEAN_DATA()
+
+    swapi.write_json('stu_swapi_starship_x_wing.json', x_wing_ship.jsonable())
+
+    # CHALLENGE 09. MISSION TO JAKKU
+
+    bb8.store_instructions({
+        'flight_plan': {
+            'destination': jakku.jsonable(),
+            'hyperspace_route': "Burke's Trailing",
+            'year': "34 ABY"
+            }
+    })
+    bb8.store_instructions({'locate_person': lor_san_tekka.jsonable()})
+    x_wing_ship.assign_crew_members(swapi.Crew({'pilot': poe, 'astro_mech_droid': bb8}))
+    swapi.write_json('stu_episode_vii_mission_jakku.json', x_wing_ship.jsonable())
+
+    # CHALLENGE 10 STAR MAP (ATTACK ON TUANUL)
+
+    wookiee_star_map.update(swapi.clean_data(wookiee_star_map))
+    bb8.store_instructions({'star_map': wookiee_star_map})
+    swapi.write_json('stu_episode_vii_star_map.json', bb8.jsonable())
+
+    # CHALLENGE 11 ESCAPE FROM JAKKU
+
+    m_falcon.assign_crew_members(swapi.Crew({'pilot': rey, 'gunner': finn}))
+    m_falcon.add_passengers(swapi.Passengers([bb8]))
+    swapi.write_json('stu_episode_vii_escape-jakku.json', m_falcon.jsonable())
+
+    # CHALLENGE 12 JOURNEY TO TAKODANA
+
+    m_falcon.assign_crew_members(swapi.Crew({'pilot': han_solo, 'co-pilot': chewie}))
+    m_falcon.add_passengers(swapi.Passengers([rey, finn, bb8]))
+    swapi.write_json('stu_episode_vii_journey_takodana.json', m_falcon.jsonable())
+
+    return endpoint, abs_path
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
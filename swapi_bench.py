@@ -0,0 +1,467 @@
+import argparse
+import asyncio
+import os
+import random
+import time
+import timeit
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+import swapi
+import swapi_async
+import swapi_client
+import swapi_mirror
+import swapi_parallel
+import swapi_server
+
+
+MAIN_INPUTS = (
+    './wookieepedia_planets.csv',
+    './wookieepedia_droids.json',
+    './wookieepedia_people.json',
+    './wookieepedia_starships.csv',
+    './wookieepedia_star_map.json'
+)
+
+
+def percentile(samples, pct):
+    """Returns the < pct > percentile of < samples > using the nearest-rank method.
+
+    Parameters:
+        samples (list): numeric samples
+        pct (float): percentile between 0 and 100
+
+    Returns:
+        float: percentile value or 0.0 for an empty sample
+    """
+
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, round(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(mode, latencies, elapsed):
+    """Returns throughput and latency figures for one benchmark run.
+
+    Parameters:
+        mode (str): client mode label
+        latencies (list): per-request latency in seconds
+        elapsed (float): wall clock duration of the run in seconds
+
+    Returns:
+        dict: mode, requests, requests/sec, p50 and p99 latency (ms) and elapsed seconds
+    """
+
+    return {
+        'mode': mode,
+        'requests': len(latencies),
+        'rps': len(latencies) / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'elapsed': elapsed
+    }
+
+
+def _timed_get(url):
+    """Fetches < url > and returns the request latency in seconds."""
+
+    start = time.perf_counter()
+    swapi.get_swapi_resource(url)
+    return time.perf_counter() - start
+
+
+def bench_sequential(urls):
+    """Fetches < urls > one after another with the synchronous client."""
+
+    start = time.perf_counter()
+    latencies = [_timed_get(url) for url in urls]
+    return summarize('sequential', latencies, time.perf_counter() - start)
+
+
+def bench_threaded(urls, max_workers=8):
+    """Fetches < urls > with the synchronous client on a pool of worker threads."""
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        latencies = list(executor.map(_timed_get, urls))
+    return summarize(f"threaded x{max_workers}", latencies, time.perf_counter() - start)
+
+
+def bench_async(urls):
+    """Fetches < urls > concurrently with the asyncio client."""
+
+    async def timed_get(url):
+        start = time.perf_counter()
+        await swapi_async.get_swapi_resource(url)
+        return time.perf_counter() - start
+
+    async def run():
+        return await asyncio.gather(*(timed_get(url) for url in urls))
+
+    start = time.perf_counter()
+    latencies = asyncio.run(run())
+    return summarize(f"async x{swapi_async.MAX_CONCURRENCY}", latencies, time.perf_counter() - start)
+
+
+def bench_entry_point(label, func):
+    """Times a full program entry point end to end.
+
+    Parameters:
+        label (str): row label
+        func (callable): entry point; coroutine functions are run with < asyncio.run() >
+
+    Returns:
+        dict: label and elapsed seconds
+    """
+
+    start = time.perf_counter()
+    if asyncio.iscoroutinefunction(func):
+        asyncio.run(func())
+    else:
+        func()
+    return {'mode': label, 'elapsed': time.perf_counter() - start}
+
+
+def sample_urls(snapshot, endpoint, count):
+    """Returns < count > random record urls from the snapshot, pointed at < endpoint >.
+
+    Parameters:
+        snapshot (dict): recorded mirror snapshot
+        endpoint (str): base url of the server under test
+        count (int): number of urls
+
+    Returns:
+        list: record urls (duplicates possible)
+    """
+
+    urls = [record['url'].replace(snapshot['endpoint'], endpoint)
+            for records in snapshot['collections'].values() for record in records]
+    return [random.choice(urls) for _ in range(count)]
+
+
+# constructor arguments of one representative instance per entity class
+SAMPLE_ARGS = {
+    swapi.Droid: ('https://swapi.py4e.com/api/people/3/', 'R2-D2', 'Astromech', 'Industrial Automaton',
+                  '33 BBY', 1.09, 32.0, ['Holographic projector']),
+    swapi.Person: ('https://swapi.py4e.com/api/people/5/', 'Leia Organa', '19BBY', 1.5, 49.0),
+    swapi.Planet: ('https://swapi.py4e.com/api/planets/4/', 'Hoth', 'Outer Rim', 'Anoat', 1, 3, 549.0,
+                   7200, '1.1 standard', ['frozen'], ['tundra', 'ice caves'], None),
+    swapi.Species: ('https://swapi.py4e.com/api/species/3/', 'Wookiee', 'mammal', 'sentient', 'Shyriiwook'),
+    swapi.Starship: ('https://swapi.py4e.com/api/starships/10/', 'Millennium Falcon', 'YT-1300',
+                     'Light freighter', 'Corellian Engineering', 34.37, 1050, 0.5, 75, ['laser cannons'],
+                     4, 6, 100000, '2 months')
+}
+
+
+def _dict_based(cls):
+    """Returns a stand-in for < cls > that runs the same __init__ but stores attributes in a
+    per-instance __dict__, i.e. the entity classes as they were before __slots__."""
+
+    return type(f"{cls.__name__}WithDict", (), {'__init__': cls.__init__})
+
+
+def _bytes_per_instance(cls, args, count):
+    """Measures the average traced allocation of one < cls(*args) > instance."""
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    instances = [cls(*args) for _ in range(count)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    del instances
+    return allocated / count
+
+
+def bench_memory(count=10000):
+    """Compares bytes per instance of each entity class with and without __slots__. The
+    argument values are shared, so the figures isolate the per-instance overhead.
+
+    Parameters:
+        count (int): instances created per class
+
+    Returns:
+        list: rows of class name, dict-based bytes, slotted bytes
+    """
+
+    rows = []
+    for cls, args in SAMPLE_ARGS.items():
+        rows.append({
+            'class': cls.__name__,
+            'dict_bytes': _bytes_per_instance(_dict_based(cls), args, count),
+            'slots_bytes': _bytes_per_instance(cls, args, count)
+        })
+    return rows
+
+
+def print_memory_table(rows):
+    """Prints < bench_memory() > rows as an aligned table."""
+
+    print(f"{'class':<12}{'__dict__ B':>12}{'__slots__ B':>13}{'saved':>8}")
+    for row in rows:
+        saved = 1 - row['slots_bytes'] / row['dict_bytes']
+        print(f"{row['class']:<12}{row['dict_bytes']:>12.0f}{row['slots_bytes']:>13.0f}{saved:>8.0%}")
+
+
+def _legacy_create_planet(data):
+    """create_planet() as it was before the field registry: hand-listed arguments."""
+
+    return swapi.Planet(data['url'], data['name'], data['region'], data['sector'], data['suns'], data['moons'], data['orbital_period_days'], data['diameter_km'], data['gravity'], data['climate'], data['terrain'], data['population'])
+
+
+def _legacy_planet_jsonable(planet):
+    """Planet.jsonable() as it was before the field registry: hand-written dict literal."""
+
+    return {
+        'url': planet.url,
+        'name': planet.name,
+        'region': planet.region,
+        'sector': planet.sector,
+        'suns': planet.suns,
+        'moons': planet.moons,
+        'orbital_period_days': planet.orbital_period_days,
+        'diameter_km': planet.diameter_km,
+        'gravity': planet.gravity,
+        'climate': planet.climate,
+        'terrain': planet.terrain,
+        'population': planet.population
+    }
+
+
+def _legacy_convert_resource_to_obj(resource_dict, obj_class):
+    """problem_set_10.convert_resource_to_obj() as it was before generated converters: every
+    resource key is scanned against < obj_class.properties >."""
+
+    obj_properties = []
+    for key, value in resource_dict.items():
+        if key in obj_class.properties:
+            obj_properties.append(value)
+    return obj_class(*obj_properties)
+
+
+def _uncached_jsonable(obj):
+    """Starship.jsonable() and friends as they were before memoization: the whole nested
+    tree is rebuilt on every call."""
+
+    if isinstance(obj, swapi.Crew):
+        return {key: _uncached_jsonable(val) for key, val in vars(obj).items()}
+    if isinstance(obj, swapi.Passengers):
+        return [_uncached_jsonable(val) for val in vars(obj).values()]
+    return {
+        field: _uncached_jsonable(getattr(obj, field)) if field in obj.nested and getattr(obj, field)
+        else getattr(obj, field)
+        for field in obj.json_fields
+    }
+
+
+def _sample_starship():
+    """Returns a sample Starship with a two person crew and a droid passenger, all built from
+    < SAMPLE_ARGS >."""
+
+    def person(name):
+        person = swapi.Person(*SAMPLE_ARGS[swapi.Person])
+        person.name = name
+        person.homeworld = swapi.Planet(*SAMPLE_ARGS[swapi.Planet])
+        person.species = swapi.Species(*SAMPLE_ARGS[swapi.Species])
+        return person
+
+    droid = swapi.Droid(*SAMPLE_ARGS[swapi.Droid])
+    droid.store_instructions({'flight_plan': {'hyperspace_route': "Burke's Trailing"}})
+    starship = swapi.Starship(*SAMPLE_ARGS[swapi.Starship])
+    starship.assign_crew_members(swapi.Crew({'pilot': person('Han Solo'), 'co-pilot': person('Chewbacca')}))
+    starship.add_passengers(swapi.Passengers([droid]))
+    return starship
+
+
+def bench_constructors(number=100000):
+    """Times the generated from_dict/to_dict/converter functions and the memoized
+    Starship.jsonable() against the hand-written, reflective and uncached paths they replaced.
+
+    Parameters:
+        number (int): calls per measurement
+
+    Returns:
+        list: rows of label, legacy microseconds per call, generated microseconds per call
+    """
+
+    import problem_set_10
+
+    planet_data = dict(zip(swapi.Planet.fields, SAMPLE_ARGS[swapi.Planet]))
+    planet_data.update({'rotation_period': '24', 'diameter': '7200', 'surface_water': '100',
+                        'residents': [], 'films': [], 'created': '', 'edited': ''})
+    planet = swapi.Planet.from_dict(planet_data)
+    starship = _sample_starship()
+    person_data = {
+        'name': 'Luke Skywalker', 'height': '172', 'mass': '77', 'hair_color': 'blond',
+        'skin_color': 'fair', 'eye_color': 'blue', 'birth_year': '19BBY', 'gender': 'male',
+        'homeworld': '', 'films': [], 'species': [], 'vehicles': [], 'starships': [],
+        'created': '', 'edited': '', 'url': ''
+    }
+
+    pairs = (
+        ('create_planet', lambda: _legacy_create_planet(planet_data), lambda: swapi.create_planet(planet_data)),
+        ('Planet.jsonable', lambda: _legacy_planet_jsonable(planet), planet.jsonable),
+        ('Starship.jsonable', lambda: _uncached_jsonable(starship), starship.jsonable),
+        ('ps10 convert Person',
+         lambda: _legacy_convert_resource_to_obj(person_data, problem_set_10.Person),
+         lambda: problem_set_10.convert_resource_to_obj(person_data, problem_set_10.Person))
+    )
+    rows = []
+    for label, legacy, generated in pairs:
+        rows.append({
+            'label': label,
+            'legacy_us': min(timeit.repeat(legacy, number=number, repeat=3)) / number * 1e6,
+            'generated_us': min(timeit.repeat(generated, number=number, repeat=3)) / number * 1e6
+        })
+    return rows
+
+
+def print_constructor_table(rows):
+    """Prints < bench_constructors() > rows as an aligned table."""
+
+    print(f"{'path':<22}{'legacy us':>11}{'generated us':>14}{'speedup':>9}")
+    for row in rows:
+        print(f"{row['label']:<22}{row['legacy_us']:>11.3f}{row['generated_us']:>14.3f}"
+              f"{row['legacy_us'] / row['generated_us']:>8.2f}x")
+
+
+def _sample_people(count, planet_count=60, species_count=10):
+    """Returns synthetic raw people records, the homeworld and species records they refer to
+    (url -> record) and a Wookieepedia planet store covering every homeworld."""
+
+    endpoint = 'https://swapi.py4e.com/api'
+    resources = {}
+    planet_rows = []
+    for i in range(1, planet_count + 1):
+        name = f"Planet {i}"
+        resources[f"{endpoint}/planets/{i}/"] = {'url': f"{endpoint}/planets/{i}/", 'name': name}
+        planet_rows.append({
+            'name': name, 'region': 'Outer Rim', 'sector': 'Arkanis', 'suns': '2', 'moons': '3',
+            'orbital_period_days': '304', 'diameter_km': '10465', 'gravity': '1 standard',
+            'climate': 'arid, temperate', 'terrain': 'desert, mountains', 'population': '200000'
+        })
+    for i in range(1, species_count + 1):
+        resources[f"{endpoint}/species/{i}/"] = {
+            'url': f"{endpoint}/species/{i}/", 'name': f"Species {i}", 'classification': 'mammal',
+            'designation': 'sentient', 'average_height': '180', 'average_lifespan': '120',
+            'language': 'Galactic Basic'
+        }
+    people = [{
+        'url': f"{endpoint}/people/{i}/", 'name': f"Person {i}", 'birth_year': '19BBY',
+        'height': '172', 'mass': '77', 'hair_color': 'blond', 'eye_color': 'blue',
+        'homeworld': f"{endpoint}/planets/{i % planet_count + 1}/",
+        'species': [f"{endpoint}/species/{i % species_count + 1}/"]
+    } for i in range(1, count + 1)]
+    return people, resources, swapi.SupplementStore(planet_rows)
+
+
+def bench_parallel(count=20000, max_workers=None):
+    """Times < swapi_parallel.enrich_people() > on synthetic records with 1 to N worker
+    processes (powers of two up to N, and N itself).
+
+    Parameters:
+        count (int): people records enriched per run
+        max_workers (int): largest worker count; defaults to the CPU count
+
+    Returns:
+        list: rows of workers, elapsed seconds, records per second, speedup over 1 worker
+    """
+
+    people, resources, planets = _sample_people(count)
+    top = max_workers or os.cpu_count() or 1
+    worker_counts = sorted({2 ** i for i in range(top.bit_length()) if 2 ** i <= top} | {top})
+    rows = []
+    for workers in worker_counts:
+        start = time.perf_counter()
+        swapi_parallel.enrich_people(people, planets=planets, resources=resources, max_workers=workers)
+        elapsed = time.perf_counter() - start
+        rows.append({
+            'workers': workers,
+            'elapsed': elapsed,
+            'records_per_s': count / elapsed,
+            'speedup': rows[0]['elapsed'] / elapsed if rows else 1.0
+        })
+    return rows
+
+
+def print_parallel_table(rows):
+    """Prints < bench_parallel() > rows as an aligned table."""
+
+    print(f"{'workers':<10}{'elapsed s':>11}{'records/s':>12}{'speedup':>9}")
+    for row in rows:
+        print(f"{row['workers']:<10}{row['elapsed']:>11.3f}{row['records_per_s']:>12.0f}{row['speedup']:>8.2f}x")
+
+
+def print_table(rows):
+    """Prints benchmark rows as an aligned table."""
+
+    print(f"{'mode':<28}{'requests':>10}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'elapsed s':>11}")
+    for row in rows:
+        if 'requests' in row:
+            print(f"{row['mode']:<28}{row['requests']:>10}{row['rps']:>10.1f}"
+                  f"{row['p50_ms']:>10.1f}{row['p99_ms']:>10.1f}{row['elapsed']:>11.3f}")
+        else:
+            print(f"{row['mode']:<28}{'':>10}{'':>10}{'':>10}{'':>10}{row['elapsed']:>11.3f}")
+
+
+def main():
+    """Runs the in-process benchmarks. Given a snapshot, also benchmarks the sequential,
+    threaded and async clients against a local stand-in SWAPI server and times the program
+    entry points end to end."""
+
+    parser = argparse.ArgumentParser(description='SWAPI client benchmarks against a local stand-in server.')
+    parser.add_argument('snapshot', nargs='?', help='mirror snapshot written by swapi_mirror.py; '
+                        'without it only the in-process benchmarks run')
+    parser.add_argument('--requests', type=int, default=200, help='requests per client mode')
+    parser.add_argument('--workers', type=int, default=8, help='threads / async concurrency')
+    parser.add_argument('--latency', type=float, default=0.02, help='injected mean latency in seconds')
+    parser.add_argument('--jitter', type=float, default=0.005, help='injected latency variation in seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='injected 503 probability')
+    parser.add_argument('--parallel-records', type=int, default=20000,
+                        help='people records per process pool scaling run')
+    args = parser.parse_args()
+
+    print_memory_table(bench_memory())
+    print_constructor_table(bench_constructors())
+    print_parallel_table(bench_parallel(args.parallel_records))
+    if not args.snapshot:
+        return None
+
+    snapshot = swapi_mirror.read_snapshot(args.snapshot)
+    server, fake, endpoint = swapi_server.start_server(
+        snapshot, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate
+    )
+
+    # measure the transport, not the local shortcuts in front of it
+    swapi_client.use_mirror(None)
+    swapi_client.disable_cache()
+    swapi_client.configure_rate_limit(rate=10000, burst=1000)
+    swapi_client.configure_session(pool_maxsize=args.workers)
+    swapi_client.ENDPOINT = endpoint
+    swapi_async.MAX_CONCURRENCY = args.workers
+
+    urls = sample_urls(snapshot, endpoint, args.requests)
+    rows = [bench_sequential(urls), bench_threaded(urls, args.workers), bench_async(urls)]
+
+    if all(os.path.exists(filepath) for filepath in MAIN_INPUTS):
+        rows.append(bench_entry_point('swapi.main()', swapi.main))
+        rows.append(bench_entry_point('swapi_async.main()', swapi_async.main))
+    else:
+        print('Wookieepedia input files not found; skipping swapi.main() timings.')
+    if os.path.exists('./people.json'):
+        import problem_set_10
+        problem_set_10.ENDPOINT = endpoint
+        rows.append(bench_entry_point('problem_set_10.main()', problem_set_10.main))
+    else:
+        print('people.json not found; skipping problem_set_10.main() timing.')
+
+    print_table(rows)
+    print(f"server handled {fake.requests} requests; client metrics: {swapi_client.metrics.snapshot()}")
+    server.shutdown()
+    return rows
+
+
+if __name__ == '__main__':
+    main()
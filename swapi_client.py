@@ -0,0 +1,874 @@
+import copy
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from datetime import timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlencode
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+ENDPOINT = os.environ.get('SWAPI_ENDPOINT', 'https://swapi.py4e.com/api').rstrip('/') # SWAPI base url
+
+POOL_CONNECTIONS = 4 # number of distinct hosts to keep a connection pool for
+POOL_MAXSIZE = 16 # max reusable connections kept open per host
+
+RATE_LIMIT = 10.0 # max requests per second shared by every caller
+RATE_BURST = 10 # requests that may be sent back to back before the rate applies
+MAX_RETRIES = 4 # retries after the first attempt on transient failures
+BACKOFF_BASE = 0.5 # seconds; doubled on every retry before jitter is applied
+BACKOFF_MAX = 30.0 # upper bound of a single backoff delay in seconds
+RETRY_AFTER_MAX = 60.0 # longest Retry-After honored; longer requests fail instead of sleeping
+RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+
+CACHE_PATH = os.environ.get('SWAPI_CACHE_PATH', 'swapi_cache.sqlite3')
+CACHE_TTL = 24 * 60 * 60 # seconds an entry is served before it is considered stale
+CACHE_MAX_ENTRIES = 10000 # least recently used entries are evicted beyond this size
+ACCESS_FLUSH_SIZE = 256 # cache hits whose access times are buffered before being written
+
+_session = None
+_session_lock = threading.Lock()
+_cache = None
+_cache_enabled = True
+_cache_lock = threading.Lock()
+_mirror = None
+
+
+def create_session(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE, keep_alive=True):
+    """Returns a < requests.Session > that mounts a pooled < HTTPAdapter > for both http and
+    https URLs. Connections are kept alive and reused across requests so that repeat lookups
+    against the same host skip the TCP and TLS handshakes.
+
+    Parameters:
+        pool_connections (int): number of per-host connection pools to cache
+        pool_maxsize (int): maximum number of connections to keep in each pool
+        keep_alive (bool): if False, ask the server to close each connection after use
+
+    Returns:
+        Session: configured session instance
+    """
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    if not keep_alive:
+        session.headers['Connection'] = 'close'
+    return session
+
+
+def configure_session(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE, keep_alive=True):
+    """Replaces the shared session with a new one built from the provided pool settings.
+    The previous session, if any, is closed and its sockets released.
+
+    Parameters:
+        pool_connections (int): number of per-host connection pools to cache
+        pool_maxsize (int): maximum number of connections to keep in each pool
+        keep_alive (bool): if False, ask the server to close each connection after use
+
+    Returns:
+        Session: the new shared session
+    """
+
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = create_session(pool_connections, pool_maxsize, keep_alive)
+    return _session
+
+
+def get_session():
+    """Returns the shared session, creating it with the default pool settings on first use.
+
+    Parameters:
+        None
+
+    Returns:
+        Session: the shared session
+    """
+
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = create_session()
+    return _session
+
+
+class TokenBucket:
+    """Thread-safe token bucket rate limiter with additive-increase/multiplicative-decrease
+    adaptation. Each request takes a token; tokens refill at < rate > per second up to
+    < capacity >. A throttled response halves the rate and every successful response nudges
+    it back towards < max_rate >, so the client settles at the highest rate the upstream
+    tolerates.
+
+    Attributes:
+        rate (float): current refill rate in tokens per second
+        max_rate (float): configured ceiling of < rate >
+        min_rate (float): floor of < rate >
+        capacity (float): maximum number of stored tokens (burst size)
+        tokens (float): tokens currently available
+
+    Methods:
+        acquire: block until a token is available
+        pause: stop handing out tokens for a number of seconds
+        throttled: multiplicatively decrease the rate
+        succeeded: additively increase the rate
+    """
+
+    def __init__(self, rate=RATE_LIMIT, capacity=RATE_BURST, min_rate=0.5):
+        """Initialize a TokenBucket instance with a full bucket."""
+
+        self.rate = rate
+        self.max_rate = rate
+        self.min_rate = min(min_rate, rate)
+        self.capacity = capacity
+        self.tokens = capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Takes one token, sleeping until one is available.
+
+        Parameters:
+            None
+
+        Returns:
+            float: seconds spent waiting
+        """
+
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if now < self._paused_until:
+                    delay = self._paused_until - now
+                elif self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                else:
+                    delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def pause(self, seconds):
+        """Holds back every caller for < seconds > (e.g., to honor a Retry-After header).
+
+        Parameters:
+            seconds (float): pause duration
+
+        Returns:
+            None
+        """
+
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self.tokens = 0
+
+    def throttled(self):
+        """Halves the refill rate, bounded below by < min_rate >."""
+
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+
+    def succeeded(self):
+        """Raises the refill rate by 5% of < max_rate >, bounded above by < max_rate >."""
+
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate * 0.05)
+
+
+class ClientMetrics:
+    """Thread-safe counters describing the traffic sent by the client.
+
+    Attributes:
+        counters (dict): requests, retries, throttled, errors, wait_seconds, backoff_seconds
+
+    Methods:
+        add: increment a counter
+        snapshot: return a copy of the counters
+        reset: zero every counter
+    """
+
+    def __init__(self):
+        """Initialize a ClientMetrics instance with zeroed counters."""
+
+        self._lock = threading.Lock()
+        self.reset()
+
+    def add(self, name, amount=1):
+        """Increments counter < name > by < amount >."""
+
+        with self._lock:
+            self.counters[name] += amount
+
+    def snapshot(self):
+        """Returns a copy of the counters plus the limiter's current rate.
+
+        Parameters:
+            None
+
+        Returns:
+            dict: counter values
+        """
+
+        with self._lock:
+            snapshot = dict(self.counters)
+        snapshot['rate'] = _limiter.rate
+        return snapshot
+
+    def reset(self):
+        """Zeroes every counter."""
+
+        with self._lock:
+            self.counters = {
+                'requests': 0,
+                'retries': 0,
+                'throttled': 0,
+                'errors': 0,
+                'wait_seconds': 0.0,
+                'backoff_seconds': 0.0
+            }
+
+
+class ResponseCache:
+    """Persistent sqlite-backed store of decoded SWAPI responses.
+
+    Attributes:
+        path (str): sqlite database file (use ':memory:' for a throwaway cache)
+        ttl (float): default time-to-live of an entry in seconds
+        max_entries (int): size cap; least recently used entries are evicted beyond it
+        hits (int): number of lookups answered from the cache
+        misses (int): number of lookups that found no fresh entry
+        evictions (int): number of entries removed to honor < max_entries >
+        revalidations (int): number of stale entries renewed by a 304 Not Modified response
+
+    Methods:
+        get: return the cached body for a key, if fresh
+        get_stale: return an entry and its validators regardless of freshness
+        set: store a body and its validators under a key
+        renew: extend the lifetime of an entry confirmed unchanged
+        clear: remove every entry
+        flush: write buffered access times
+        stats: return the hit/miss counters
+        close: close the underlying connection
+    """
+
+    def __init__(self, path=CACHE_PATH, ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES):
+        """Initialize a ResponseCache instance, creating the backing table if required."""
+
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.revalidations = 0
+        self._lock = threading.Lock()
+        self._accessed = {} # key -> last hit time not yet written, see flush()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS responses ('
+            'key TEXT PRIMARY KEY, body TEXT NOT NULL, '
+            'expires REAL NOT NULL, accessed REAL NOT NULL, '
+            'etag TEXT, last_modified TEXT)'
+        )
+        columns = [row[1] for row in self._conn.execute('PRAGMA table_info(responses)')]
+        for column in ('etag', 'last_modified'):
+            if column not in columns:
+                self._conn.execute(f'ALTER TABLE responses ADD COLUMN {column} TEXT') # pre-validator cache file
+        self._conn.execute('CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)')
+        self._conn.commit()
+
+    def get(self, key):
+        """Returns a freshly decoded copy of the body stored under < key > if the entry
+        exists and has not expired. Expired entries are kept so that they can be revalidated
+        (see < get_stale() >). A hit refreshes the entry's last access time for LRU eviction
+        purposes; the time is buffered in memory and written in batches (see < flush() >), so
+        a read-only run does not turn every hit into a write transaction.
+
+        Parameters:
+            key (str): cache key (see < cache_key() >)
+
+        Returns:
+            dict: decoded body or None if no fresh entry exists
+        """
+
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT body, expires FROM responses WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None or row[1] <= now:
+                self.misses += 1
+                return None
+            self._accessed[key] = now
+            if len(self._accessed) >= ACCESS_FLUSH_SIZE:
+                self._flush()
+            self.hits += 1
+        return decode_json(row[0])
+
+    def get_stale(self, key):
+        """Returns the entry stored under < key > whether or not it has expired, along with
+        the validators needed to revalidate it with a conditional request.
+
+        Parameters:
+            key (str): cache key (see < cache_key() >)
+
+        Returns:
+            dict: 'body' (str, encoded JSON), 'etag' and 'last_modified' or None if no entry
+        """
+
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT body, etag, last_modified FROM responses WHERE key = ?', (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {'body': row[0], 'etag': row[1], 'last_modified': row[2]}
+
+    def set(self, key, body, ttl=None, etag=None, last_modified=None):
+        """Stores < body > and its validators under < key >, replacing any previous entry,
+        then evicts the least recently used entries if the cache has grown beyond
+        < max_entries >.
+
+        Parameters:
+            key (str): cache key (see < cache_key() >)
+            body (dict): decoded JSON body
+            ttl (float): optional per-entry time-to-live overriding the cache default
+            etag (str): optional ETag response header
+            last_modified (str): optional Last-Modified response header
+
+        Returns:
+            None
+        """
+
+        now = time.time()
+        expires = now + (self.ttl if ttl is None else ttl)
+        encoded = json.dumps(body, ensure_ascii=False, separators=(',', ':'))
+        with self._lock:
+            self._accessed.pop(key, None)
+            self._flush(commit=False) # eviction below must see the latest access times
+            self._conn.execute(
+                'INSERT OR REPLACE INTO responses (key, body, expires, accessed, etag, last_modified) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (key, encoded, expires, now, etag, last_modified)
+            )
+            count = self._conn.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+            overflow = count - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    'DELETE FROM responses WHERE key IN '
+                    '(SELECT key FROM responses ORDER BY accessed LIMIT ?)', (overflow,)
+                )
+                self.evictions += overflow
+            self._conn.commit()
+
+    def renew(self, key, ttl=None):
+        """Restarts the time-to-live of the entry stored under < key > after the server has
+        confirmed (304 Not Modified) that it is still current.
+
+        Parameters:
+            key (str): cache key (see < cache_key() >)
+            ttl (float): optional per-entry time-to-live overriding the cache default
+
+        Returns:
+            None
+        """
+
+        now = time.time()
+        expires = now + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._accessed.pop(key, None)
+            self._conn.execute(
+                'UPDATE responses SET expires = ?, accessed = ? WHERE key = ?', (expires, now, key)
+            )
+            self._conn.commit()
+            self.revalidations += 1
+
+    def clear(self):
+        """Removes every entry and resets the counters."""
+
+        with self._lock:
+            self._accessed.clear()
+            self._conn.execute('DELETE FROM responses')
+            self._conn.commit()
+            self.hits = self.misses = self.evictions = self.revalidations = 0
+
+    def stats(self):
+        """Returns the cache counters.
+
+        Parameters:
+            None
+
+        Returns:
+            dict: hits, misses, evictions, revalidations and current entry count
+        """
+
+        with self._lock:
+            entries = self._conn.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'revalidations': self.revalidations,
+            'entries': entries
+        }
+
+    def flush(self):
+        """Writes the buffered access times of recent hits in a single transaction.
+
+        Parameters:
+            None
+
+        Returns:
+            None
+        """
+
+        with self._lock:
+            self._flush()
+
+    def _flush(self, commit=True):
+        """Writes the buffered access times; the caller holds < _lock >."""
+
+        if not self._accessed:
+            return
+        self._conn.executemany(
+            'UPDATE responses SET accessed = ? WHERE key = ?',
+            [(accessed, key) for key, accessed in self._accessed.items()]
+        )
+        self._accessed.clear()
+        if commit:
+            self._conn.commit()
+
+    def close(self):
+        """Writes the buffered access times and closes the sqlite connection."""
+
+        with self._lock:
+            self._flush()
+            self._conn.close()
+
+
+class _Call:
+    """An in-flight call tracked by < SingleFlight >."""
+
+    def __init__(self):
+        """Initialize a _Call instance."""
+
+        self.event = threading.Event()
+        self.waiters = 0
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesces duplicate concurrent calls. The first caller for a key runs the function;
+    callers arriving while it is in flight wait for it and receive the same result (or
+    exception) instead of repeating the work.
+
+    Attributes:
+        coalesced (int): number of calls answered by another caller's in-flight work
+
+    Methods:
+        do: run or join the call registered under a key
+    """
+
+    def __init__(self):
+        """Initialize a SingleFlight instance."""
+
+        self.coalesced = 0
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, func, *args, **kwargs):
+        """Runs < func(*args, **kwargs) > unless a call for < key > is already in flight, in
+        which case its result is awaited and returned. Waiters receive their own deep copy
+        of the result so that one caller mutating its dict cannot affect another.
+
+        Parameters:
+            key (str): identifies duplicate calls
+            func (callable): the function to run
+            *args: positional arguments passed to < func >
+            **kwargs: keyword arguments passed to < func >
+
+        Returns:
+            object: the result of < func >
+        """
+
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                call.waiters += 1
+                self.coalesced += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result)
+
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key] # later callers start a new call
+                waiters = call.waiters
+            if waiters and call.error is None:
+                call.result = copy.deepcopy(result) # pristine copy shared by the waiters
+            call.event.set()
+        return result
+
+
+_flight = SingleFlight() # coalesces concurrent fetches of the same url and params
+_limiter = TokenBucket()
+metrics = ClientMetrics()
+
+
+def configure_rate_limit(rate=RATE_LIMIT, burst=RATE_BURST):
+    """Replaces the shared rate limiter.
+
+    Parameters:
+        rate (float): max requests per second
+        burst (int): requests that may be sent back to back
+
+    Returns:
+        TokenBucket: the new shared limiter
+    """
+
+    global _limiter
+    _limiter = TokenBucket(rate, burst)
+    return _limiter
+
+
+def backoff_delay(attempt):
+    """Returns a "full jitter" exponential backoff delay: a random duration between zero and
+    < BACKOFF_BASE > * 2 ** < attempt >, capped at < BACKOFF_MAX >.
+
+    Parameters:
+        attempt (int): zero-based retry number
+
+    Returns:
+        float: delay in seconds
+    """
+
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+def retry_after(response):
+    """Returns the delay requested by a response's Retry-After header, which may hold either
+    a number of seconds or an HTTP date.
+
+    Parameters:
+        response (Response): HTTP response
+
+    Returns:
+        float: delay in seconds or None if the header is absent or malformed
+    """
+
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None: # '-0000' dates parse as naive; they are UTC
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, when.timestamp() - time.time())
+
+
+def cache_key(url, params=None):
+    """Returns the cache key for a request. Querystring arguments are sorted so that
+    equivalent requests share a key regardless of dict ordering.
+
+    Parameters:
+        url (str): a url that specifies the resource
+        params (dict): optional dictionary of querystring arguments
+
+    Returns:
+        str: cache key
+    """
+
+    if params:
+        return f"{url}?{urlencode(sorted(params.items()))}"
+    return url
+
+
+def configure_cache(path=CACHE_PATH, ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES):
+    """Replaces the shared response cache with a new one built from the provided settings and
+    enables caching.
+
+    Parameters:
+        path (str): sqlite database file
+        ttl (float): default time-to-live of an entry in seconds
+        max_entries (int): size cap enforced by LRU eviction
+
+    Returns:
+        ResponseCache: the new shared cache
+    """
+
+    global _cache, _cache_enabled
+    with _cache_lock:
+        if _cache is not None:
+            _cache.close()
+        _cache = ResponseCache(path, ttl, max_entries)
+        _cache_enabled = True
+    return _cache
+
+
+def decode_json(body):
+    """Decodes a JSON response body. Every response, cached or fresh, is decoded here so
+    decoding can be measured as a stage of its own (see < swapi_metrics >).
+
+    Parameters:
+        body (str)/(bytes): JSON document; bytes may be UTF-8, UTF-16 or UTF-32 encoded
+
+    Returns:
+        dict: decoded document
+    """
+
+    return json.loads(body)
+
+
+def disable_cache():
+    """Turns off the shared response cache. Subsequent lookups always hit the network until
+    < configure_cache() > is called again.
+
+    Parameters:
+        None
+
+    Returns:
+        None
+    """
+
+    global _cache, _cache_enabled
+    with _cache_lock:
+        if _cache is not None:
+            _cache.close()
+        _cache = None
+        _cache_enabled = False
+
+
+def reset_after_fork(cache=False, share=1):
+    """Drops the connection state a forked child inherits from its parent: the pooled session
+    and its sockets, the sqlite cache connection (which must not be used across a fork), and
+    the locks guarding them, which may have been held by a parent thread at fork time. The
+    inherited objects are abandoned rather than closed so the parent's resources are left
+    alone. Call it first thing in a worker process (see < swapi_parallel._init_worker() >).
+
+    The child gets its own rate limiter holding < share >'s part of the parent's rate and
+    burst, so that < share > sibling processes together stay within the configured limit.
+
+    Parameters:
+        cache (bool): if True the child opens its own connection to the default cache on
+            first use; otherwise caching is disabled in the child
+        share (int): number of processes dividing the parent's rate limit
+
+    Returns:
+        None
+    """
+
+    global _session, _session_lock, _cache, _cache_enabled, _cache_lock, _flight, _limiter
+    _session = None
+    _session_lock = threading.Lock()
+    _cache = None
+    _cache_enabled = cache
+    _cache_lock = threading.Lock()
+    _flight = SingleFlight()
+    _limiter = TokenBucket(_limiter.max_rate / share, max(1.0, _limiter.capacity / share))
+
+
+def get_cache():
+    """Returns the shared response cache, creating it with the default settings on first use.
+
+    Parameters:
+        None
+
+    Returns:
+        ResponseCache: the shared cache or None if caching is disabled
+    """
+
+    global _cache
+    if _cache is None and _cache_enabled:
+        with _cache_lock:
+            if _cache is None and _cache_enabled:
+                _cache = ResponseCache()
+    return _cache
+
+
+def use_mirror(mirror):
+    """Installs a local mirror (see < swapi_mirror.MirrorIndex >) that is consulted before the
+    cache and the network. Pass None to stop using it.
+
+    Parameters:
+        mirror (MirrorIndex): object exposing a < lookup(url, params) > method
+
+    Returns:
+        MirrorIndex: the previously installed mirror, or None
+    """
+
+    global _mirror
+    previous, _mirror = _mirror, mirror
+    return previous
+
+
+def get_mirror():
+    """Returns the installed mirror (see < use_mirror() >).
+
+    Parameters:
+        None
+
+    Returns:
+        MirrorIndex: the installed mirror, or None
+    """
+
+    return _mirror
+
+
+def fetch_json(url, params=None, timeout=10, use_cache=True):
+    """Issues an HTTP GET request through the shared session and returns the decoded JSON
+    body. Requests the installed mirror can answer never leave the process. Successful
+    responses are stored in the shared response cache and later lookups for the same url and
+    params are answered locally until the entry expires. Expired entries are revalidated with
+    a conditional request (If-None-Match / If-Modified-Since); a 304 Not Modified response is
+    answered from the stored copy. Concurrent misses for the same url and params are
+    coalesced into a single request.
+
+    Parameters:
+        url (str): a url that specifies the resource
+        params (dict): optional dictionary of querystring arguments
+        timeout (int): timeout value in seconds
+        use_cache (bool): if False, bypass the response cache
+
+    Returns:
+        dict: dictionary representation of the decoded JSON
+
+    Raises:
+        requests.HTTPError: the response status was not 2xx (or 304 for a cached copy)
+        requests.RequestException: the request failed to connect or timed out
+    """
+
+    if _mirror is not None:
+        data = _mirror.lookup(url, params)
+        if data is not None:
+            return data
+
+    cache = get_cache() if use_cache else None
+    key = cache_key(url, params)
+    if cache is not None:
+        data = cache.get(key)
+        if data is not None:
+            return data
+
+    return _flight.do(key, _fetch_remote, url, params, timeout, cache, key)
+
+
+def _fetch_remote(url, params, timeout, cache, key):
+    """Sends the request over the network, conditionally if < cache > holds a stale copy with
+    validators, and stores a successful response in < cache >."""
+
+    stale = cache.get_stale(key) if cache is not None else None
+    headers = {}
+    if stale is not None:
+        if stale['etag']:
+            headers['If-None-Match'] = stale['etag']
+        if stale['last_modified']:
+            headers['If-Modified-Since'] = stale['last_modified']
+
+    response = send(url, params, timeout, headers or None)
+    if response.status_code == 304 and stale is not None:
+        cache.renew(key)
+        return decode_json(stale['body'])
+
+    if not 200 <= response.status_code < 300: # e.g., a {"detail": "Not found"} body is not data
+        metrics.add('errors')
+        response.raise_for_status()
+        raise requests.HTTPError(
+            f"{response.status_code} for url {response.url}: unexpected status", response=response
+        )
+
+    data = decode_json(response.content)
+    if cache is not None:
+        cache.set(key, data, etag=response.headers.get('ETag'),
+                  last_modified=response.headers.get('Last-Modified'))
+    return data
+
+
+def send(url, params=None, timeout=10, headers=None):
+    """Sends a GET request through the shared session, rate limited by the shared token
+    bucket. Connection errors, timeouts and < RETRY_STATUSES > responses are retried up to
+    < MAX_RETRIES > times with jittered exponential backoff; a Retry-After header takes
+    precedence over the computed delay and pauses every caller, unless it asks for more than
+    < RETRY_AFTER_MAX > seconds, in which case the response is treated as an error. 429
+    responses also lower the shared request rate.
+
+    Parameters:
+        url (str): a url that specifies the resource
+        params (dict): optional dictionary of querystring arguments
+        timeout (int): timeout value in seconds
+        headers (dict): optional request headers
+
+    Returns:
+        Response: the first non-transient response
+
+    Raises:
+        requests.HTTPError: the last response was still transient after every retry, or it
+            asked to retry after more than < RETRY_AFTER_MAX > seconds
+        requests.RequestException: the last attempt failed to connect or timed out
+    """
+
+    attempt = 0
+    while True:
+        metrics.add('wait_seconds', _limiter.acquire())
+        try:
+            response = get_session().get(url, params=params, timeout=timeout, headers=headers)
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt >= MAX_RETRIES:
+                metrics.add('errors')
+                raise
+            delay = backoff_delay(attempt)
+        else:
+            metrics.add('requests')
+            if response.status_code not in RETRY_STATUSES:
+                _limiter.succeeded()
+                return response
+            if response.status_code == 429:
+                metrics.add('throttled')
+                _limiter.throttled()
+            if attempt >= MAX_RETRIES:
+                metrics.add('errors')
+                response.raise_for_status()
+            delay = retry_after(response)
+            if delay is None:
+                delay = backoff_delay(attempt)
+            elif delay > RETRY_AFTER_MAX:
+                metrics.add('errors')
+                raise requests.HTTPError(
+                    f"{response.status_code} for url {response.url}: Retry-After of {delay:.0f}s "
+                    f"exceeds the {RETRY_AFTER_MAX:.0f}s limit", response=response
+                )
+            else:
+                _limiter.pause(delay) # the upstream asked every client to hold off
+        metrics.add('retries')
+        metrics.add('backoff_seconds', delay)
+        time.sleep(delay)
+        attempt += 1
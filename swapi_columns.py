@@ -0,0 +1,159 @@
+import itertools
+
+import swapi
+
+try:
+    import numpy as np
+except ImportError: # optional; the pure Python column path is used instead
+    np = None
+
+
+MISSING = object() # marks a key absent from a record
+BATCH_SIZE = 1024 # records per columnar pass in clean_stream()
+
+
+def records_to_columns(records):
+    """Transposes a list of record dictionaries into columns. Every column has one slot per
+    record; records that lack a key hold < MISSING > in that column.
+
+    Parameters:
+        records (list): SWAPI/Wookieepedia dictionaries
+
+    Returns:
+        dict: key -> list of values
+    """
+
+    count = len(records)
+    columns = {}
+    for i, record in enumerate(records):
+        for key, val in record.items():
+            column = columns.get(key)
+            if column is None:
+                column = columns[key] = [MISSING] * count
+            column[i] = val
+    return columns
+
+
+def clean_column(values, converter=None):
+    """Cleans a whole column: null sentinels become None and string values are converted by
+    < converter >, mirroring < swapi.clean_data() > for a single key. With NumPy available,
+    all-string columns are processed in one vectorized pass; mixed columns and values NumPy
+    parses differently from Python fall back to the per-value path.
+
+    Parameters:
+        values (list): column values (may contain < MISSING >)
+        converter (callable): float, int, swapi.split_list or None
+
+    Returns:
+        tuple: (typed column, list of cleaned Python values); < MISSING > slots become None
+    """
+
+    if np is not None:
+        result = _clean_column_numpy(values, converter)
+        if result is not None:
+            return result
+
+    cleaned = _clean_column_python(values, converter)
+    return cleaned, cleaned
+
+
+def _clean_column_python(values, converter):
+    """Per-value cleaning used without NumPy or for columns NumPy cannot represent."""
+
+    null_values = swapi.NULL_VALUES
+    cleaned = []
+    for val in values:
+        if val is MISSING:
+            val = None
+        elif isinstance(val, str):
+            if val in null_values:
+                val = None
+            elif converter:
+                val = converter(val)
+        cleaned.append(val)
+    return cleaned
+
+
+def _clean_column_numpy(values, converter):
+    """Vectorized cleaning of an all-string column. Returns None if the column has to take
+    the Python path."""
+
+    present = np.fromiter((val is not MISSING for val in values), dtype=bool, count=len(values))
+    if not all(isinstance(val, str) for val in values if val is not MISSING):
+        return None
+
+    text = np.array([val if val is not MISSING else '' for val in values], dtype=str)
+    null = np.isin(text, list(swapi.NULL_VALUES)) | ~present
+    valid = ~null
+
+    if converter is float or converter is int:
+        dtype = np.float64 if converter is float else np.int64
+        data = np.zeros(len(values), dtype=dtype)
+        try:
+            data[valid] = text[valid].astype(dtype)
+        except (ValueError, OverflowError):
+            return None
+        typed = np.ma.masked_array(data, mask=null)
+    elif converter is swapi.split_list:
+        typed = np.empty(len(values), dtype=object)
+        typed[valid] = np.char.split(text[valid], ', ')
+        typed[null] = None
+    elif converter is None:
+        typed = text.astype(object)
+        typed[null] = None
+    else:
+        return None
+
+    return typed, typed.tolist() # masked slots become None
+
+
+def clean_records(records, schema='default', columnar=False):
+    """Batch counterpart of < swapi.clean_data() >. The records are transposed into columns
+    and each column is cleaned in a single pass with its converter looked up once.
+
+    Parameters:
+        records (list): SWAPI/Wookieepedia dictionaries
+        schema (str)/(dict): registered schema name or a compiled schema (see
+            < swapi.register_schema() >)
+        columnar (bool): if True, return the typed columns instead of row dictionaries
+
+    Returns:
+        list/dict: cleaned row dictionaries, identical to calling < swapi.clean_data() > on
+            each record, or key -> typed column (NumPy arrays when NumPy is installed; float
+            and int columns are masked arrays with nulls masked)
+    """
+
+    converters = swapi.SCHEMAS[schema] if isinstance(schema, str) else schema
+    columns = records_to_columns(records)
+
+    typed_columns = {}
+    cleaned_columns = {}
+    for key, values in columns.items():
+        typed_columns[key], cleaned_columns[key] = clean_column(values, converters.get(key))
+
+    if columnar:
+        return typed_columns
+    return [{key: cleaned_columns[key][i] for key in record} for i, record in enumerate(records)]
+
+
+def clean_stream(records, schema='default', batch_size=BATCH_SIZE):
+    """Streaming counterpart of < clean_records() >: consumes an iterable of records (e.g.,
+    a generator from < swapi_stream.iter_records() >) in batches of < batch_size > and yields
+    the cleaned row dictionaries, so memory use is bounded by the batch size rather than the
+    file size.
+
+    Parameters:
+        records (iterable): SWAPI/Wookieepedia dictionaries
+        schema (str)/(dict): registered schema name or a compiled schema
+        batch_size (int): records cleaned per columnar pass
+
+    Returns:
+        generator: cleaned row dictionaries in input order
+    """
+
+    iterator = iter(records)
+    while True:
+        batch = list(itertools.islice(iterator, batch_size))
+        if not batch:
+            return
+        yield from clean_records(batch, schema)
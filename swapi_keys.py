@@ -0,0 +1,12 @@
+def name_key(name):
+    """Normalizes a name for index lookups: case-folded with everything but letters and
+    digits removed (e.g., 'BB-8' and 'bb8' both become 'bb8').
+
+    Parameters:
+        name (str): name to normalize
+
+    Returns:
+        str: normalized name
+    """
+
+    return ''.join(char for char in name.casefold() if char.isalnum())
@@ -0,0 +1,352 @@
+import argparse
+import functools
+import json
+import os
+import threading
+import time
+
+import swapi
+import swapi_client
+import swapi_stream
+
+
+def _fetched(result, args, kwargs):
+    """Counters of a < swapi.get_swapi_resource() > call."""
+
+    return [('resources_fetched', 1)]
+
+
+def _cleaned(result, args, kwargs):
+    """Counters of a < swapi.clean_data() > call."""
+
+    return [('records_cleaned', 1)]
+
+
+def _created(result, args, kwargs):
+    """Counters of a create_* call."""
+
+    return [('entities_created', 1)]
+
+
+def _written(result, args, kwargs):
+    """Counters of a < swapi.write_json() > or < swapi_stream.write_json_stream() > call; the
+    latter returns its record count, the former writes one document."""
+
+    filepath = args[0] if args else kwargs['filepath']
+    records = result if isinstance(result, int) else 1
+    return [('files_written', 1), ('records_written', records),
+            ('bytes_written', os.path.getsize(filepath))]
+
+
+# (module, function name, stage name, counters) wrapped by < enable() >; counters returns the
+# (counter name, amount) pairs of one successful call
+STAGES = (
+    (swapi_client, 'send', 'network', None),
+    (swapi_client, 'decode_json', 'json_decode', None),
+    (swapi, 'get_swapi_resource', 'get_swapi_resource', _fetched),
+    (swapi, 'clean_data', 'clean_data', _cleaned),
+    (swapi, 'create_droid', 'create_droid', _created),
+    (swapi, 'create_homeworld', 'create_homeworld', _created),
+    (swapi, 'create_clean_species', 'create_clean_species', _created),
+    (swapi, 'create_person', 'create_person', _created),
+    (swapi, 'create_planet', 'create_planet', _created),
+    (swapi, 'create_species', 'create_species', _created),
+    (swapi, 'create_starship', 'create_starship', _created),
+    (swapi, 'write_json', 'write_json', _written),
+    (swapi_stream, 'write_json_stream', 'write_json_stream', _written)
+)
+
+
+class Timer:
+    """Times a block or a function under a stage name. Use as a context manager
+    (with registry.timer('decode'): ...) or as a decorator (@registry.timer('decode')).
+
+    Attributes:
+        registry (Metrics): registry the durations are recorded in
+        name (str): stage name
+    """
+
+    def __init__(self, registry, name):
+        """Initialize a Timer instance."""
+
+        self.registry = registry
+        self.name = name
+        self._local = threading.local() # start times, so one Timer can be shared by threads
+
+    def __enter__(self):
+        """Start timing."""
+
+        starts = self._local.__dict__.setdefault('starts', [])
+        starts.append(time.perf_counter())
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        """Stop timing and record the duration."""
+
+        elapsed = time.perf_counter() - self._local.starts.pop()
+        if self.registry.enabled:
+            self.registry.observe(self.name, elapsed)
+
+    def __call__(self, func):
+        """Wrap < func > so that each call is timed while the registry is enabled."""
+
+        registry = self.registry
+        name = self.name
+
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            if not registry.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                registry.observe(name, time.perf_counter() - start)
+        return timed
+
+
+class Metrics:
+    """Thread-safe per-stage timings and counters. Timers are inclusive: a stage that calls
+    another (e.g., create_person calling get_swapi_resource) includes its time.
+
+    Attributes:
+        enabled (bool): whether timers and counters record anything
+        timers (dict): stage name -> {'count', 'total_seconds', 'max_seconds'}
+        counters (dict): counter name -> value
+
+    Methods:
+        count: increment a counter
+        observe: record one duration
+        reset: clear every timer and counter
+        snapshot: return a copy of the timers, counters and client metrics
+        timer: return a Timer for a stage
+        to_json: render a snapshot as JSON
+        to_prometheus: render a snapshot in the Prometheus text exposition format
+    """
+
+    def __init__(self, enabled=False):
+        """Initialize an empty Metrics instance."""
+
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.reset()
+
+    def timer(self, name):
+        """Returns a Timer recording under < name >.
+
+        Parameters:
+            name (str): stage name
+
+        Returns:
+            Timer: context manager / decorator
+        """
+
+        return Timer(self, name)
+
+    def observe(self, name, seconds):
+        """Records one < seconds > long occurrence of stage < name >."""
+
+        with self._lock:
+            stats = self.timers.get(name)
+            if stats is None:
+                stats = self.timers[name] = {'count': 0, 'total_seconds': 0.0, 'max_seconds': 0.0}
+            stats['count'] += 1
+            stats['total_seconds'] += seconds
+            if seconds > stats['max_seconds']:
+                stats['max_seconds'] = seconds
+
+    def count(self, name, amount=1):
+        """Increments counter < name > by < amount > while the registry is enabled."""
+
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def reset(self):
+        """Clears every timer and counter."""
+
+        with self._lock:
+            self.timers = {}
+            self.counters = {}
+
+    def snapshot(self):
+        """Returns a copy of the timers and counters together with the client's traffic
+        counters (see < swapi_client.ClientMetrics >) and response cache statistics.
+
+        Parameters:
+            None
+
+        Returns:
+            dict: {'timers': ..., 'counters': ..., 'client': ...}
+        """
+
+        with self._lock:
+            timers = {name: dict(stats) for name, stats in self.timers.items()}
+            counters = dict(self.counters)
+        client = swapi_client.metrics.snapshot()
+        cache = swapi_client.get_cache()
+        if cache is not None:
+            client.update({f"cache_{key}": val for key, val in cache.stats().items()
+                           if isinstance(val, (int, float))})
+        return {'timers': timers, 'counters': counters, 'client': client}
+
+    def to_json(self):
+        """Returns < snapshot() > as a JSON document."""
+
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self, prefix='swapi'):
+        """Returns < snapshot() > in the Prometheus text exposition format.
+
+        Parameters:
+            prefix (str): metric name prefix
+
+        Returns:
+            str: exposition text
+        """
+
+        snapshot = self.snapshot()
+        lines = []
+        for metric, field, kind, help_text in (
+            ('stage_calls_total', 'count', 'counter', 'Calls per ingest stage.'),
+            ('stage_seconds_total', 'total_seconds', 'counter', 'Time spent per ingest stage.'),
+            ('stage_seconds_max', 'max_seconds', 'gauge', 'Slowest call per ingest stage.')
+        ):
+            lines.append(f"# HELP {prefix}_{metric} {help_text}")
+            lines.append(f"# TYPE {prefix}_{metric} {kind}")
+            for stage, stats in sorted(snapshot['timers'].items()):
+                lines.append(f'{prefix}_{metric}{{stage="{stage}"}} {stats[field]}')
+        for group in ('counters', 'client'):
+            for name, val in sorted(snapshot[group].items()):
+                metric = f"{prefix}_{'client_' if group == 'client' else ''}{name}"
+                lines.append(f"# TYPE {metric} gauge")
+                lines.append(f"{metric} {val}")
+        return '\n'.join(lines) + '\n'
+
+
+registry = Metrics() # shared registry used by the installed stage wrappers
+_originals = {} # (module name, function name) -> unwrapped function, see enable()
+
+
+def timer(name):
+    """Returns a Timer on the shared registry (see < Metrics.timer() >)."""
+
+    return registry.timer(name)
+
+
+def count(name, amount=1):
+    """Increments a counter on the shared registry (see < Metrics.count() >)."""
+
+    registry.count(name, amount)
+
+
+def instrument(func, stage, counters=None):
+    """Wraps < func > with a timer for < stage > on the shared registry. Each successful call
+    also increments the counters returned by < counters(result, args, kwargs) >, and each
+    call that raises increments '<stage>_errors' (e.g., get_swapi_resource_errors).
+
+    Parameters:
+        func (function): function to wrap
+        stage (str): stage name
+        counters (function): returns (counter name, amount) pairs for one call, or None
+
+    Returns:
+        function: the wrapper
+    """
+
+    timed = registry.timer(stage)(func)
+
+    @functools.wraps(func)
+    def instrumented(*args, **kwargs):
+        try:
+            result = timed(*args, **kwargs)
+        except Exception:
+            registry.count(f"{stage}_errors")
+            raise
+        if counters is not None and registry.enabled:
+            for name, amount in counters(result, args, kwargs):
+                registry.count(name, amount)
+        return result
+    return instrumented
+
+
+def enable():
+    """Enables the shared registry and wraps every function listed in < STAGES > with a
+    timer and its counters (see < instrument() >). The wrappers are installed on the modules
+    themselves, so calls made through the module (including calls between functions of the
+    same module) are measured. While disabled no wrapper is installed and the instrumented
+    functions run with no overhead at all.
+
+    Parameters:
+        None
+
+    Returns:
+        Metrics: the shared registry
+    """
+
+    for module, name, stage, counters in STAGES:
+        key = (module.__name__, name)
+        if key not in _originals:
+            _originals[key] = getattr(module, name)
+            setattr(module, name, instrument(_originals[key], stage, counters))
+    registry.enabled = True
+    return registry
+
+
+def disable():
+    """Disables the shared registry and restores the original stage functions. Recorded
+    values are kept until < Metrics.reset() >.
+
+    Parameters:
+        None
+
+    Returns:
+        None
+    """
+
+    registry.enabled = False
+    for module, name, _, _ in STAGES:
+        original = _originals.pop((module.__name__, name), None)
+        if original is not None:
+            setattr(module, name, original)
+
+
+def write_snapshot(filepath, fmt='json'):
+    """Writes the shared registry's snapshot to < filepath >.
+
+    Parameters:
+        filepath (str): the path to the file
+        fmt (str): 'json' or 'prometheus'
+
+    Returns:
+        None
+    """
+
+    text = registry.to_prometheus() if fmt == 'prometheus' else registry.to_json()
+    with open(filepath, 'w', encoding='utf-8') as file_obj:
+        file_obj.write(text)
+
+
+def main():
+    """Runs < swapi.main() > with instrumentation enabled and prints or writes the snapshot."""
+
+    parser = argparse.ArgumentParser(description='Time the stages of the SWAPI ingest.')
+    parser.add_argument('--format', choices=('json', 'prometheus'), default='json')
+    parser.add_argument('--output', help='write the snapshot to this file instead of stdout')
+    args = parser.parse_args()
+
+    enable()
+    try:
+        swapi.main()
+    finally:
+        disable()
+    if args.output:
+        write_snapshot(args.output, args.format)
+    else:
+        print(registry.to_prometheus() if args.format == 'prometheus' else registry.to_json())
+    return registry.snapshot()
+
+
+if __name__ == '__main__':
+    main()
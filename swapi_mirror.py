@@ -0,0 +1,252 @@
+import copy
+import json
+import math
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import swapi_client
+
+
+ENDPOINT = swapi_client.ENDPOINT
+COLLECTIONS = ('people', 'planets', 'starships', 'species', 'films')
+MAX_WORKERS = 8 # page requests in flight per crawl
+
+# fields matched by a SWAPI '?search=' query, per collection
+SEARCH_FIELDS = {
+    'people': ('name',),
+    'planets': ('name',),
+    'starships': ('name', 'model'),
+    'species': ('name',),
+    'films': ('title',),
+    'vehicles': ('name', 'model')
+}
+
+
+def crawl_collection(name, endpoint=ENDPOINT, max_workers=MAX_WORKERS):
+    """Fetches every record of a SWAPI collection. The first page reveals the total record
+    count and the page size, so the remaining pages are requested concurrently. If the count
+    cannot be used the crawler falls back to following the < next > links one page at a time.
+
+    Parameters:
+        name (str): collection name (e.g., 'people')
+        endpoint (str): SWAPI base url
+        max_workers (int): maximum number of page requests in flight
+
+    Returns:
+        list: records in page order
+    """
+
+    url = f"{endpoint}/{name}/"
+    first = swapi_client.fetch_json(url)
+    records = list(first['results'])
+    page_size = len(first['results'])
+    count = first.get('count')
+
+    if not first.get('next'):
+        return records
+
+    if count and page_size:
+        pages = range(2, math.ceil(count / page_size) + 1)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            payloads = executor.map(lambda page: swapi_client.fetch_json(url, {'page': page}), pages)
+            for payload in payloads:
+                records.extend(payload['results'])
+        return records
+
+    next_url = first['next']
+    while next_url:
+        payload = swapi_client.fetch_json(next_url)
+        records.extend(payload['results'])
+        next_url = payload.get('next')
+    return records
+
+
+def crawl(endpoint=ENDPOINT, collections=COLLECTIONS, max_workers=MAX_WORKERS):
+    """Mirrors whole SWAPI collections. Collections are crawled side by side, each one
+    fanning its pages out over its own worker pool.
+
+    Parameters:
+        endpoint (str): SWAPI base url
+        collections (tuple): collection names to mirror
+        max_workers (int): maximum number of page requests in flight per collection
+
+    Returns:
+        dict: snapshot holding the endpoint, crawl time and records of each collection
+    """
+
+    with ThreadPoolExecutor(max_workers=len(collections)) as executor:
+        results = executor.map(lambda name: crawl_collection(name, endpoint, max_workers), collections)
+        records = dict(zip(collections, results))
+
+    return {
+        'endpoint': endpoint,
+        'crawled_at': time.time(),
+        'collections': records
+    }
+
+
+def write_snapshot(filepath, snapshot):
+    """Writes a snapshot to disk as compact JSON.
+
+    Parameters:
+        filepath (str): the path to the file
+        snapshot (dict): snapshot returned by < crawl() >
+
+    Returns:
+        None
+    """
+
+    with open(filepath, 'w', encoding='utf-8') as file_obj:
+        json.dump(snapshot, file_obj, ensure_ascii=False, separators=(',', ':'))
+
+
+def read_snapshot(filepath):
+    """Reads a snapshot written by < write_snapshot() >.
+
+    Parameters:
+        filepath (str): path to file
+
+    Returns:
+        dict: snapshot
+    """
+
+    with open(filepath, 'r', encoding='utf-8') as file_obj:
+        return json.load(file_obj)
+
+
+def resource_path(url):
+    """Splits a SWAPI url into its collection name and record id. The host and any
+    duplicate or trailing slashes are ignored so urls from different mirrors of the API
+    map to the same record.
+
+    Parameters:
+        url (str): resource or collection url
+
+    Returns:
+        tuple: (collection name, record id or None)
+    """
+
+    segments = [segment for segment in urlsplit(url).path.split('/') if segment]
+    if segments and segments[-1].isdigit():
+        return segments[-2] if len(segments) > 1 else None, segments[-1]
+    return (segments[-1] if segments else None), None
+
+
+class MirrorIndex:
+    """In-memory index over a snapshot that answers SWAPI lookups locally. Records are
+    indexed by collection and id; searches scan the collection (see < search() >).
+
+    Attributes:
+        snapshot (dict): snapshot returned by < crawl() > or < read_snapshot() >
+        records (dict): per-collection mapping of record id to record
+
+    Methods:
+        get: return a record by url
+        search: emulate a SWAPI '?search=' query by scanning a collection
+        lookup: answer a < fetch_json() > request, if possible
+    """
+
+    def __init__(self, snapshot):
+        """Initialize a MirrorIndex instance, indexing each record by collection and id."""
+
+        self.snapshot = snapshot
+        self.records = {}
+        self._search_keys = {}
+        for name, records in snapshot['collections'].items():
+            by_id = {}
+            keys = []
+            fields = SEARCH_FIELDS.get(name, ('name',))
+            for record in records:
+                by_id[resource_path(record['url'])[1]] = record
+                keys.append((' '.join(str(record.get(field) or '') for field in fields).lower(), record))
+            self.records[name] = by_id
+            self._search_keys[name] = keys
+
+    def get(self, url):
+        """Returns a copy of the record located at < url >.
+
+        Parameters:
+            url (str): resource url
+
+        Returns:
+            dict: record or None if the mirror does not hold it
+        """
+
+        name, record_id = resource_path(url)
+        record = self.records.get(name, {}).get(record_id)
+        return copy.deepcopy(record) if record is not None else None
+
+    def search(self, name, term):
+        """Emulates a SWAPI '?search=' query: case-insensitive substring match on the
+        collection's searchable fields, in snapshot order. This is a linear scan over the
+        collection that copies each match; < swapi_search.load_index() > installs a trigram
+        index that answers searches without scanning (ranked best first).
+
+        Parameters:
+            name (str): collection name
+            term (str): search term
+
+        Returns:
+            dict: SWAPI-style page payload or None if the collection is not mirrored
+        """
+
+        if name not in self._search_keys:
+            return None
+        term = term.lower()
+        results = [copy.deepcopy(record) for key, record in self._search_keys[name] if term in key]
+        return {'count': len(results), 'next': None, 'previous': None, 'results': results}
+
+    def lookup(self, url, params=None):
+        """Answers a < swapi_client.fetch_json() > request from the mirror. Record urls and
+        search queries are supported; anything else returns None so the caller falls back to
+        the network.
+
+        Parameters:
+            url (str): a url that specifies the resource
+            params (dict): optional dictionary of querystring arguments
+
+        Returns:
+            dict: decoded body or None
+        """
+
+        name, record_id = resource_path(url)
+        if record_id is not None and not params:
+            return self.get(url)
+        if record_id is None and params and set(params) == {'search'}:
+            return self.search(name, params['search'])
+        return None
+
+
+def load_mirror(filepath):
+    """Reads a snapshot, indexes it and installs the index on < swapi_client > so that
+    subsequent record and search lookups are answered locally (searches by scanning, see
+    < MirrorIndex.search() >).
+
+    Parameters:
+        filepath (str): path to a snapshot file
+
+    Returns:
+        MirrorIndex: the installed index
+    """
+
+    index = MirrorIndex(read_snapshot(filepath))
+    swapi_client.use_mirror(index)
+    return index
+
+
+def main():
+    """Crawls the configured SWAPI collections and writes a snapshot next to this module."""
+
+    abs_path = os.path.dirname(os.path.abspath(__file__))
+    filepath = os.path.join(abs_path, 'swapi_mirror.json')
+    snapshot = crawl()
+    write_snapshot(filepath, snapshot)
+    for name, records in snapshot['collections'].items():
+        print(f"{name}: {len(records)} records")
+    return filepath
+
+
+if __name__ == '__main__':
+    main()
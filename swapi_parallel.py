@@ -0,0 +1,215 @@
+import copy
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import swapi
+import swapi_client
+import swapi_mirror
+
+
+CHUNKS_PER_WORKER = 4 # few large chunks amortize pickling; more than one evens out stragglers
+MIN_PARALLEL = 64 # smaller batches are enriched in-process
+FETCH_WORKERS = 8 # threads resolving homeworld and species urls in the parent
+
+_worker = {} # per-process state installed by _init_worker()
+
+
+class PrefetchedResources:
+    """Mirror-style lookup (see < swapi_client.use_mirror() >) answering record requests from
+    responses fetched ahead of time, so worker processes never touch the network for them.
+    Other requests (e.g., searches) go to the mirror installed before it, if any.
+
+    Attributes:
+        resources (dict): (collection, id) -> decoded record
+        fallback (object): lookup consulted for requests not prefetched, e.g. a SearchIndex
+
+    Methods:
+        lookup: answer a < fetch_json() > request, if possible
+    """
+
+    def __init__(self, resources, fallback=None):
+        """Initialize a PrefetchedResources instance from a url -> record dictionary."""
+
+        self.resources = {swapi_mirror.resource_path(url): data for url, data in resources.items()}
+        self.fallback = fallback
+
+    def lookup(self, url, params=None):
+        """Returns a copy of the prefetched record for < url >, or the answer of < fallback >.
+
+        Parameters:
+            url (str): a url that specifies the resource
+            params (dict): querystring arguments; requests with any are left to < fallback >
+
+        Returns:
+            dict: decoded record or None
+        """
+
+        data = None if params else self.resources.get(swapi_mirror.resource_path(url))
+        if data is not None:
+            return copy.deepcopy(data)
+        if self.fallback is not None:
+            return self.fallback.lookup(url, params)
+        return None
+
+
+def prefetch(urls, max_workers=FETCH_WORKERS):
+    """Fetches every distinct url concurrently through < swapi.get_swapi_resource() >.
+
+    Parameters:
+        urls (iterable): resource urls (duplicates and None are skipped)
+        max_workers (int): maximum number of requests in flight
+
+    Returns:
+        dict: url -> decoded record
+    """
+
+    urls = list(dict.fromkeys(url for url in urls if url))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return dict(zip(urls, executor.map(swapi.get_swapi_resource, urls)))
+
+
+def _init_worker(kind, supplements, planets, resources, workers):
+    """Process pool initializer: receives the shared lookup tables once per process instead
+    of once per chunk. Client state inherited through fork (session, sqlite cache connection,
+    locks) is dropped first, and the response cache is disabled: requests neither the
+    prefetched resources nor an inherited mirror can answer go to the network on a fresh
+    session, within a 1 / < workers > share of the parent's rate limit."""
+
+    swapi_client.reset_after_fork(share=workers)
+    _worker['kind'] = kind
+    _worker['supplements'] = supplements
+    _worker['planets'] = planets
+    if resources is not None:
+        swapi_client.use_mirror(PrefetchedResources(resources, swapi_client.get_mirror()))
+
+
+def _enrich_one(kind, data, supplements, planets, entities=None):
+    """Merges, cleans and constructs one record."""
+
+    if kind == 'person':
+        return swapi.create_person(swapi.enrich_data(data, supplements, 'person'), planets, entities)
+    return swapi.create_starship(swapi.enrich_data(data, supplements, 'starship'))
+
+
+def _enrich_chunk(chunk):
+    """Enriches a chunk of records inside a worker process."""
+
+    kind = _worker['kind']
+    supplements = _worker['supplements']
+    planets = _worker['planets']
+    return [_enrich_one(kind, data, supplements, planets) for data in chunk]
+
+
+def chunk_size(count, workers, chunks_per_worker=CHUNKS_PER_WORKER):
+    """Returns the number of records sent to a worker per task: large enough that pickling
+    and inter-process round trips are amortized over many records, small enough that each
+    worker gets several chunks to balance uneven record costs.
+
+    Parameters:
+        count (int): number of records
+        workers (int): number of worker processes
+        chunks_per_worker (int): target number of chunks per worker
+
+    Returns:
+        int: records per chunk
+    """
+
+    return max(1, math.ceil(count / (workers * chunks_per_worker)))
+
+
+def enrich_batch(kind, records, supplements=None, planets=None, resources=None,
+                 max_workers=None, chunksize=None, entities=None):
+    """Enriches raw SWAPI records in parallel: each record is merged with its Wookieepedia
+    supplement, cleaned and turned into an entity. Records are split into contiguous chunks
+    that are farmed out to a process pool; the supplement stores and the prefetched homeworld
+    and species responses are handed to each worker once by the pool initializer, so only
+    the chunks themselves and the resulting entities cross process boundaries. Homeworlds and
+    species built in different workers are re-interned in < entities > on return, as are the
+    people themselves.
+
+    Parameters:
+        kind (str): 'person' or 'starship'
+        records (list): raw SWAPI records
+        supplements (SupplementStore): Wookieepedia records of the same kind
+        planets (SupplementStore): Wookieepedia planets (people only)
+        resources (dict): prefetched url -> record for homeworlds and species; fetched with
+            < prefetch() > if omitted
+        max_workers (int): worker processes; defaults to the CPU count
+        chunksize (int): records per task; defaults to < chunk_size() >
+        entities (IdentityMap): identity map to intern in; defaults to a map private to the
+            batch, so people of the batch share homeworlds and species but no earlier instance
+            is reused
+
+    Returns:
+        list: entities in input order
+    """
+
+    if kind not in ('person', 'starship'):
+        raise ValueError(f"kind must be 'person' or 'starship', not {kind!r}")
+    records = list(records)
+    workers = max_workers or os.cpu_count() or 1
+    if entities is None:
+        entities = swapi.IdentityMap()
+
+    if kind == 'person' and resources is None:
+        resources = prefetch(
+            [data.get('homeworld') for data in records] +
+            [data['species'][0] for data in records if data.get('species')]
+        )
+
+    if workers == 1 or len(records) < MIN_PARALLEL:
+        if resources is None:
+            return [_enrich_one(kind, data, supplements, planets, entities) for data in records]
+        mirror = swapi_client.get_mirror() # still answers searches from other threads
+        swapi_client.use_mirror(PrefetchedResources(resources, mirror))
+        try:
+            return [_enrich_one(kind, data, supplements, planets, entities) for data in records]
+        finally:
+            swapi_client.use_mirror(mirror)
+
+    size = chunksize or chunk_size(len(records), workers)
+    chunks = [records[i:i + size] for i in range(0, len(records), size)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(kind, supplements, planets, resources, workers)) as executor:
+        results = [entity for chunk in executor.map(_enrich_chunk, chunks) for entity in chunk]
+
+    if kind == 'person':
+        for i, person in enumerate(results):
+            if person.homeworld is not None:
+                person.homeworld = entities.add(person.homeworld)
+            if person.species is not None:
+                person.species = entities.add(person.species)
+            results[i] = entities.add(person)
+    return results
+
+
+def enrich_people(records, people=None, planets=None, **options):
+    """Parallel batch counterpart of < swapi.create_person() > (see < enrich_batch() >).
+
+    Parameters:
+        records (list): raw SWAPI people records
+        people (SupplementStore): Wookieepedia people
+        planets (SupplementStore): Wookieepedia planets
+        **options: resources, max_workers, chunksize and entities
+
+    Returns:
+        list: Person instances in input order
+    """
+
+    return enrich_batch('person', records, people, planets, **options)
+
+
+def enrich_starships(records, starships=None, **options):
+    """Parallel batch counterpart of < swapi.create_starship() > (see < enrich_batch() >).
+
+    Parameters:
+        records (list): raw SWAPI starship records
+        starships (SupplementStore): Wookieepedia starships
+        **options: max_workers, chunksize and entities
+
+    Returns:
+        list: Starship instances in input order
+    """
+
+    return enrich_batch('starship', records, starships, **options)
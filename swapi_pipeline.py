@@ -0,0 +1,554 @@
+import argparse
+import copy
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import swapi
+import swapi_client
+
+
+CACHE_DIR = '.swapi_pipeline' # task results keyed by input hash, see Pipeline
+MAX_WORKERS = 8 # tasks run concurrently
+
+# Wookieepedia supplement task name -> file
+SUPPLEMENTS = {
+    'wookiee_planets': './wookieepedia_planets.csv',
+    'wookiee_droids': './wookieepedia_droids.json',
+    'wookiee_people': './wookieepedia_people.json',
+    'wookiee_starships': './wookieepedia_starships.csv'
+}
+
+
+class Task:
+    """A unit of work in a < Pipeline >. The task function is called with the results of the
+    tasks named in < deps >, in order.
+
+    Attributes:
+        name (str): unique task name
+        func (callable): task function
+        deps (tuple): names of the tasks whose results are passed to < func >
+        files (tuple): input files; their contents are part of the task's input hash
+        outputs (tuple): files the task writes; a cached result is only reused if they still
+            hold what the task wrote
+        cache (bool): if False the task always runs (e.g., remote requests); its result is
+            still fingerprinted so unchanged responses let downstream tasks be skipped
+    """
+
+    def __init__(self, name, func, deps=(), files=(), outputs=(), cache=True):
+        """Initialize a Task instance."""
+
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        self.files = tuple(files)
+        self.outputs = tuple(outputs)
+        self.cache = cache
+
+
+class Pipeline:
+    """Runs a DAG of tasks. Tasks whose dependencies are satisfied run concurrently on a
+    thread pool, so independent branches overlap. A cacheable task is skipped when the hash
+    of its inputs (its code, the source of the loaded swapi modules, the fingerprints of its
+    dependencies' results and the contents of its input files) matches the previous run; its
+    stored result is reused instead.
+
+    Task functions must not mutate their arguments: a result may be shared by several
+    downstream tasks running at the same time.
+
+    Attributes:
+        tasks (dict): task name -> Task, in registration order
+        cache_dir (str): directory holding pickled task results; None disables the cache
+        max_workers (int): maximum number of tasks running at once
+        timings (list): per-task rows of the last < run() > (see < print_report() >)
+
+    Methods:
+        add: register a task
+        task: decorator form of < add() >
+        run: execute the pipeline
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, max_workers=MAX_WORKERS):
+        """Initialize an empty Pipeline instance."""
+
+        self.tasks = {}
+        self.cache_dir = cache_dir
+        self.max_workers = max_workers
+        self.timings = []
+        self._lock = threading.Lock()
+        self._source = None # see _source_digest(), computed per run()
+
+    def add(self, name, func, deps=(), files=(), outputs=(), cache=True):
+        """Registers a task. See < Task > for the parameters.
+
+        Returns:
+            Task: the registered task
+        """
+
+        if name in self.tasks:
+            raise ValueError(f"duplicate task {name!r}")
+        task = self.tasks[name] = Task(name, func, deps, files, outputs, cache)
+        return task
+
+    def task(self, name=None, deps=(), files=(), outputs=(), cache=True):
+        """Returns a decorator that registers the decorated function as a task named after
+        it (or < name >)."""
+
+        def decorator(func):
+            self.add(name or func.__name__, func, deps, files, outputs, cache)
+            return func
+        return decorator
+
+    def run(self, targets=None):
+        """Executes the tasks needed for < targets > (all tasks by default). Each task starts
+        as soon as all of its dependencies have finished. If a task raises, no further tasks
+        are started and the exception is re-raised once the running tasks have finished.
+
+        Parameters:
+            targets (iterable): names of the tasks to bring up to date
+
+        Returns:
+            dict: task name -> result
+        """
+
+        order = self._order(targets)
+        waiting = {name: set(self.tasks[name].deps) for name in order}
+        dependents = {name: [] for name in order}
+        for name in order:
+            for dep in self.tasks[name].deps:
+                dependents[dep].append(name)
+
+        results = {}
+        fingerprints = {}
+        self.timings = []
+        self._source = _source_digest()
+        error = None
+        started = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            running = {}
+
+            def submit_ready():
+                for name in [name for name, deps in waiting.items() if not deps]:
+                    del waiting[name]
+                    task = self.tasks[name]
+                    args = [results[dep] for dep in task.deps]
+                    dep_prints = [fingerprints[dep] for dep in task.deps]
+                    future = executor.submit(self._execute, task, args, dep_prints, started)
+                    running[future] = name
+
+            submit_ready()
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        results[name], fingerprints[name] = future.result()
+                    except Exception as exc:
+                        error = error or exc
+                        continue
+                    for dependent in dependents[name]:
+                        waiting[dependent].discard(name)
+                if error is None:
+                    submit_ready()
+
+        if error is not None:
+            raise error
+        return results
+
+    def _order(self, targets):
+        """Returns the names of < targets > and everything they depend on in dependency
+        order, validating dependency names and rejecting cycles."""
+
+        order = []
+        state = {} # name -> 'visiting' | 'done'
+
+        def visit(name, path):
+            if name not in self.tasks:
+                raise ValueError(f"unknown task {name!r} (required by {path[-1]!r})" if path
+                                 else f"unknown task {name!r}")
+            if state.get(name) == 'done':
+                return
+            if state.get(name) == 'visiting':
+                raise ValueError(f"dependency cycle: {' -> '.join(path + [name])}")
+            state[name] = 'visiting'
+            for dep in self.tasks[name].deps:
+                visit(dep, path + [name])
+            state[name] = 'done'
+            order.append(name)
+
+        for name in (targets or self.tasks):
+            visit(name, [])
+        return order
+
+    def _execute(self, task, args, dep_prints, started):
+        """Runs or skips one task and records its timing row.
+
+        Returns:
+            tuple: (result, fingerprint of the result)
+        """
+
+        begin = time.perf_counter()
+        key = self._input_key(task, dep_prints) if task.cache else None
+        status = 'ran'
+        try:
+            cached = self._load(task, key)
+            if cached is not None:
+                result = cached[0]
+                status = 'cached'
+            else:
+                result = task.func(*args)
+                if key is not None:
+                    self._store(task, key, result)
+        except Exception:
+            status = 'failed'
+            raise
+        finally:
+            end = time.perf_counter()
+            with self._lock:
+                self.timings.append({
+                    'task': task.name,
+                    'status': status,
+                    'start': begin - started,
+                    'seconds': end - begin
+                })
+
+        # a cacheable task is deterministic in its inputs, so its key identifies its result
+        return result, key if key is not None else _fingerprint(result)
+
+    def _input_key(self, task, dep_prints):
+        """Hashes everything a task's result depends on. Returns None if a dependency's result
+        could not be fingerprinted, in which case the task cannot be cached."""
+
+        if None in dep_prints:
+            return None
+        digest = hashlib.sha256()
+        for part in (task.name, _code_signature(task.func), self._source or '', *task.outputs, *dep_prints):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        for filepath in task.files:
+            digest.update(_file_digest(filepath).encode('utf-8'))
+        return digest.hexdigest()
+
+    def _cache_path(self, task):
+        """Returns the path of a task's cache file."""
+
+        return os.path.join(self.cache_dir, f"{task.name}.pickle")
+
+    def _load(self, task, key):
+        """Returns (result,) if a result stored for < key > exists and each of the task's
+        output files still has the digest recorded when it was written, else None."""
+
+        if key is None or not self.cache_dir:
+            return None
+        try:
+            with open(self._cache_path(task), 'rb') as file_obj:
+                stored_key, result, output_digests = pickle.load(file_obj)
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError, TypeError):
+            return None
+        if stored_key != key:
+            return None
+        if output_digests != [_file_digest(filepath) for filepath in task.outputs]:
+            return None # an output was removed, damaged or overwritten since
+        return (result,)
+
+    def _store(self, task, key, result):
+        """Pickles a task result next to its input key and the digests of its output files.
+        Results that cannot be pickled are simply not cached."""
+
+        if not self.cache_dir:
+            return
+        output_digests = [_file_digest(filepath) for filepath in task.outputs]
+        if 'missing' in output_digests:
+            return
+        try:
+            payload = pickle.dumps((key, result, output_digests), pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with open(fd, 'wb') as file_obj:
+                file_obj.write(payload)
+            os.replace(tmp_path, self._cache_path(task))
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+
+def _code_signature(func):
+    """Returns a string that changes when the body of < func > (or of the function wrapped by
+    a functools.partial) changes, including nested functions, default values and the values
+    captured by its closure. Functions it calls are covered by < _source_digest() >."""
+
+    args = getattr(func, 'args', ())
+    func = getattr(func, 'func', func)
+    code = getattr(func, '__code__', None)
+    if code is None:
+        return getattr(func, '__qualname__', repr(func))
+    digest = hashlib.sha256()
+    _hash_code(digest, code)
+    digest.update(repr((func.__defaults__, func.__kwdefaults__, args)).encode('utf-8'))
+    for cell in func.__closure__ or ():
+        try:
+            val = cell.cell_contents
+        except ValueError: # empty cell
+            val = None
+        val = _code_signature(val) if callable(val) else repr(val)
+        digest.update(val.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _hash_code(digest, code):
+    """Feeds the bytecode, names and constants of < code > and of every code object nested in
+    it (lambdas, comprehensions, inner functions) into < digest >."""
+
+    digest.update(code.co_code)
+    digest.update(repr(code.co_names).encode('utf-8'))
+    for const in code.co_consts:
+        if hasattr(const, 'co_code'):
+            _hash_code(digest, const)
+        else:
+            digest.update(repr(const).encode('utf-8'))
+
+
+def _source_digest():
+    """Returns a digest of the source files of every loaded swapi module, so that editing a
+    helper a task calls (e.g., swapi.clean_data() or a schema) invalidates cached results."""
+
+    digest = hashlib.sha256()
+    for name in sorted(sys.modules):
+        if name != 'swapi' and not name.startswith('swapi_'):
+            continue
+        filepath = getattr(sys.modules[name], '__file__', None)
+        if filepath:
+            digest.update(f"{name}:{_file_digest(filepath)}".encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _file_digest(filepath):
+    """Returns the SHA-256 hex digest of a file's contents, or 'missing'."""
+
+    digest = hashlib.sha256()
+    try:
+        with open(filepath, 'rb') as file_obj:
+            for block in iter(lambda: file_obj.read(1 << 16), b''):
+                digest.update(block)
+    except FileNotFoundError:
+        return 'missing'
+    return digest.hexdigest()
+
+
+def _fingerprint(result):
+    """Returns the SHA-256 hex digest of a pickled result, or None if it cannot be pickled."""
+
+    try:
+        return hashlib.sha256(pickle.dumps(result, pickle.HIGHEST_PROTOCOL)).hexdigest()
+    except (pickle.PicklingError, TypeError, AttributeError):
+        return None
+
+
+def print_report(rows):
+    """Prints < Pipeline.timings > rows in start order as an aligned table.
+
+    Parameters:
+        rows (list): timing rows
+
+    Returns:
+        None
+    """
+
+    print(f"{'task':<22}{'status':>8}{'start ms':>10}{'ms':>10}")
+    for row in sorted(rows, key=lambda row: row['start']):
+        print(f"{row['task']:<22}{row['status']:>8}{row['start'] * 1000:>10.1f}{row['seconds'] * 1000:>10.1f}")
+
+
+def _search(endpoint, collection, term):
+    """Returns the first SWAPI search result for < term > in < collection >."""
+
+    return swapi.get_swapi_resource(f"{endpoint}/{collection}/", {'search': term})['results'][0]
+
+
+def _write(filepath, entity):
+    """Writes < entity >'s JSON representation to < filepath > and returns the path."""
+
+    swapi.write_json(filepath, entity.jsonable())
+    return filepath
+
+
+def _store_instructions(droid, *instructions):
+    """Returns a copy of < droid > holding additional instructions."""
+
+    droid = copy.deepcopy(droid)
+    for instruction in instructions:
+        droid.store_instructions(instruction)
+    return droid
+
+
+def _crewed(starship, crew, passengers=None):
+    """Returns a copy of < starship > with a crew and optional passengers assigned."""
+
+    starship = copy.copy(starship)
+    starship.assign_crew_members(swapi.Crew(crew))
+    if passengers:
+        starship.add_passengers(swapi.Passengers(passengers))
+    return starship
+
+
+def _flight_plan(jakku):
+    """Challenge 09 flight plan instructions."""
+
+    return {
+        'flight_plan': {
+            'destination': jakku.jsonable(),
+            'hyperspace_route': "Burke's Trailing",
+            'year': "34 ABY"
+        }
+    }
+
+
+def _star_map(filepath):
+    """Challenge 10 star map instructions."""
+
+    star_map = swapi.read_json(filepath)
+    star_map.update(swapi.clean_data(star_map))
+    return {'star_map': star_map}
+
+
+def build_main_pipeline(endpoint=None, cache_dir=CACHE_DIR, max_workers=MAX_WORKERS):
+    """Declares the < swapi.main() > challenges as a task graph. Each challenge is split
+    into a remote search (always run), a merge/clean/construct step and a write step, so
+    that unchanged responses skip straight past construction and output. The Wookiee, Hoth,
+    R2-D2, Leia and X-wing challenges are independent of each other and of the Episode VII
+    chain and run side by side.
+
+    Unlike < swapi.main() >, which mutates the same X-wing, BB-8 and Millennium Falcon objects
+    from one challenge to the next, each step works on a copy. Challenge 07's uncleaned X-wing
+    file, which challenge 08 overwrites, is not written.
+
+    Parameters:
+        endpoint (str): SWAPI base url; defaults to < swapi_client.ENDPOINT >
+        cache_dir (str): task result cache directory; None disables skipping
+        max_workers (int): maximum number of tasks running at once
+
+    Returns:
+        Pipeline: the declared pipeline
+    """
+
+    endpoint = endpoint or swapi_client.ENDPOINT
+    pipeline = Pipeline(cache_dir, max_workers)
+    add = pipeline.add
+
+    for name, filepath in SUPPLEMENTS.items():
+        add(name, lambda filepath=filepath: swapi.load_supplements(filepath), files=(filepath,))
+
+    searches = {
+        'wookiee': ('species', 'wookiee'),
+        'hoth': ('planets', 'hoth'),
+        'r2_d2': ('people', 'r2-d2'),
+        'leia': ('people', 'Leia'),
+        'x_wing': ('starships', 'T-70 X-wing'),
+        'poe': ('people', 'Poe Dameron'),
+        'bb8': ('people', 'BB8'),
+        'jakku': ('planets', 'jakku'),
+        'rey': ('people', 'Rey'),
+        'finn': ('people', 'Finn'),
+        'm_falcon': ('starships', 'Millennium Falcon'),
+        'han_solo': ('people', 'Han Solo'),
+        'chewie': ('people', 'Chewbacca')
+    }
+    for name, (collection, term) in searches.items():
+        add(f"search_{name}", lambda collection=collection, term=term: _search(endpoint, collection, term),
+            cache=False)
+
+    # CHALLENGES 02-07: independent single-entity exports
+    add('wookiee', lambda data: swapi.create_species(dict(data)), deps=('search_wookiee',))
+    add('hoth', lambda data, planets: swapi.create_planet(swapi.enrich_data(data, planets)),
+        deps=('search_hoth', 'wookiee_planets'))
+    add('r2_d2', lambda data, droids: swapi.create_droid(swapi.enrich_data(data, droids)),
+        deps=('search_r2_d2', 'wookiee_droids'))
+    add('leia', lambda data, people, planets: swapi.create_person(swapi.enrich_data(data, people), planets),
+        deps=('search_leia', 'wookiee_people', 'wookiee_planets'))
+
+    # CHALLENGE 08: the cleaned X-wing supersedes the challenge 07 export
+    add('x_wing', lambda data, starships: swapi.create_starship(swapi.enrich_data(data, starships, 'starship')),
+        deps=('search_x_wing', 'wookiee_starships'))
+
+    # CHALLENGE 09 MISSION TO JAKKU
+    add('poe', lambda data, people, planets: swapi.create_person(swapi.enrich_data(data, people, 'person'), planets),
+        deps=('search_poe', 'wookiee_people', 'wookiee_planets'))
+    add('bb8', lambda data, droids: swapi.create_droid(swapi.enrich_data(data, droids, 'droid')),
+        deps=('search_bb8', 'wookiee_droids'))
+    add('jakku', lambda data, planets: swapi.create_planet(swapi.enrich_data(data, planets, 'planet')),
+        deps=('search_jakku', 'wookiee_planets'))
+    add('lor', lambda people, planets: swapi.create_person(
+            swapi.enrich_data(people.require('Lor San Tekka'), people, 'person'), planets),
+        deps=('wookiee_people', 'wookiee_planets'))
+    add('bb8_jakku', lambda bb8, jakku, lor: _store_instructions(
+            bb8, _flight_plan(jakku), {'locate_person': lor.jsonable()}),
+        deps=('bb8', 'jakku', 'lor'))
+    add('x_wing_jakku', lambda x_wing, poe, bb8: _crewed(x_wing, {'pilot': poe, 'astro_mech_droid': bb8}),
+        deps=('x_wing', 'poe', 'bb8_jakku'))
+
+    # CHALLENGE 10 STAR MAP
+    add('star_map', lambda: _star_map('./wookieepedia_star_map.json'),
+        files=('./wookieepedia_star_map.json',))
+    add('bb8_star_map', _store_instructions, deps=('bb8_jakku', 'star_map'))
+
+    # CHALLENGES 11-12 ESCAPE FROM JAKKU, JOURNEY TO TAKODANA
+    for name in ('rey', 'finn', 'han_solo', 'chewie'):
+        add(name, lambda data, people, planets: swapi.create_person(swapi.enrich_data(data, people, 'person'), planets),
+            deps=(f"search_{name}", 'wookiee_people', 'wookiee_planets'))
+    add('m_falcon', lambda data, starships: swapi.create_starship(swapi.enrich_data(data, starships, 'starship')),
+        deps=('search_m_falcon', 'wookiee_starships'))
+    add('m_falcon_escape', lambda falcon, rey, finn, bb8: _crewed(
+            falcon, {'pilot': rey, 'gunner': finn}, [bb8]),
+        deps=('m_falcon', 'rey', 'finn', 'bb8_star_map'))
+    add('m_falcon_takodana', lambda falcon, han, chewie, rey, finn, bb8: _crewed(
+            falcon, {'pilot': han, 'co-pilot': chewie}, [rey, finn, bb8]),
+        deps=('m_falcon', 'han_solo', 'chewie', 'rey', 'finn', 'bb8_star_map'))
+
+    outputs = {
+        'wookiee': 'stu_swapi_species_wookiee.json',
+        'hoth': 'stu_swapi_planet_hoth.json',
+        'r2_d2': 'stu_swapi_droid_r2_d2.json',
+        'leia': 'stu_swapi_person_leia.json',
+        'x_wing': 'stu_swapi_starship_x_wing.json',
+        'x_wing_jakku': 'stu_episode_vii_mission_jakku.json',
+        'bb8_star_map': 'stu_episode_vii_star_map.json',
+        'm_falcon_escape': 'stu_episode_vii_escape-jakku.json',
+        'm_falcon_takodana': 'stu_episode_vii_journey_takodana.json'
+    }
+    for name, filepath in outputs.items():
+        add(f"write_{name}", lambda entity, filepath=filepath: _write(filepath, entity),
+            deps=(name,), outputs=(filepath,))
+
+    return pipeline
+
+
+def main():
+    """Runs the < swapi.main() > challenges as a pipeline and prints per-task timings."""
+
+    parser = argparse.ArgumentParser(description='Run the SWAPI challenges as a task graph.')
+    parser.add_argument('targets', nargs='*', help='tasks to bring up to date (default: all)')
+    parser.add_argument('--workers', type=int, default=MAX_WORKERS, help='tasks run concurrently')
+    parser.add_argument('--no-cache', action='store_true', help='run every task')
+    args = parser.parse_args()
+
+    pipeline = build_main_pipeline(
+        cache_dir=None if args.no_cache else CACHE_DIR, max_workers=args.workers
+    )
+    started = time.perf_counter()
+    pipeline.run(args.targets or None)
+    print_report(pipeline.timings)
+    print(f"total {(time.perf_counter() - started) * 1000:.1f} ms")
+    return pipeline.timings
+
+
+if __name__ == '__main__':
+    main()
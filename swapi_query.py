@@ -0,0 +1,508 @@
+import bisect
+import heapq
+import operator
+
+
+# fields indexed by default: field path -> index kind
+DEFAULT_INDEXES = {
+    'url': 'hash',
+    'name': 'sorted',
+    'starship_class': 'hash',
+    'climate': 'hash',
+    'terrain': 'hash'
+}
+
+# comparison operators accepted by Query.where()
+OPERATORS = {
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+    'in': lambda val, options: val in options,
+    'contains': lambda val, item: item in val
+}
+
+
+def get_field(entity, path):
+    """Returns the value found by following a dotted attribute path (e.g.,
+    'homeworld.population'). Missing attributes and None links yield None.
+
+    Parameters:
+        entity (object): entity instance
+        path (str): attribute name or dotted path
+
+    Returns:
+        any: attribute value or None
+    """
+
+    val = entity
+    for name in path.split('.'):
+        val = getattr(val, name, None)
+        if val is None:
+            return None
+    return val
+
+
+def sort_key(val):
+    """Returns the key under which a field value is ordered. Numbers sort before strings, so
+    a field mixing both still has a total order; other values (None, lists, dictionaries,
+    entities) have no key and their entities sort last.
+
+    Parameters:
+        val (any): field value
+
+    Returns:
+        tuple: (type rank, value) or None
+    """
+
+    if isinstance(val, (int, float)):
+        return (0, val)
+    if isinstance(val, str):
+        return (1, val)
+    return None
+
+
+class HashIndex:
+    """Equality index: field value -> entities. List values (e.g., climate) are indexed under
+    each element; an index holding only lists serves 'contains' conditions, one holding no
+    lists serves '==' and 'in'.
+
+    Attributes:
+        field (str): indexed field path
+        buckets (dict): value -> list of entities in insertion order
+        multi (bool): True once a list value has been indexed
+        scalar (bool): True once a value other than a list has been indexed
+        hashable (bool): False once an unhashable value (e.g., a dictionary) was added; the
+            index then serves nothing and queries fall back to a scan
+    """
+
+    kind = 'hash'
+
+    def __init__(self, field):
+        """Initialize an empty HashIndex instance."""
+
+        self.field = field
+        self.buckets = {}
+        self.multi = False
+        self.scalar = False
+        self.hashable = True
+
+    def add(self, entity):
+        """Indexes < entity > under its field value(s)."""
+
+        val = get_field(entity, self.field)
+        if val is None or not self.hashable:
+            return
+        try:
+            if isinstance(val, list):
+                keys = dict.fromkeys(val) # an entity appears once per distinct element
+                self.multi = True
+            else:
+                keys = (val,)
+                self.scalar = True
+            for key in keys:
+                self.buckets.setdefault(key, []).append(entity)
+        except TypeError: # e.g., a dictionary value
+            self.hashable = False
+            self.buckets = {}
+
+    def lookup(self, op, value):
+        """Returns a superset of the entities matching a condition, or None if the index
+        cannot serve it."""
+
+        if not self.hashable:
+            return None
+        try:
+            if op == 'contains' and not self.scalar:
+                return self.buckets.get(value, [])
+            if op == '==' and not self.multi:
+                return self.buckets.get(value, [])
+            if op == 'in' and not self.multi:
+                matches = []
+                for option in dict.fromkeys(value):
+                    matches.extend(self.buckets.get(option, ()))
+                return matches
+        except TypeError: # unhashable comparison value
+            return None
+        return None
+
+
+class SortedIndex:
+    """Ordered index over a scalar field, serving equality and range conditions with
+    < bisect > and yielding entities in field order for sorted, limited queries. Values are
+    held under their < sort_key() >; entities whose value has none are not indexed.
+
+    Attributes:
+        field (str): indexed field path
+        keys (list): sort keys in ascending order
+        entities (list): entities aligned with < keys >
+    """
+
+    kind = 'sorted'
+
+    def __init__(self, field):
+        """Initialize an empty SortedIndex instance."""
+
+        self.field = field
+        self.keys = []
+        self.entities = []
+
+    def add(self, entity):
+        """Inserts < entity > at the position of its field value; entities with equal values
+        keep insertion order."""
+
+        key = sort_key(get_field(entity, self.field))
+        if key is None:
+            return
+        i = bisect.bisect_right(self.keys, key)
+        self.keys.insert(i, key)
+        self.entities.insert(i, entity)
+
+    def bounds(self, op, value):
+        """Returns the (start, stop) slice of entities that may satisfy a condition, or None
+        if the index cannot serve it. A slice may hold values of another type than
+        < value >; callers check each entity against the condition."""
+
+        key = sort_key(value)
+        if key is None:
+            return None
+        keys = self.keys
+        if op == '==':
+            return bisect.bisect_left(keys, key), bisect.bisect_right(keys, key)
+        if op == '<':
+            return 0, bisect.bisect_left(keys, key)
+        if op == '<=':
+            return 0, bisect.bisect_right(keys, key)
+        if op == '>':
+            return bisect.bisect_right(keys, key), len(keys)
+        if op == '>=':
+            return bisect.bisect_left(keys, key), len(keys)
+        return None
+
+    def walk(self, start, stop, descending=False):
+        """Yields the entities in positions < start >:< stop > in field order, or in reverse
+        field order with equal values still in insertion order (as sorted(reverse=True)
+        does). Nothing is copied, so stopping early costs only what was consumed."""
+
+        entities = self.entities
+        if not descending:
+            for i in range(start, stop):
+                yield entities[i]
+            return
+        keys = self.keys
+        i = stop - 1
+        while i >= start:
+            run = bisect.bisect_left(keys, keys[i], start, i) # first entry equal to keys[i]
+            for j in range(run, i + 1):
+                yield entities[j]
+            i = run - 1
+
+    def lookup(self, op, value):
+        """Returns a superset of the entities matching a condition, or None if the index
+        cannot serve it."""
+
+        bounds = self.bounds(op, value)
+        if bounds is None:
+            return None
+        return self.entities[bounds[0]:bounds[1]]
+
+
+INDEX_TYPES = {'hash': HashIndex, 'sorted': SortedIndex}
+
+
+class Collection:
+    """In-memory collection of entities (see < swapi.py >) with secondary indexes. Indexes are
+    updated as entities are added; if an indexed attribute is changed afterwards call
+    < reindex() >.
+
+    Attributes:
+        entities (list): entities in insertion order
+        indexes (dict): field path -> HashIndex/SortedIndex
+
+    Methods:
+        add: add one entity
+        create_index: build a secondary index on a field
+        extend: add several entities
+        query: start a query
+        reindex: rebuild every index
+    """
+
+    def __init__(self, entities=(), indexes=None):
+        """Initialize a Collection instance.
+
+        Parameters:
+            entities (iterable): initial entities
+            indexes (dict): field path -> 'hash' or 'sorted'; defaults to < DEFAULT_INDEXES >
+        """
+
+        self.entities = []
+        self.indexes = {}
+        for field, kind in (DEFAULT_INDEXES if indexes is None else indexes).items():
+            self.create_index(field, kind)
+        self.extend(entities)
+
+    def __iter__(self):
+        """Iterate over the entities in insertion order."""
+
+        return iter(self.entities)
+
+    def __len__(self):
+        """Return the number of entities."""
+
+        return len(self.entities)
+
+    def add(self, entity):
+        """Adds < entity > and indexes it.
+
+        Parameters:
+            entity (object): entity instance
+
+        Returns:
+            None
+        """
+
+        self.entities.append(entity)
+        for index in self.indexes.values():
+            index.add(entity)
+
+    def extend(self, entities):
+        """Adds every entity of an iterable (see < add() >)."""
+
+        for entity in entities:
+            self.add(entity)
+
+    def create_index(self, field, kind='hash'):
+        """Builds a secondary index on < field > over the current entities.
+
+        Parameters:
+            field (str): attribute name or dotted path (e.g., 'homeworld.population')
+            kind (str): 'hash' for equality/membership or 'sorted' for ranges and ordering
+
+        Returns:
+            HashIndex/SortedIndex: the new index
+        """
+
+        if kind not in INDEX_TYPES:
+            raise ValueError(f"index kind must be one of {tuple(INDEX_TYPES)}, not {kind!r}")
+        index = self.indexes[field] = INDEX_TYPES[kind](field)
+        for entity in self.entities:
+            index.add(entity)
+        return index
+
+    def reindex(self):
+        """Rebuilds every index from the current attribute values."""
+
+        for field, index in list(self.indexes.items()):
+            self.create_index(field, index.kind)
+
+    def query(self):
+        """Returns a new Query over the collection."""
+
+        return Query(self)
+
+
+class Query:
+    """Chainable query over a Collection: conditions, an optional sort and limit, and an
+    optional projection. Conditions on indexed fields narrow the candidates through the index
+    (the most selective one is used) and every condition is then checked per candidate. A
+    sort with a limit keeps only the top k candidates with < heapq >, or walks a sorted index
+    in order and stops early when the sort field is indexed.
+
+    Methods:
+        all: return the matching entities (or projected dictionaries)
+        count: return the number of matches
+        filter: add an arbitrary predicate
+        first: return the first match
+        limit: keep at most k results
+        order_by: sort the results
+        select: project the results onto field paths
+        where: add a field condition
+    """
+
+    def __init__(self, collection):
+        """Initialize a Query instance."""
+
+        self.collection = collection
+        self._conditions = [] # (field, op, value)
+        self._predicates = []
+        self._order = None # (field, descending)
+        self._limit = None
+        self._fields = None
+
+    def where(self, field, op, value):
+        """Keeps entities whose < field > satisfies < op > < value >. Entities whose field is
+        None never match.
+
+        Parameters:
+            field (str): attribute name or dotted path
+            op (str): one of < OPERATORS >; 'contains' tests membership in a list field and
+                'in' membership of the field value in < value >
+            value (any): comparison value
+
+        Returns:
+            Query: this query
+        """
+
+        if op not in OPERATORS:
+            raise ValueError(f"op must be one of {tuple(OPERATORS)}, not {op!r}")
+        self._conditions.append((field, op, value))
+        return self
+
+    def filter(self, predicate):
+        """Keeps entities for which < predicate(entity) > is true."""
+
+        self._predicates.append(predicate)
+        return self
+
+    def order_by(self, field, descending=False):
+        """Sorts the results by < field > (see < sort_key() >); entities whose field is None
+        or not orderable sort last, in insertion order."""
+
+        self._order = (field, descending)
+        return self
+
+    def limit(self, k):
+        """Keeps at most < k > results."""
+
+        self._limit = k
+        return self
+
+    def select(self, *fields):
+        """Projects each result onto a dictionary of the given field paths."""
+
+        self._fields = fields
+        return self
+
+    def __iter__(self):
+        """Iterate over the results."""
+
+        return iter(self.all())
+
+    def all(self):
+        """Runs the query.
+
+        Parameters:
+            None
+
+        Returns:
+            list: matching entities, or dictionaries if < select() > was called
+        """
+
+        results = self._run()
+        if self._fields is None:
+            return results
+        return [{field: get_field(entity, field) for field in self._fields} for entity in results]
+
+    def first(self):
+        """Returns the first result or None."""
+
+        if self._limit is None:
+            self._limit = 1
+        results = self.all()
+        return results[0] if results else None
+
+    def count(self):
+        """Returns the number of matching entities, ignoring any limit."""
+
+        return len(self._matching(self._candidates()))
+
+    def _candidates(self):
+        """Returns the candidates of the most selective index-served condition, or every
+        entity if no condition is served by an index."""
+
+        best = None
+        for field, op, value in self._conditions:
+            index = self.collection.indexes.get(field)
+            if index is None:
+                continue
+            matches = index.lookup(op, value)
+            if matches is not None and (best is None or len(matches) < len(best)):
+                best = matches
+        return self.collection.entities if best is None else best
+
+    def _matcher(self):
+        """Returns a function testing one entity against every condition and predicate, or
+        None if there is nothing to test."""
+
+        checks = [(field, OPERATORS[op], value) for field, op, value in self._conditions]
+        predicates = self._predicates
+        if not checks and not predicates:
+            return None
+
+        def matches(entity):
+            for field, compare, value in checks:
+                val = get_field(entity, field)
+                if val is None:
+                    return False
+                try:
+                    if not compare(val, value):
+                        return False
+                except TypeError: # e.g., comparing a str field with a number
+                    return False
+            return all(predicate(entity) for predicate in predicates)
+        return matches
+
+    def _matching(self, candidates):
+        """Returns the candidates satisfying every condition and predicate, in candidate
+        order."""
+
+        matches = self._matcher()
+        if matches is None:
+            return list(candidates)
+        return [entity for entity in candidates if matches(entity)]
+
+    def _run(self):
+        """Plans and executes the query."""
+
+        if self._order is not None:
+            field, descending = self._order
+            index = self.collection.indexes.get(field)
+            if isinstance(index, SortedIndex) and self._limit is not None:
+                return self._walk_sorted(index, descending)
+
+        results = self._matching(self._candidates())
+        if self._order is None:
+            return results if self._limit is None else results[:self._limit]
+
+        field, descending = self._order
+        keyed = [(sort_key(get_field(entity, field)), entity) for entity in results]
+        present = [item for item in keyed if item[0] is not None]
+        missing = [entity for key, entity in keyed if key is None]
+        key = operator.itemgetter(0)
+        if self._limit is None:
+            present = [entity for _, entity in sorted(present, key=key, reverse=descending)]
+            return present + missing
+        select = heapq.nlargest if descending else heapq.nsmallest
+        top = [entity for _, entity in select(self._limit, present, key=key)]
+        return top + missing[:self._limit - len(top)]
+
+
+    def _walk_sorted(self, index, descending):
+        """Answers a sorted, limited query by walking < index > in place, in either direction,
+        checking each entity against the conditions and stopping after < limit > matches.
+        Entities the index does not hold (no sort key) follow, as in an unindexed sort."""
+
+        start, stop = 0, len(index.entities)
+        bounded = False
+        for field, op, value in self._conditions:
+            bounds = index.bounds(op, value) if field == index.field else None
+            if bounds is not None:
+                start, stop = max(start, bounds[0]), min(stop, bounds[1])
+                bounded = True
+
+        results = []
+        if self._limit <= 0:
+            return results
+        matches = self._matcher()
+        for entity in index.walk(start, stop, descending):
+            if matches is None or matches(entity):
+                results.append(entity)
+                if len(results) == self._limit:
+                    return results
+        if not bounded: # a comparison on the sort field excludes unordered values anyway
+            rest = [entity for entity in self.collection.entities
+                    if sort_key(get_field(entity, index.field)) is None]
+            results.extend(self._matching(rest)[:self._limit - len(results)])
+        return results
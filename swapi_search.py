@@ -0,0 +1,307 @@
+import argparse
+import copy
+import heapq
+import os
+import time
+
+import swapi_client
+import swapi_keys
+import swapi_mirror
+
+
+# fields indexed per collection; broader than SWAPI's own (see < swapi_mirror.SEARCH_FIELDS >)
+SEARCH_FIELDS = {
+    'people': ('name',),
+    'planets': ('name',),
+    'starships': ('name', 'model', 'manufacturer'),
+    'species': ('name',),
+    'films': ('title',),
+    'vehicles': ('name', 'model', 'manufacturer')
+}
+MIN_SIMILARITY = 0.3 # trigram similarity below which a fuzzy candidate is dropped
+PAD = ' ' # normalized keys hold letters and digits only, so a space marks a word boundary
+SEARCH_INDEX = os.environ.get('SWAPI_SEARCH_INDEX') # mirror snapshot for < load_configured_index() >
+
+
+def short_grams(key):
+    """Returns the set of one and two character substrings of a normalized key, which serve
+    exact-mode terms too short to contain a trigram.
+
+    Parameters:
+        key (str): normalized key (see < swapi_keys.name_key() >)
+
+    Returns:
+        set: unigrams and bigrams
+    """
+
+    return set(key) | {key[i:i + 2] for i in range(len(key) - 1)}
+
+
+def trigrams(key):
+    """Returns the set of trigrams of a normalized key, padded so that the start and end of
+    the key yield their own trigrams (e.g., 'bb8' -> '  b', ' bb', 'bb8', 'b8 ').
+
+    Parameters:
+        key (str): normalized key (see < swapi_keys.name_key() >)
+
+    Returns:
+        set: trigrams
+    """
+
+    padded = f"{PAD * 2}{key}{PAD}"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SearchIndex:
+    """Trigram inverted index over the names, models and manufacturers of mirrored records
+    (see < swapi_mirror.crawl() >). Each field value is normalized with < swapi_keys.name_key() >
+    and split into trigrams; the postings map a trigram to the field values containing it,
+    so a lookup only touches the values sharing at least one trigram with the term. Unigram
+    and bigram postings serve exact-mode terms shorter than a trigram the same way.
+
+    Two ranking modes are offered. 'exact' keeps SWAPI's '?search=' semantics (the term must
+    be a case-insensitive substring of a field) but ranks equal and prefix matches first.
+    'fuzzy' compares normalized keys, so missing or extra punctuation and spacing do not
+    matter ('BB8' finds 'BB-8'), and falls back to trigram similarity for misspellings.
+
+    Attributes:
+        records (dict): collection name -> list of records in snapshot order
+        fallback (object): lookup consulted for requests other than searches, e.g. a
+            MirrorIndex
+
+    Methods:
+        lookup: answer a < fetch_json() > request, if possible
+        search: return ranked (score, record) matches
+        search_first: return a copy of the best match
+    """
+
+    def __init__(self, snapshot, fields=None, fallback=None):
+        """Initialize a SearchIndex instance, indexing every mirrored collection.
+
+        Parameters:
+            snapshot (dict): snapshot returned by < swapi_mirror.crawl() > or
+                < swapi_mirror.read_snapshot() >
+            fields (dict): collection name -> indexed fields; defaults to < SEARCH_FIELDS >
+            fallback (object): object exposing < lookup(url, params) > for other requests
+        """
+
+        fields = SEARCH_FIELDS if fields is None else fields
+        self.records = {}
+        self.fallback = fallback
+        self._entries = {} # collection -> [(record position, key, casefolded text, trigram count)]
+        self._postings = {} # collection -> {trigram: [entry position]}
+        self._short = {} # collection -> {unigram or bigram: [entry position]}
+        for name, records in snapshot['collections'].items():
+            entries = []
+            postings = {}
+            short = {}
+            for i, record in enumerate(records):
+                for field in fields.get(name, ('name',)):
+                    text = record.get(field)
+                    if not text or not isinstance(text, str):
+                        continue
+                    key = swapi_keys.name_key(text)
+                    grams = trigrams(key)
+                    for gram in grams:
+                        postings.setdefault(gram, []).append(len(entries))
+                    for gram in short_grams(key):
+                        short.setdefault(gram, []).append(len(entries))
+                    entries.append((i, key, text.casefold(), len(grams)))
+            self.records[name] = records
+            self._entries[name] = entries
+            self._postings[name] = postings
+            self._short[name] = short
+
+    def search(self, collection, term, limit=10, mode='fuzzy', min_similarity=MIN_SIMILARITY):
+        """Returns the records of < collection > matching < term >, best first. A record
+        scores by its best matching field; ties keep snapshot order. The records are the
+        indexed objects themselves and must not be mutated.
+
+        Parameters:
+            collection (str): collection name (e.g., 'people')
+            term (str): search term
+            limit (int): maximum number of results; None returns every match
+            mode (str): 'exact' (substring, as SWAPI) or 'fuzzy' (punctuation-insensitive)
+            min_similarity (float): fuzzy mode only; trigram similarity required of a
+                candidate that does not contain the term
+
+        Returns:
+            list: (score, record) tuples
+        """
+
+        if mode not in ('exact', 'fuzzy'):
+            raise ValueError(f"mode must be 'exact' or 'fuzzy', not {mode!r}")
+        entries = self._entries.get(collection)
+        if entries is None:
+            return []
+        if mode == 'exact':
+            scored = self._exact(collection, term.casefold())
+        else:
+            scored = self._fuzzy(collection, swapi_keys.name_key(term), min_similarity)
+
+        best = {} # record position -> score
+        for position, score in scored:
+            if score > best.get(position, 0.0):
+                best[position] = score
+        order = lambda item: (-item[1], item[0])
+        if limit is None:
+            ranked = sorted(best.items(), key=order)
+        else:
+            ranked = heapq.nsmallest(limit, best.items(), key=order)
+        records = self.records[collection]
+        return [(score, records[position]) for position, score in ranked]
+
+    def _exact(self, collection, text):
+        """Yields (record position, score) for the entries containing < text >. The trigrams
+        inside the normalized term (or the term itself, if shorter than a trigram) are
+        necessarily shared by any such entry, so only the intersection of their postings is
+        checked."""
+
+        entries = self._entries[collection]
+        postings = self._postings[collection]
+        key = swapi_keys.name_key(text)
+        inner = {key[i:i + 3] for i in range(len(key) - 2)}
+        if inner:
+            lists = sorted((postings.get(gram, ()) for gram in inner), key=len)
+            candidates = set(lists[0]).intersection(*lists[1:])
+        elif key:
+            candidates = self._short[collection].get(key, ())
+        else:
+            candidates = range(len(entries)) # empty or punctuation-only terms are scanned
+        for i in candidates:
+            position, _, folded, _ = entries[i]
+            at = folded.find(text)
+            if at < 0:
+                continue
+            tier = 3 if folded == text else 2 if at == 0 else 1
+            yield position, tier + len(text) / len(folded)
+
+    def _fuzzy(self, collection, key, min_similarity):
+        """Yields (record position, score) for the entries sharing trigrams with < key >:
+        equal keys rank above prefix matches, then substring matches, then the remaining
+        candidates by Jaccard similarity of their trigram sets."""
+
+        if not key:
+            return
+        entries = self._entries[collection]
+        postings = self._postings[collection]
+        grams = trigrams(key)
+        shared = {}
+        for gram in grams:
+            for i in postings.get(gram, ()):
+                shared[i] = shared.get(i, 0) + 1
+        for i, count in shared.items():
+            position, entry_key, _, gram_count = entries[i]
+            similarity = count / (len(grams) + gram_count - count)
+            if entry_key == key:
+                tier = 3
+            elif entry_key.startswith(key):
+                tier = 2
+            elif key in entry_key:
+                tier = 1
+            elif similarity >= min_similarity:
+                tier = 0
+            else:
+                continue
+            yield position, tier + similarity
+
+    def search_first(self, collection, term, mode='fuzzy'):
+        """Returns a copy of the best match for < term > in < collection >.
+
+        Parameters:
+            collection (str): collection name
+            term (str): search term
+            mode (str): 'exact' or 'fuzzy' (see < search() >)
+
+        Returns:
+            dict: record or None
+        """
+
+        results = self.search(collection, term, limit=1, mode=mode)
+        return copy.deepcopy(results[0][1]) if results else None
+
+    def lookup(self, url, params=None):
+        """Answers a < swapi_client.fetch_json() > request. A '?search=' query on an indexed
+        collection is answered with a SWAPI-style page ranked best first: the exact matches
+        if there are any, the fuzzy ones otherwise, so callers taking < ['results'][0] > get
+        the closest record. Other requests go to < fallback >.
+
+        Parameters:
+            url (str): a url that specifies the resource
+            params (dict): optional dictionary of querystring arguments
+
+        Returns:
+            dict: decoded body or None
+        """
+
+        name, record_id = swapi_mirror.resource_path(url)
+        if record_id is None and params and set(params) == {'search'} and name in self._entries:
+            term = params['search']
+            matches = (self.search(name, term, limit=None, mode='exact') or
+                       self.search(name, term, limit=None, mode='fuzzy'))
+            results = [copy.deepcopy(record) for _, record in matches]
+            return {'count': len(results), 'next': None, 'previous': None, 'results': results}
+        if self.fallback is not None:
+            return self.fallback.lookup(url, params)
+        return None
+
+
+def load_index(filepath):
+    """Reads a mirror snapshot, indexes it and installs the search index on
+    < swapi_client > (with a MirrorIndex answering record requests), so that subsequent
+    record and search lookups are answered locally.
+
+    Parameters:
+        filepath (str): path to a snapshot file
+
+    Returns:
+        SearchIndex: the installed index
+    """
+
+    snapshot = swapi_mirror.read_snapshot(filepath)
+    index = SearchIndex(snapshot, fallback=swapi_mirror.MirrorIndex(snapshot))
+    swapi_client.use_mirror(index)
+    return index
+
+
+def load_configured_index():
+    """Installs the search index (see < load_index() >) for the snapshot named by the
+    SWAPI_SEARCH_INDEX environment variable, if set. < swapi.main() > and
+    < swapi_async.main() > call it so their '?search=' queries are answered locally when
+    a mirror is available.
+
+    Parameters:
+        None
+
+    Returns:
+        SearchIndex: the installed index, or None if no snapshot is configured
+    """
+
+    if not SEARCH_INDEX:
+        return None
+    return load_index(SEARCH_INDEX)
+
+
+def main():
+    """Prints the ranked matches for a term in a mirrored collection."""
+
+    parser = argparse.ArgumentParser(description='Search a SWAPI mirror snapshot locally.')
+    parser.add_argument('snapshot', help='mirror snapshot written by swapi_mirror.py')
+    parser.add_argument('collection', help='e.g. people or starships')
+    parser.add_argument('term')
+    parser.add_argument('--mode', choices=('exact', 'fuzzy'), default='fuzzy')
+    parser.add_argument('--limit', type=int, default=10)
+    args = parser.parse_args()
+
+    index = SearchIndex(swapi_mirror.read_snapshot(args.snapshot))
+    start = time.perf_counter()
+    results = index.search(args.collection, args.term, args.limit, args.mode)
+    elapsed = time.perf_counter() - start
+    for score, record in results:
+        print(f"{score:6.3f}  {record.get('name') or record.get('title')}  {record.get('url')}")
+    print(f"{len(results)} results in {elapsed * 1000:.3f} ms")
+    return results
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,182 @@
+import argparse
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import swapi_mirror
+
+
+PAGE_SIZE = 10 # records per collection page, as served by SWAPI
+
+
+class FakeSwapi:
+    """Stand-in for the SWAPI service backed by a recorded mirror snapshot (see
+    < swapi_mirror.crawl() >). Urls inside the recorded records are rewritten to point at the
+    stand-in so that follow-up requests (homeworld, species, films, next pages) stay local.
+
+    Attributes:
+        index (MirrorIndex): index over the recorded snapshot
+        base_url (str): url prefix the recorded endpoint is rewritten to
+        latency (float): mean delay added to every response in seconds
+        jitter (float): uniform +/- variation applied to < latency > in seconds
+        error_rate (float): probability (0-1) of answering 503 Service Unavailable
+        retry_after (int): optional Retry-After value sent with injected errors
+        requests (int): number of requests handled
+
+    Methods:
+        respond: build the status, headers and body for a request path
+    """
+
+    def __init__(self, snapshot, base_url='', latency=0.0, jitter=0.0, error_rate=0.0, retry_after=None):
+        """Initialize a FakeSwapi instance."""
+
+        self.index = swapi_mirror.MirrorIndex(snapshot)
+        self.recorded_endpoint = snapshot.get('endpoint', swapi_mirror.ENDPOINT)
+        self.base_url = base_url
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def respond(self, path, headers=None):
+        """Builds the response to a GET request after sleeping for the configured latency.
+
+        Parameters:
+            path (str): request path including the querystring
+            headers (dict): request headers
+
+        Returns:
+            tuple: (status code, response headers dict, body bytes)
+        """
+
+        with self._lock:
+            self.requests += 1
+        delay = self.latency + random.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+        if self.error_rate and random.random() < self.error_rate:
+            error_headers = {'Content-Type': 'application/json'}
+            if self.retry_after is not None:
+                error_headers['Retry-After'] = str(self.retry_after)
+            return 503, error_headers, b'{"detail":"Service unavailable"}'
+
+        split = urlsplit(path)
+        query = {key: values[0] for key, values in parse_qs(split.query).items()}
+        payload = self._payload(split.path, query)
+        if payload is None:
+            return 404, {'Content-Type': 'application/json'}, b'{"detail":"Not found"}'
+
+        body = json.dumps(payload, ensure_ascii=False, separators=(',', ':'))
+        body = body.replace(self.recorded_endpoint, self.base_url).encode('utf-8')
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        if headers and headers.get('If-None-Match') == etag:
+            return 304, {'ETag': etag}, b''
+        return 200, {'Content-Type': 'application/json', 'ETag': etag}, body
+
+    def _payload(self, path, query):
+        """Returns the decoded body for a request path or None if nothing matches."""
+
+        name, record_id = swapi_mirror.resource_path(path)
+        if record_id is not None:
+            return self.index.get(path)
+        if 'search' in query:
+            return self.index.search(name, query['search'])
+        if name not in self.index.records:
+            return None
+
+        records = list(self.index.records[name].values())
+        pages = max(1, math.ceil(len(records) / PAGE_SIZE))
+        page = int(query.get('page', 1))
+        if page < 1 or page > pages:
+            return None
+        collection_url = f"{self.base_url}/{name}/"
+        return {
+            'count': len(records),
+            'next': f"{collection_url}?page={page + 1}" if page < pages else None,
+            'previous': f"{collection_url}?page={page - 1}" if page > 1 else None,
+            'results': records[(page - 1) * PAGE_SIZE:page * PAGE_SIZE]
+        }
+
+
+def _make_handler(fake):
+    """Returns a request handler class bound to < fake >."""
+
+    class Handler(BaseHTTPRequestHandler):
+        """Serves GET requests from a FakeSwapi instance."""
+
+        protocol_version = 'HTTP/1.1' # keep-alive, like the real service
+
+        def do_GET(self):
+            """Answer a GET request."""
+
+            status, headers, body = fake.respond(self.path, self.headers)
+            self.send_response(status)
+            for key, value in headers.items():
+                self.send_header(key, value)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            """Silence per-request logging."""
+
+    return Handler
+
+
+def start_server(snapshot, host='127.0.0.1', port=0, **options):
+    """Starts a stand-in SWAPI server on a background thread.
+
+    Parameters:
+        snapshot (dict): recorded mirror snapshot
+        host (str): interface to bind
+        port (int): port to bind; 0 picks a free port
+        **options: latency, jitter, error_rate and retry_after passed to < FakeSwapi >
+
+    Returns:
+        tuple: (ThreadingHTTPServer, FakeSwapi, endpoint url e.g. 'http://127.0.0.1:8123/api')
+    """
+
+    fake = FakeSwapi(snapshot, **options)
+    server = ThreadingHTTPServer((host, port), _make_handler(fake))
+    server.daemon_threads = True
+    endpoint = f"http://{host}:{server.server_address[1]}/api"
+    fake.base_url = endpoint
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, fake, endpoint
+
+
+def main():
+    """Serves a recorded snapshot until interrupted."""
+
+    parser = argparse.ArgumentParser(description='Local stand-in for the SWAPI service.')
+    parser.add_argument('snapshot', help='mirror snapshot written by swapi_mirror.py')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--latency', type=float, default=0.0, help='mean response delay in seconds')
+    parser.add_argument('--jitter', type=float, default=0.0, help='+/- delay variation in seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='probability of a 503 response')
+    parser.add_argument('--retry-after', type=int, default=None, help='Retry-After sent with errors')
+    args = parser.parse_args()
+
+    server, fake, endpoint = start_server(
+        swapi_mirror.read_snapshot(args.snapshot), args.host, args.port, latency=args.latency,
+        jitter=args.jitter, error_rate=args.error_rate, retry_after=args.retry_after
+    )
+    print(f"Serving {args.snapshot} at {endpoint} (export SWAPI_ENDPOINT={endpoint})")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,307 @@
+import argparse
+import bisect
+import hashlib
+import json
+import mmap
+import os
+import struct
+import tempfile
+
+import swapi_keys
+import swapi_stream
+
+
+MAGIC = b'SWPK'
+VERSION = 1
+
+# magic, version, reserved, records, url entries, name entries, url index offset, name index
+# offset, record table offset
+HEADER = struct.Struct('<4sHHIIIQQQ')
+# key hash, record offset, record length; each index is sorted by key hash
+ENTRY = struct.Struct('<QQI')
+# record offset, record length; one per record, in file order
+RECORD = struct.Struct('<QI')
+
+
+def key_hash(key):
+    """Returns the stable 64-bit hash under which < key > is indexed. Python's own hash() is
+    salted per process, so a keyed digest is used instead.
+
+    Parameters:
+        key (str): url or normalized name
+
+    Returns:
+        int: unsigned 64-bit hash
+    """
+
+    return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def write_packed(filepath, records):
+    """Writes records to a packed snapshot. The file holds a fixed size header, each record
+    as compact UTF-8 JSON, two fixed-width indexes of (key hash, offset, length) entries
+    sorted by hash (one over record urls and one over normalized names, see
+    < swapi_keys.name_key() >) and a table of (offset, length) per record in file order. Records
+    are encoded as they arrive, so a generator is never held in memory; only the fixed-width
+    entries are. The file is written to a temporary path and renamed into place.
+
+    Parameters:
+        filepath (str): the path to the file
+        records (iterable): record dictionaries or entities exposing < jsonable() >
+
+    Returns:
+        int: number of records written
+
+    Raises:
+        TypeError: if a record is neither a dictionary nor an entity whose < jsonable() >
+            returns one
+    """
+
+    encode = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+    url_entries = []
+    name_entries = []
+    record_entries = []
+    count = 0
+
+    directory = os.path.dirname(os.path.abspath(filepath))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(filepath)}.", suffix='.tmp')
+    try:
+        with open(fd, 'wb') as file_obj:
+            file_obj.write(b'\0' * HEADER.size) # patched once the index offsets are known
+            offset = HEADER.size
+            for record in records:
+                if hasattr(record, 'jsonable'):
+                    record = record.jsonable()
+                if not isinstance(record, dict):
+                    raise TypeError(f"record {count} is a {type(record).__name__}, not a dict")
+                encoded = encode(record).encode('utf-8')
+                file_obj.write(encoded)
+                if record.get('url'):
+                    url_entries.append((key_hash(record['url']), offset, len(encoded)))
+                if record.get('name'):
+                    name_entries.append((key_hash(swapi_keys.name_key(record['name'])), offset, len(encoded)))
+                record_entries.append((offset, len(encoded)))
+                offset += len(encoded)
+                count += 1
+
+            index_offsets = []
+            for entries in (url_entries, name_entries):
+                entries.sort()
+                index_offsets.append(offset)
+                for entry in entries:
+                    file_obj.write(ENTRY.pack(*entry))
+                offset += len(entries) * ENTRY.size
+            index_offsets.append(offset)
+            for entry in record_entries:
+                file_obj.write(RECORD.pack(*entry))
+
+            file_obj.seek(0)
+            file_obj.write(HEADER.pack(MAGIC, VERSION, 0, count, len(url_entries), len(name_entries), *index_offsets))
+        os.chmod(tmp_path, 0o644) # mkstemp creates owner-only files
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    return count
+
+
+class _HashColumn:
+    """Read-only sequence view of the key hashes of an index, for < bisect >."""
+
+    def __init__(self, buffer, offset, count):
+        """Initialize a _HashColumn instance."""
+
+        self.buffer = buffer
+        self.offset = offset
+        self.count = count
+
+    def __len__(self):
+        """Return the number of index entries."""
+
+        return self.count
+
+    def __getitem__(self, i):
+        """Return the key hash of entry < i >."""
+
+        return ENTRY.unpack_from(self.buffer, self.offset + i * ENTRY.size)[0]
+
+
+class PackedSnapshot:
+    """Random access reader over a file written by < write_packed() >. The file is memory
+    mapped read-only, so opening it costs a header read regardless of its size, only the pages
+    touched by a lookup are read, and processes reading the same file share those pages. A
+    lookup binary searches the fixed-width index and decodes a single record.
+
+    Attributes:
+        filepath (str): path to the snapshot
+
+    Methods:
+        close: unmap the file
+        find: return every record matching a name
+        get: return a record by url
+        get_by_name: return the first record matching a name
+    """
+
+    def __init__(self, filepath):
+        """Initialize a PackedSnapshot instance and map the file."""
+
+        self.filepath = filepath
+        with open(filepath, 'rb') as file_obj:
+            self._mmap = mmap.mmap(file_obj.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mmap) < HEADER.size:
+            self._mmap.close()
+            raise ValueError(f"{filepath}: not a packed snapshot")
+        magic, version = struct.unpack_from('<4sH', self._mmap)
+        if magic != MAGIC or version != VERSION:
+            self._mmap.close()
+            raise ValueError(f"{filepath}: not a version {VERSION} packed snapshot")
+        _, _, _, self._count, url_count, name_count, url_offset, name_offset, self._table = (
+            HEADER.unpack_from(self._mmap)
+        )
+        self._urls = _HashColumn(self._mmap, url_offset, url_count)
+        self._names = _HashColumn(self._mmap, name_offset, name_count)
+
+    def __enter__(self):
+        """Return the reader."""
+
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        """Unmap the file."""
+
+        self.close()
+
+    def __len__(self):
+        """Return the number of records."""
+
+        return self._count
+
+    def __iter__(self):
+        """Decode every record in file order, one slice of the mapping at a time."""
+
+        for i in range(self._count):
+            offset, length = RECORD.unpack_from(self._mmap, self._table + i * RECORD.size)
+            yield json.loads(self._mmap[offset:offset + length])
+
+    def close(self):
+        """Unmaps the file."""
+
+        self._mmap.close()
+
+    def _matches(self, column, key):
+        """Yields the (decoded record) candidates stored under the hash of < key >."""
+
+        target = key_hash(key)
+        i = bisect.bisect_left(column, target)
+        while i < len(column):
+            entry_hash, offset, length = ENTRY.unpack_from(column.buffer, column.offset + i * ENTRY.size)
+            if entry_hash != target:
+                return
+            yield json.loads(self._mmap[offset:offset + length])
+            i += 1
+
+    def get(self, url):
+        """Returns the record stored under < url >.
+
+        Parameters:
+            url (str): record url
+
+        Returns:
+            dict: record or None
+        """
+
+        for record in self._matches(self._urls, url):
+            if record.get('url') == url: # guard against hash collisions
+                return record
+        return None
+
+    def find(self, name):
+        """Returns every record whose name matches < name > after normalization (e.g., 'BB8'
+        matches 'BB-8').
+
+        Parameters:
+            name (str): record name
+
+        Returns:
+            list: matching records in file order
+        """
+
+        key = swapi_keys.name_key(name)
+        return [record for record in self._matches(self._names, key)
+                if swapi_keys.name_key(record.get('name') or '') == key]
+
+    def get_by_name(self, name):
+        """Returns the first record whose name matches < name > (see < find() >).
+
+        Parameters:
+            name (str): record name
+
+        Returns:
+            dict: record or None
+        """
+
+        matches = self.find(name)
+        return matches[0] if matches else None
+
+
+def iter_inputs(filepaths):
+    """Yields the records held in JSON, NDJSON and CSV files. A JSON object is one record,
+    except for a mirror snapshot (see < swapi_mirror.crawl() >), whose collections are
+    expanded; a JSON array contributes each element.
+
+    Parameters:
+        filepaths (iterable): paths to .json, .ndjson, .jsonl or .csv files
+
+    Returns:
+        generator: record dictionaries
+    """
+
+    for filepath in filepaths:
+        if not filepath.endswith('.json'):
+            yield from swapi_stream.iter_records(filepath)
+            continue
+        first = ''
+        with open(filepath, 'r', encoding='utf-8') as file_obj:
+            while not first:
+                chunk = file_obj.read(64)
+                if not chunk:
+                    break
+                first = chunk.lstrip()[:1]
+        if first == '[':
+            yield from swapi_stream.iter_json_array(filepath)
+            continue
+        with open(filepath, 'r', encoding='utf-8') as file_obj:
+            data = json.load(file_obj)
+        if isinstance(data.get('collections'), dict):
+            for records in data['collections'].values():
+                yield from records
+        else:
+            yield data
+
+
+def main():
+    """Packs JSON/NDJSON/CSV files into a snapshot, or looks records up in one."""
+
+    parser = argparse.ArgumentParser(description='Packed, memory-mapped SWAPI snapshots.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    pack = commands.add_parser('pack', help='write a packed snapshot')
+    pack.add_argument('output')
+    pack.add_argument('inputs', nargs='+', help='e.g. swapi_mirror.json or stu_*.json files')
+    get = commands.add_parser('get', help='print a record by url or name')
+    get.add_argument('snapshot')
+    get.add_argument('key', help='record url or name')
+    args = parser.parse_args()
+
+    if args.command == 'pack':
+        count = write_packed(args.output, iter_inputs(args.inputs))
+        print(f"{args.output}: {count} records")
+        return count
+
+    with PackedSnapshot(args.snapshot) as snapshot:
+        record = snapshot.get(args.key) or snapshot.get_by_name(args.key)
+    print(json.dumps(record, ensure_ascii=False, indent=2))
+    return record
+
+
+if __name__ == '__main__':
+    main()
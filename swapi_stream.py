@@ -0,0 +1,257 @@
+import csv
+import json
+import os
+import re
+import tempfile
+
+
+BUFFER_SIZE = 1 << 16 # bytes buffered before a write reaches the OS
+READ_SIZE = 1 << 16 # characters read per chunk by iter_json_array()
+MODES = ('ndjson', 'array')
+WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+
+class JsonStreamWriter:
+    """Streams JSON-friendly records to a file one at a time, either as newline-delimited
+    JSON (one compact document per line) or as a single compact JSON array. Output goes to a
+    temporary file in the destination directory that is atomically renamed over < filepath >
+    on close, so readers never observe a partially written file. Use as a context manager; if
+    the block raises, the temporary file is discarded and < filepath > is left untouched.
+
+    Attributes:
+        filepath (str): destination path
+        mode (str): 'ndjson' or 'array'
+        count (int): number of records written
+
+    Methods:
+        write: encode and write one record
+        write_all: write every record of an iterable
+        close: finish the document and move it into place
+        abort: discard the temporary file
+    """
+
+    def __init__(self, filepath, mode='ndjson', buffer_size=BUFFER_SIZE):
+        """Initialize a JsonStreamWriter instance and open its temporary file."""
+
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {MODES}, not {mode!r}")
+        self.filepath = filepath
+        self.mode = mode
+        self.count = 0
+        self._encode = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+        directory = os.path.dirname(os.path.abspath(filepath))
+        fd, self._tmp_path = tempfile.mkstemp(
+            dir=directory, prefix=f".{os.path.basename(filepath)}.", suffix='.tmp'
+        )
+        self._file_obj = open(fd, 'w', encoding='utf-8', buffering=buffer_size)
+        if mode == 'array':
+            self._file_obj.write('[')
+
+    def __enter__(self):
+        """Return the writer."""
+
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        """Close the writer, or abort it if the block raised."""
+
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def write(self, record):
+        """Encodes and writes one record. Objects exposing < jsonable() > are serialized
+        through it.
+
+        Parameters:
+            record (dict)/(object): JSON-friendly value or entity instance
+
+        Returns:
+            None
+        """
+
+        if hasattr(record, 'jsonable'):
+            record = record.jsonable()
+        encoded = self._encode(record)
+        if self.mode == 'ndjson':
+            self._file_obj.write(encoded)
+            self._file_obj.write('\n')
+        else:
+            if self.count:
+                self._file_obj.write(',')
+            self._file_obj.write(encoded)
+        self.count += 1
+
+    def write_all(self, records):
+        """Writes every record of < records >, which may be a generator.
+
+        Parameters:
+            records (iterable): JSON-friendly values or entity instances
+
+        Returns:
+            int: total number of records written so far
+        """
+
+        for record in records:
+            self.write(record)
+        return self.count
+
+    def close(self):
+        """Terminates the document, flushes it to disk and renames it over < filepath >."""
+
+        if self._file_obj.closed:
+            return
+        if self.mode == 'array':
+            self._file_obj.write(']')
+        self._file_obj.flush()
+        os.fsync(self._file_obj.fileno())
+        self._file_obj.close()
+        os.chmod(self._tmp_path, 0o644) # mkstemp creates owner-only files
+        os.replace(self._tmp_path, self.filepath)
+
+    def abort(self):
+        """Closes and deletes the temporary file without touching < filepath >."""
+
+        if not self._file_obj.closed:
+            self._file_obj.close()
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+
+def write_json_stream(filepath, records, mode='ndjson', buffer_size=BUFFER_SIZE):
+    """Writes records from an iterable (e.g., a generator of < jsonable() > dicts) to
+    < filepath > in constant memory. See < JsonStreamWriter >.
+
+    Parameters:
+        filepath (str): the path to the file
+        records (iterable): JSON-friendly values or entity instances
+        mode (str): 'ndjson' or 'array'
+        buffer_size (int): write buffer size in bytes
+
+    Returns:
+        int: number of records written
+    """
+
+    with JsonStreamWriter(filepath, mode, buffer_size) as writer:
+        return writer.write_all(records)
+
+
+def iter_csv_dicts(filepath, delimiter=','):
+    """Yields the rows of a CSV file as dictionaries, one at a time. Generator counterpart
+    of < swapi.read_csv_into_dicts() >.
+
+    Parameters:
+        filepath (str): path to file
+        delimiter (str): delimiter that overrides the default delimiter
+
+    Returns:
+        generator: row dictionaries
+    """
+
+    with open(filepath, mode='r', newline='', encoding='utf-8-sig') as file_obj:
+        yield from csv.DictReader(file_obj, delimiter=delimiter)
+
+
+def iter_ndjson(filepath):
+    """Yields the documents of a newline-delimited JSON file (as written by
+    < JsonStreamWriter >), one at a time. Blank lines are skipped.
+
+    Parameters:
+        filepath (str): path to file
+
+    Returns:
+        generator: decoded documents
+    """
+
+    decode = json.JSONDecoder().decode
+    with open(filepath, 'r', encoding='utf-8') as file_obj:
+        for line in file_obj:
+            if line.strip():
+                yield decode(line)
+
+
+def iter_json_array(filepath, read_size=READ_SIZE):
+    """Yields the elements of a top level JSON array one at a time without decoding the
+    whole document. The file is read in chunks of < read_size > characters; only the element
+    being decoded is held in memory.
+
+    Parameters:
+        filepath (str): path to file
+        read_size (int): characters read per chunk
+
+    Returns:
+        generator: decoded array elements
+
+    Raises:
+        ValueError: if the document is not a JSON array or is malformed
+    """
+
+    raw_decode = json.JSONDecoder().raw_decode
+    with open(filepath, 'r', encoding='utf-8') as file_obj:
+        buffer = ''
+        pos = 0
+        eof = False
+        state = 'start' # start -> first -> (value -> next)* -> ']'
+
+        while True:
+            pos = WHITESPACE.match(buffer, pos).end()
+            if pos == len(buffer):
+                if eof:
+                    raise ValueError(f"{filepath}: unexpected end of JSON array")
+                buffer = file_obj.read(read_size)
+                pos = 0
+                eof = not buffer
+                continue
+
+            char = buffer[pos]
+            if state == 'start':
+                if char != '[':
+                    raise ValueError(f"{filepath}: expected a JSON array")
+                pos += 1
+                state = 'first'
+            elif char == ']' and state in ('first', 'next'):
+                return
+            elif state == 'next':
+                if char != ',':
+                    raise ValueError(f"{filepath}: expected ',' or ']'")
+                pos += 1
+                state = 'value'
+            else:
+                try:
+                    value, end = raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    end = None
+                # an element is complete only once the ',' or ']' after it is in the buffer;
+                # otherwise it may be cut off by the chunk boundary (e.g., '-0.5' of '-0.5e3')
+                if end is not None:
+                    after = WHITESPACE.match(buffer, end).end()
+                if not eof and (end is None or after == len(buffer) or buffer[after] not in ',]'):
+                    chunk = file_obj.read(read_size)
+                    buffer = buffer[pos:] + chunk
+                    pos = 0
+                    eof = not chunk
+                    continue
+                if end is None:
+                    raise ValueError(f"{filepath}: malformed JSON array element")
+                yield value
+                pos = end
+                state = 'next'
+
+
+def iter_records(filepath):
+    """Yields the records of a supplement file lazily, picking the reader from the file
+    extension: .csv rows, .ndjson/.jsonl lines or the elements of a JSON array.
+
+    Parameters:
+        filepath (str): path to a .csv, .ndjson, .jsonl or .json file
+
+    Returns:
+        generator: record dictionaries
+    """
+
+    if filepath.endswith('.csv'):
+        return iter_csv_dicts(filepath)
+    if filepath.endswith(('.ndjson', '.jsonl')):
+        return iter_ndjson(filepath)
+    return iter_json_array(filepath)